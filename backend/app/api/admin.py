@@ -0,0 +1,71 @@
+from typing import Any, Dict
+
+from fastapi import APIRouter, Depends, HTTPException, status
+
+from app.models.user import User
+from app.services.auth import get_current_admin_user
+from app.services.cache import cache_registry
+from app.services.job_queue import job_queue_registry
+from app.services import llm_cache
+from app.services.singleflight import singleflight_registry
+
+router = APIRouter()
+
+@router.get("/cache/stats")
+async def get_cache_stats(current_user: User = Depends(get_current_admin_user)) -> Dict[str, Any]:
+    """
+    Get hit/miss counters for every application cache
+    """
+    return {name: cache.get_stats() for name, cache in cache_registry.items()}
+
+@router.get("/singleflight/stats")
+async def get_singleflight_stats(current_user: User = Depends(get_current_admin_user)) -> Dict[str, Any]:
+    """
+    Get how many upstream calls were executed and how many were coalesced
+    """
+    return {name: group.get_stats() for name, group in singleflight_registry.items()}
+
+@router.get("/llm-cache/stats")
+async def get_llm_cache_stats(current_user: User = Depends(get_current_admin_user)) -> Dict[str, Any]:
+    """
+    Get LLM response cache hit rates per call site
+    """
+    return llm_cache.get_stats()
+
+@router.get("/jobs/stats")
+async def get_job_stats(current_user: User = Depends(get_current_admin_user)) -> Dict[str, Any]:
+    """
+    Get the number of jobs per status for every job queue
+    """
+    try:
+        return {name: await queue.get_stats() for name, queue in job_queue_registry.items()}
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error getting job stats: {str(e)}"
+        )
+
+@router.delete("/cache/{cache_name}")
+async def invalidate_cache(
+    cache_name: str,
+    key: str = None,
+    current_user: User = Depends(get_current_admin_user)
+) -> Dict[str, Any]:
+    """
+    Invalidate a cache entirely, or a single entry when a key is given
+    """
+    cache = cache_registry.get(cache_name)
+    if not cache:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Unknown cache: {cache_name}"
+        )
+    
+    try:
+        deleted = await cache.invalidate(key)
+        return {"success": True, "cache": cache_name, "deleted": deleted}
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error invalidating cache: {str(e)}"
+        )
@@ -1,11 +1,16 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from fastapi.responses import StreamingResponse
 from typing import List
 from bson.objectid import ObjectId
 from datetime import datetime
-import asyncio
+import json
+from pydantic import ValidationError
 
 from app.db.client import get_async_mongodb_db
 from app.services.campaign import campaign_service
+from app.services.qloo import qloo_service, QlooParameterSet
+from app.services.progress import progress_broker, TERMINAL_EVENTS
+from app.core.config import settings
 from app.models.campaign import Campaign, Message
 from app.models.campaign_schemas import (
     CreateCampaignRequest,
@@ -13,9 +18,11 @@ from app.models.campaign_schemas import (
     CampaignStatusResponse,
     ListCampaignsResponse,
     CampaignResponse,
-    CampaignDetailsResponse
+    CampaignDetailsResponse,
+    InsightsWhatIfRequest,
+    InsightsWhatIfResponse
 )
-from app.services.auth import get_current_user
+from app.services.auth import get_current_user, get_current_user_with_query_token
 from app.models.user import User
 
 router = APIRouter()
@@ -52,9 +59,9 @@ async def create_campaign(
         # Get the campaign ID
         campaign_id = str(result.inserted_id)
         
-        # Start processing the campaign asynchronously 
+        # Queue the campaign for the worker pool
         # This runs in the background and doesn't block the API response
-        asyncio.create_task(campaign_service.process_campaign(campaign_id))
+        await campaign_service.enqueue_campaign(campaign_id)
         
         # Return campaign ID and status
         return CreateCampaignResponse(
@@ -112,6 +119,128 @@ async def get_campaign_status(
             detail=f"Error getting campaign status: {str(e)}"
         )
 
+@router.post("/cancel/{campaign_id}", response_model=CampaignStatusResponse)
+async def cancel_campaign(
+    campaign_id: str,
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Cancel a campaign that is still being processed.
+    Stops the running workflow and sets the status to 'cancelled'.
+    """
+    try:
+        # Get database connection
+        db = await get_async_mongodb_db()
+        
+        # Find campaign in database
+        campaign = await db.campaigns.find_one({"_id": ObjectId(campaign_id)})
+        
+        if not campaign:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Campaign not found"
+            )
+        
+        # Check if campaign belongs to current user
+        if str(campaign["user_id"]) != str(current_user.id):
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="You don't have permission to access this campaign"
+            )
+        
+        if campaign["status"] != "processing":
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail=f"Campaign is not being processed (status: {campaign['status']})"
+            )
+        
+        # Cancel the queued or running job; a running workflow records the cancelled status itself
+        await campaign_service.cancel_campaign(campaign_id)
+        result = await db.campaigns.update_one(
+            {"_id": ObjectId(campaign_id), "status": "processing"},
+            {"$set": {"status": "cancelled", "updated_at": datetime.now()}}
+        )
+        if result.modified_count:
+            await progress_broker.publish(campaign_id, "cancelled")
+        
+        return CampaignStatusResponse(
+            id=campaign_id,
+            status="cancelled",
+            title=campaign["title"]
+        )
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error cancelling campaign: {str(e)}"
+        )
+
+@router.get("/events/{campaign_id}")
+async def stream_campaign_events(
+    campaign_id: str,
+    request: Request,
+    current_user: User = Depends(get_current_user_with_query_token)
+):
+    """
+    Stream campaign progress as server-sent events instead of polling the status endpoint.
+    Sends the current status first, then node-level events (planning_completed,
+    qloo_params_resolved, insights_fetched, plan_section, creative_idea, plan_generated)
+    until the campaign is processed, cancelled or failed. EventSource clients can pass the access token
+    as the `token` query parameter.
+    """
+    try:
+        # Get database connection
+        db = await get_async_mongodb_db()
+        
+        # Find campaign in database
+        campaign = await db.campaigns.find_one({"_id": ObjectId(campaign_id)}, {"user_id": 1, "status": 1, "title": 1})
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error getting campaign events: {str(e)}"
+        )
+    
+    if not campaign:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Campaign not found"
+        )
+    
+    # Check if campaign belongs to current user
+    if str(campaign["user_id"]) != str(current_user.id):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="You don't have permission to access this campaign"
+        )
+    
+    def format_event(event: str, data: dict, event_id: str = None) -> str:
+        message = f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+        return f"id: {event_id}\n{message}" if event_id else message
+    
+    async def event_stream():
+        yield format_event("status", {"status": campaign["status"], "title": campaign.get("title")})
+        if campaign["status"] != "processing":
+            return
+        
+        async for event in progress_broker.subscribe(campaign_id, settings.PROGRESS_SSE_KEEPALIVE_SECONDS):
+            if await request.is_disconnected():
+                break
+            if event is None:
+                # Comment line keeps proxies from closing an idle connection
+                yield ": keepalive\n\n"
+                continue
+            yield format_event(event["event"], event, event["id"])
+            if event["event"] in TERMINAL_EVENTS:
+                break
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
 @router.get("/details/{campaign_id}", response_model=CampaignDetailsResponse)
 async def get_campaign_details(
     campaign_id: str,
@@ -155,6 +284,76 @@ async def get_campaign_details(
             detail=f"Error getting campaign details: {str(e)}"
         )
 
+@router.post("/insights/{campaign_id}", response_model=InsightsWhatIfResponse)
+async def what_if_insights(
+    campaign_id: str,
+    request: InsightsWhatIfRequest,
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Re-query the Qloo insights of a campaign with tweaked parameters.
+    Starts from the parameters resolved when the campaign was generated, so the planner
+    is not re-run; nothing is saved to the campaign.
+    """
+    try:
+        # Get database connection
+        db = await get_async_mongodb_db()
+        
+        # Find campaign in database
+        campaign = await db.campaigns.find_one({"_id": ObjectId(campaign_id)})
+        
+        if not campaign:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Campaign not found"
+            )
+        
+        # Check if campaign belongs to current user
+        if str(campaign["user_id"]) != str(current_user.id):
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="You don't have permission to access this campaign"
+            )
+        
+        if not campaign.get("qloo_params"):
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail="Campaign has no resolved Qloo parameters"
+            )
+        
+        unknown = set(request.overrides) - set(QlooParameterSet.model_fields)
+        if unknown:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Unknown Qloo parameters: {', '.join(sorted(unknown))}"
+            )
+        
+        try:
+            base_params = QlooParameterSet.model_validate(campaign["qloo_params"])
+            result = await qloo_service.what_if_insights(
+                base_params, campaign.get("qloo_entities"), request.overrides
+            )
+        except ValidationError as e:
+            raise HTTPException(
+                status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                detail=f"Invalid Qloo parameters: {str(e)}"
+            )
+        
+        return InsightsWhatIfResponse(
+            campaign_id=campaign_id,
+            params=result["params"].model_dump(mode="json", exclude_none=True),
+            source=result["source"],
+            entities=result["entities"]
+        )
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error querying campaign insights: {str(e)}"
+        )
+
 @router.get("/list", response_model=ListCampaignsResponse)
 async def list_campaigns(
     current_user: User = Depends(get_current_user)
@@ -1,18 +1,18 @@
 from fastapi import APIRouter, Depends, HTTPException, status, BackgroundTasks
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional
 import time
 import requests
 import json
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from app.services.auth import get_current_user
 from app.models.user import User
 from app.core.config import settings
-from app.services.transcript_processor import process_conversation_transcript
 from app.services.qloo import qloo_service
 from app.db.client import get_async_mongodb_db
-from bson.objectid import ObjectId
 from datetime import datetime, timezone
-from app.api.tavus import find_and_store_similar_companies
+from app.api.tavus import TranscriptMessage
+from app.services.onboarding_pipeline import run_onboarding_pipeline
+from app.services.live_extraction import live_extractions
 
 router = APIRouter()
 
@@ -25,51 +25,65 @@ class OnboardingCompleteRequest(BaseModel):
     transcript: str
     conversation_id: str
 
+class TranscriptDeltaRequest(BaseModel):
+    conversation_id: str
+    # Index of the first message in the conversation, so retried deltas are not counted twice
+    start_index: int = Field(0, ge=0)
+    messages: List[TranscriptMessage]
+
 async def process_openai_transcript(user_id: str, conversation_id: str, transcript: str):
     """
     Process OpenAI transcript in the background
     """
-    db = await get_async_mongodb_db()
-    
     try:
-        # Process the transcript to extract company information using OpenAI
-        processing_result = await process_conversation_transcript(user_id=user_id, transcript=transcript)
-        print(f"Transcript processing result: {processing_result}")
-
-        if not processing_result.get("success"):
-            print(f"Error processing transcript: {processing_result.get('error')}")
-
-        obj_user_id = ObjectId(user_id)
-        user_result = await db.users.find_one({"_id": obj_user_id}, {"user_metadata": 1})
-
-        if user_result:
-            user_metadata = user_result.get("user_metadata", {}) or {}
-
-            # Find and store similar companies based on user metadata
-            await find_and_store_similar_companies(db, user_id, user_metadata)
-
-            # Update metadata with conversation status
-            user_metadata["onboarding_state"] = "completed"
-            user_metadata["conversation_id"] = conversation_id
-
-            # Update the user record with the new metadata and set is_onboarded to true
-            await db.users.update_one(
-                {"_id": obj_user_id},
-                {
-                    "$set": {
-                        "user_metadata": user_metadata,
-                        "is_onboarded": True,
-                        "updated_at": datetime.now(timezone.utc)
-                    }
-                }
-            )
-
+        # Extract company information, find similar companies and complete onboarding
+        pipeline_result = await run_onboarding_pipeline(user_id, conversation_id, transcript)
+        if pipeline_result.get("success"):
             print(f"Updated user {user_id} onboarding state to completed and is_onboarded to true")
+        else:
+            print(f"Error completing onboarding for user {user_id}: {pipeline_result.get('error')}")
     except Exception as e:
         print(f"Error processing OpenAI transcript: {str(e)}")
         import traceback
         print(traceback.format_exc())
 
+@router.post("/onboarding/transcript-delta")
+async def onboarding_transcript_delta(
+    request: TranscriptDeltaRequest,
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Receive new transcript messages while the onboarding conversation is still live.
+    Company information is extracted incrementally and competitor discovery starts once
+    it is stable, so /onboarding/complete has little left to do.
+    """
+    if not settings.LIVE_EXTRACTION_ENABLED:
+        return {"success": False, "message": "Live transcript extraction is disabled"}
+    
+    try:
+        extractor = live_extractions.add_delta(
+            request.conversation_id,
+            current_user.id,
+            request.start_index,
+            [message.model_dump() for message in request.messages]
+        )
+        return {
+            "success": True,
+            "received_messages": len(extractor.turns),
+            "company_name": extractor.info.company_name if extractor.info else None,
+            "discovery_started": extractor.discovery is not None
+        }
+    except PermissionError as e:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail=str(e)
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error processing transcript delta: {str(e)}"
+        )
+
 @router.post("/onboarding/complete")
 async def onboarding_complete(
     request: OnboardingCompleteRequest, 
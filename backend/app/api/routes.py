@@ -1,5 +1,5 @@
 from fastapi import APIRouter
-from app.api import auth, onboarding, tavus, competitors, dashboard, openai, campaign, settings
+from app.api import auth, onboarding, tavus, competitors, dashboard, openai, campaign, settings, admin
 
 router = APIRouter()
 
@@ -27,6 +27,9 @@ router.include_router(campaign.router, prefix="/campaigns", tags=["campaigns"])
 # Include Settings router
 router.include_router(settings.router, prefix="/settings", tags=["settings"])
 
+# Include Admin router
+router.include_router(admin.router, prefix="/admin", tags=["admin"])
+
 # Basic health check endpoint
 @router.get("/health")
 async def health_check():
@@ -1,6 +1,7 @@
+import logging
 from typing import Any, Dict, Optional
 from datetime import datetime, timezone
-from fastapi import APIRouter, Depends, HTTPException, status, BackgroundTasks
+from fastapi import APIRouter, Depends, HTTPException, status
 from pydantic import BaseModel, Field
 
 from app.models.user import User
@@ -8,69 +9,26 @@ from app.services.auth import get_current_active_user
 from app.db.client import get_async_mongodb_db
 from app.core.config import settings
 from app.services.transcript_processor import process_conversation_transcript
-from app.services.qloo import qloo_service
-from bson.objectid import ObjectId
-from motor.motor_asyncio import AsyncIOMotorDatabase
+from app.services.onboarding_pipeline import run_onboarding_pipeline
+from app.services.job_queue import JobQueue
 from typing import Dict, List, Any
 
+# Configure logging
+logger = logging.getLogger(__name__)
+
 router = APIRouter()
 
-async def find_and_store_similar_companies(db: AsyncIOMotorDatabase, user_id: str, user_metadata: Dict[str, Any]) -> Dict[str, Any]:
-    """
-    Find and store similar companies for a user based on their company information
-    
-    Args:
-        db: MongoDB database connection
-        user_id: User ID as string
-        user_metadata: User metadata containing company information
-        
-    Returns:
-        Dictionary with results information
-    """
-    try:
-        company_name = user_metadata.get("company_name", "")
-        company_details = user_metadata.get("company_details", "")
-        
-        if not company_name:
-            print(f"No company name found in metadata for user {user_id}")
-            return {"success": False, "message": "No company information available"}
-        
-        # Get similar companies using the QLoo service
-        similar_companies = await qloo_service.get_similar_companies_from_metadata(
-            company_metadata={
-                "company_name": company_name,
-                "company_details": company_details or ""
-            }
-        )
-        
-        # Store competitors in the database
-        if similar_companies:
-            competitor_entry = {
-                "user_id": user_id,
-                "competitors_data": similar_companies,
-                "source": "qloo",
-                "created_at": datetime.now(timezone.utc),
-                "updated_at": datetime.now(timezone.utc)
-            }
-            
-            # Insert competitor entry
-            result = await db.competitors.insert_one(competitor_entry)
-            print(f"Stored competitors data with {len(similar_companies)} companies for user {user_id}")
-            
-            return {
-                "success": True, 
-                "count": len(similar_companies),
-                "insert_id": str(result.inserted_id)
-            }
-        else:
-            print(f"No similar companies found for {company_name}")
-            return {"success": False, "message": "No similar companies found"}
-                
-    except Exception as e:
-        print(f"Error finding and storing similar companies: {str(e)}")
-        import traceback
-        print(traceback.format_exc())
-        return {"success": False, "error": str(e)}
+# Durable inbox of Tavus callbacks, drained by the worker pool (see app.worker); one job per
+# (conversation_id, event_type), so webhook retries are acknowledged without being processed twice.
+# A callback whose job failed permanently is processed again if it is delivered again.
+tavus_inbox = JobQueue(
+    "tavus_inbox",
+    collection="tavus_inbox",
+    lease_seconds=settings.TAVUS_INBOX_LEASE_SECONDS,
+    max_attempts=settings.TAVUS_INBOX_MAX_ATTEMPTS,
+    backoff_seconds=settings.TAVUS_INBOX_BACKOFF_SECONDS,
+    retention_seconds=settings.TAVUS_INBOX_RETENTION_SECONDS
+)
 
 class CreateConversationRequest(BaseModel):
     """Request model for creating a Tavus conversation"""
@@ -225,20 +183,20 @@ async def create_conversation(
 
 async def process_tavus_callback(data: TavusCallbackData) -> None:
     """
-    Process Tavus callback data in the background
-    This function only stores the transcript data without any extraction logic
+    Process Tavus callback data from the inbox
+    Stores the transcript and runs the onboarding pipeline; raises on failure so the job is retried
     """
     db = await get_async_mongodb_db()
     
     try:
-        print(f"Processing Tavus callback event: {data.event_type}")
+        logger.info(f"Processing Tavus callback event: {data.event_type}")
         
         # Get conversation by ID
         conversation = await db.tavus_conversations.find_one({"conversation_id": data.conversation_id})
         
         # If conversation not found, log and return
         if not conversation:
-            print(f"No conversation found with ID: {data.conversation_id}")
+            logger.warning(f"No conversation found with ID: {data.conversation_id}")
             return
             
         # Process application.transcription_ready events
@@ -273,70 +231,59 @@ async def process_tavus_callback(data: TavusCallbackData) -> None:
                 update_data
             )
             
-            print(f"Updated conversation {data.conversation_id} with transcript")
+            logger.info(f"Updated conversation {data.conversation_id} with transcript")
             
             # Get user ID from the conversation
             user_id = conversation["user_id"]
             
-            # Process the transcript to extract company information using OpenAI
-            try:
-                processing_result = await process_conversation_transcript(user_id=user_id, conversation_id=data.conversation_id)
-                print(f"Transcript processing result: {processing_result}")
-                
-                # If processing was not successful, still update onboarding state but log the error
-                if not processing_result.get("success"):
-                    print(f"Error processing transcript: {processing_result.get('error')}")
-            except Exception as e:
-                print(f"Error calling transcript processor: {str(e)}")
-                import traceback
-                print(traceback.format_exc())
-
-            obj_user_id = ObjectId(user_id)
-            user_result = await db.users.find_one({"_id": obj_user_id}, {"user_metadata": 1})
-            
-            if user_result:
-                user_metadata = user_result.get("user_metadata", {}) or {}
-                
-                # Find and store similar companies based on user metadata
-                await find_and_store_similar_companies(db, user_id, user_metadata)
-                
-                # Update metadata with conversation status
-                user_metadata["onboarding_state"] = "completed"
-                user_metadata["conversation_id"] = data.conversation_id
-                
-                # Update the user record with the new metadata and set is_onboarded to true
-                await db.users.update_one(
-                    {"_id": obj_user_id},
-                    {
-                        "$set": {
-                            "user_metadata": user_metadata,
-                            "is_onboarded": True,
-                            "updated_at": datetime.now(timezone.utc)
-                        }
-                    }
-                )
-                
-                print(f"Updated user {user_id} onboarding state to completed and is_onboarded to true")
+            # Extract company information, find similar companies and complete onboarding
+            pipeline_result = await run_onboarding_pipeline(user_id, data.conversation_id, full_transcript)
+            if not pipeline_result.get("success"):
+                # Raise so the inbox worker retries the callback with backoff
+                raise RuntimeError(f"Onboarding failed for user {user_id}: {pipeline_result.get('error')}")
+            logger.info(f"Updated user {user_id} onboarding state to completed and is_onboarded to true")
 
     except Exception as e:
-        # Log error but don't raise exception since this is a background task
-        print(f"Error processing Tavus callback: {str(e)}")
+        # Log and re-raise, so the inbox worker schedules a retry
+        logger.error(f"Error processing Tavus callback: {str(e)}")
+        raise
+
+async def run_tavus_callback_job(job: Dict[str, Any]) -> None:
+    """
+    Worker handler for a job of the Tavus inbox
+    
+    Args:
+        job: Claimed job document (payload is the callback data)
+    """
+    await process_tavus_callback(TavusCallbackData.model_validate(job["payload"]))
 
 @router.post("/callback")
 async def tavus_callback(
-    data: TavusCallbackData,
-    background_tasks: BackgroundTasks
+    data: TavusCallbackData
 ) -> Dict[str, Any]:
     """
     Webhook endpoint for Tavus conversation callbacks
+    Persists the callback to the inbox and acknowledges it; the worker pool processes it
     """
     # Verify that the request is from Tavus (you should implement proper validation)
     # For example, check for a shared secret or signature
     
     print(f"Received Tavus callback for event: {data.event_type}")
     
-    # Process the callback data in the background
-    background_tasks.add_task(process_tavus_callback, data)
+    try:
+        # A retried callback maps to the job already in the inbox
+        await tavus_inbox.enqueue(
+            "tavus_callback",
+            data.model_dump(),
+            dedupe_key=f"{data.conversation_id}:{data.event_type}"
+        )
+    except Exception as e:
+        # Not acknowledged, so Tavus retries the callback
+        logger.error(f"Error storing Tavus callback: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Could not store the callback"
+        )
     
     return {"status": "success"}
 
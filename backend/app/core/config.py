@@ -47,6 +47,128 @@ class Settings(BaseSettings):
     # Here Maps API
     HERE_API_KEY: str = os.getenv("HERE_API_KEY", "")
     
+    # Pooled HTTP clients for upstream APIs (QLoo, Here Maps)
+    UPSTREAM_HTTP_MAX_CONNECTIONS: int = int(os.getenv("UPSTREAM_HTTP_MAX_CONNECTIONS", "100"))
+    UPSTREAM_HTTP_MAX_KEEPALIVE_CONNECTIONS: int = int(os.getenv("UPSTREAM_HTTP_MAX_KEEPALIVE_CONNECTIONS", "20"))
+    UPSTREAM_HTTP_KEEPALIVE_EXPIRY: float = float(os.getenv("UPSTREAM_HTTP_KEEPALIVE_EXPIRY", "60"))
+    UPSTREAM_HTTP_CONNECT_TIMEOUT: float = float(os.getenv("UPSTREAM_HTTP_CONNECT_TIMEOUT", "10"))
+    UPSTREAM_HTTP_READ_TIMEOUT: float = float(os.getenv("UPSTREAM_HTTP_READ_TIMEOUT", "300"))
+    UPSTREAM_HTTP_WRITE_TIMEOUT: float = float(os.getenv("UPSTREAM_HTTP_WRITE_TIMEOUT", "30"))
+    UPSTREAM_HTTP_POOL_TIMEOUT: float = float(os.getenv("UPSTREAM_HTTP_POOL_TIMEOUT", "30"))
+    UPSTREAM_HTTP2: bool = os.getenv("UPSTREAM_HTTP2", "false").lower() == "true"
+    
+    # Maximum number of tag/audience/location resolvers running at once
+    QLOO_RESOLVER_CONCURRENCY: int = int(os.getenv("QLOO_RESOLVER_CONCURRENCY", "8"))
+    
+    # Two-stage planner: pick filter_type first, then use a schema slimmed to that entity type
+    QLOO_PLANNER_SLIM_SCHEMAS: bool = os.getenv("QLOO_PLANNER_SLIM_SCHEMAS", "true").lower() == "true"
+    
+    # Accept an unambiguous tag search result locally instead of asking the LLM
+    QLOO_FAST_MATCH_ENABLED: bool = os.getenv("QLOO_FAST_MATCH_ENABLED", "true").lower() == "true"
+    QLOO_FAST_MATCH_THRESHOLD: float = float(os.getenv("QLOO_FAST_MATCH_THRESHOLD", "0.92"))
+    QLOO_FAST_MATCH_MARGIN: float = float(os.getenv("QLOO_FAST_MATCH_MARGIN", "0.15"))
+    
+    # Select IDs for all ambiguous tag/audience resolvers with a single LLM call
+    QLOO_BATCH_SELECTION: bool = os.getenv("QLOO_BATCH_SELECTION", "true").lower() == "true"
+    
+    # QLoo tag search cache (in-process LRU + MongoDB TTL collection)
+    QLOO_TAG_CACHE_TTL_SECONDS: int = int(os.getenv("QLOO_TAG_CACHE_TTL_SECONDS", str(7 * 24 * 3600)))
+    QLOO_TAG_CACHE_MAX_ENTRIES: int = int(os.getenv("QLOO_TAG_CACHE_MAX_ENTRIES", "2048"))
+    
+    # QLoo insights cache (stale entries are served while a background refresh runs)
+    QLOO_INSIGHTS_CACHE_TTL_SECONDS: int = int(os.getenv("QLOO_INSIGHTS_CACHE_TTL_SECONDS", str(6 * 3600)))
+    QLOO_INSIGHTS_CACHE_STALE_SECONDS: int = int(os.getenv("QLOO_INSIGHTS_CACHE_STALE_SECONDS", str(24 * 3600)))
+    QLOO_INSIGHTS_CACHE_MAX_ENTRIES: int = int(os.getenv("QLOO_INSIGHTS_CACHE_MAX_ENTRIES", "512"))
+    
+    # Geocoding cache (normalised location -> coordinates) and offline gazetteer
+    GEOCODE_CACHE_TTL_SECONDS: int = int(os.getenv("GEOCODE_CACHE_TTL_SECONDS", str(90 * 24 * 3600)))
+    GEOCODE_CACHE_MAX_ENTRIES: int = int(os.getenv("GEOCODE_CACHE_MAX_ENTRIES", "4096"))
+    GEOCODE_GAZETTEER_ENABLED: bool = os.getenv("GEOCODE_GAZETTEER_ENABLED", "true").lower() == "true"
+    
+    # Token budgets for API payloads embedded in LLM prompts
+    PROMPT_TAG_SELECTION_TOKEN_BUDGET: int = int(os.getenv("PROMPT_TAG_SELECTION_TOKEN_BUDGET", "2000"))
+    PROMPT_AUDIENCE_SELECTION_TOKEN_BUDGET: int = int(os.getenv("PROMPT_AUDIENCE_SELECTION_TOKEN_BUDGET", "2000"))
+    PROMPT_CAMPAIGN_INSIGHTS_TOKEN_BUDGET: int = int(os.getenv("PROMPT_CAMPAIGN_INSIGHTS_TOKEN_BUDGET", "6000"))
+    
+    # Token budgets shared by the variable sections (company details, transcript, Qloo data) of the campaign prompts
+    PROMPT_INITIAL_PLANNING_TOKEN_BUDGET: int = int(os.getenv("PROMPT_INITIAL_PLANNING_TOKEN_BUDGET", "8000"))
+    PROMPT_ENHANCED_CAMPAIGN_TOKEN_BUDGET: int = int(os.getenv("PROMPT_ENHANCED_CAMPAIGN_TOKEN_BUDGET", "14000"))
+    
+    # Campaign generation job queue: "inprocess" runs the worker pool inside the API process,
+    # "external" leaves it to `python -m app.worker`
+    CAMPAIGN_WORKER_MODE: str = os.getenv("CAMPAIGN_WORKER_MODE", "inprocess")
+    CAMPAIGN_WORKER_CONCURRENCY: int = int(os.getenv("CAMPAIGN_WORKER_CONCURRENCY", "4"))
+    CAMPAIGN_JOB_LEASE_SECONDS: int = int(os.getenv("CAMPAIGN_JOB_LEASE_SECONDS", "120"))
+    CAMPAIGN_JOB_MAX_ATTEMPTS: int = int(os.getenv("CAMPAIGN_JOB_MAX_ATTEMPTS", "3"))
+    CAMPAIGN_JOB_BACKOFF_SECONDS: int = int(os.getenv("CAMPAIGN_JOB_BACKOFF_SECONDS", "30"))
+    CAMPAIGN_JOB_POLL_INTERVAL_SECONDS: float = float(os.getenv("CAMPAIGN_JOB_POLL_INTERVAL_SECONDS", "2"))
+    
+    # Tavus callback inbox: callbacks are persisted and processed by a bounded worker pool
+    TAVUS_INBOX_WORKER_MODE: str = os.getenv("TAVUS_INBOX_WORKER_MODE", "inprocess")
+    TAVUS_INBOX_WORKER_CONCURRENCY: int = int(os.getenv("TAVUS_INBOX_WORKER_CONCURRENCY", "2"))
+    TAVUS_INBOX_LEASE_SECONDS: int = int(os.getenv("TAVUS_INBOX_LEASE_SECONDS", "120"))
+    TAVUS_INBOX_MAX_ATTEMPTS: int = int(os.getenv("TAVUS_INBOX_MAX_ATTEMPTS", "5"))
+    TAVUS_INBOX_BACKOFF_SECONDS: int = int(os.getenv("TAVUS_INBOX_BACKOFF_SECONDS", "15"))
+    # Finished callbacks are deleted after this long; a retried webhook is only deduplicated until then
+    TAVUS_INBOX_RETENTION_SECONDS: int = int(os.getenv("TAVUS_INBOX_RETENTION_SECONDS", str(7 * 24 * 3600)))
+    
+    # Per-node checkpoints of campaign/Qloo workflow state, so retries resume after the last completed node
+    WORKFLOW_CHECKPOINTS_ENABLED: bool = os.getenv("WORKFLOW_CHECKPOINTS_ENABLED", "true").lower() == "true"
+    WORKFLOW_CHECKPOINT_TTL_SECONDS: int = int(os.getenv("WORKFLOW_CHECKPOINT_TTL_SECONDS", str(3 * 24 * 3600)))
+    
+    # Campaign progress events (server-sent events stream)
+    PROGRESS_EVENTS_TTL_SECONDS: int = int(os.getenv("PROGRESS_EVENTS_TTL_SECONDS", str(24 * 3600)))
+    PROGRESS_CHANGE_STREAMS_ENABLED: bool = os.getenv("PROGRESS_CHANGE_STREAMS_ENABLED", "true").lower() == "true"
+    PROGRESS_SSE_KEEPALIVE_SECONDS: int = int(os.getenv("PROGRESS_SSE_KEEPALIVE_SECONDS", "15"))
+    
+    # Stream the enhanced campaign plan and publish each section as soon as it is complete
+    CAMPAIGN_PLAN_STREAMING: bool = os.getenv("CAMPAIGN_PLAN_STREAMING", "true").lower() == "true"
+    
+    # Plan Qloo parameters from company metadata alongside initial planning; the plan is kept when
+    # the generated qloo_query is covered by the metadata at least this much (0 to 1)
+    QLOO_SPECULATIVE_PLANNING: bool = os.getenv("QLOO_SPECULATIVE_PLANNING", "true").lower() == "true"
+    QLOO_SPECULATIVE_MIN_SIMILARITY: float = float(os.getenv("QLOO_SPECULATIVE_MIN_SIMILARITY", "0.6"))
+    
+    # Reuse the Qloo results resolved at onboarding (per-user bundle) when generating campaigns
+    QLOO_ONBOARDING_BUNDLE_ENABLED: bool = os.getenv("QLOO_ONBOARDING_BUNDLE_ENABLED", "true").lower() == "true"
+    QLOO_ONBOARDING_BUNDLE_MAX_AGE_SECONDS: int = int(os.getenv("QLOO_ONBOARDING_BUNDLE_MAX_AGE_SECONDS", str(7 * 24 * 3600)))
+    
+    # Transcripts longer than the threshold are split on turn boundaries and extracted chunk by chunk
+    TRANSCRIPT_CHUNKING_THRESHOLD_TOKENS: int = int(os.getenv("TRANSCRIPT_CHUNKING_THRESHOLD_TOKENS", "6000"))
+    TRANSCRIPT_CHUNK_TOKENS: int = int(os.getenv("TRANSCRIPT_CHUNK_TOKENS", "3000"))
+    TRANSCRIPT_CHUNK_CONCURRENCY: int = int(os.getenv("TRANSCRIPT_CHUNK_CONCURRENCY", "4"))
+    
+    # Live extraction of company info from transcript deltas while the onboarding call runs;
+    # competitor discovery starts after STABLE_UPDATES updates that keep the name and similar details
+    LIVE_EXTRACTION_ENABLED: bool = os.getenv("LIVE_EXTRACTION_ENABLED", "true").lower() == "true"
+    LIVE_EXTRACTION_MIN_NEW_TOKENS: int = int(os.getenv("LIVE_EXTRACTION_MIN_NEW_TOKENS", "300"))
+    LIVE_EXTRACTION_STABLE_UPDATES: int = int(os.getenv("LIVE_EXTRACTION_STABLE_UPDATES", "2"))
+    LIVE_EXTRACTION_STABLE_SIMILARITY: float = float(os.getenv("LIVE_EXTRACTION_STABLE_SIMILARITY", "0.7"))
+    LIVE_EXTRACTION_MIN_COVERAGE: float = float(os.getenv("LIVE_EXTRACTION_MIN_COVERAGE", "0.9"))
+    LIVE_EXTRACTION_IDLE_SECONDS: int = int(os.getenv("LIVE_EXTRACTION_IDLE_SECONDS", "3600"))
+    
+    # Leading transcript tokens read by the quick company-name extraction that starts competitor discovery early
+    ONBOARDING_HEADLINE_TOKENS: int = int(os.getenv("ONBOARDING_HEADLINE_TOKENS", "1500"))
+    # Minimum similarity of the headline summary to the extracted details for the early discovery to be kept
+    ONBOARDING_HEADLINE_MIN_SIMILARITY: float = float(os.getenv("ONBOARDING_HEADLINE_MIN_SIMILARITY", "0.6"))
+    
+    # Onboarding transcripts are deduplicated by content hash; a running claim older than
+    # CLAIM_SECONDS is considered abandoned
+    TRANSCRIPT_DEDUPE_TTL_SECONDS: int = int(os.getenv("TRANSCRIPT_DEDUPE_TTL_SECONDS", str(30 * 24 * 3600)))
+    TRANSCRIPT_DEDUPE_CLAIM_SECONDS: int = int(os.getenv("TRANSCRIPT_DEDUPE_CLAIM_SECONDS", "300"))
+    
+    # Exact-match cache of structured-output LLM responses; call sites opt in by name
+    # (qloo_tag_selection, qloo_audience_selection, qloo_batched_selection, qloo_planner_type,
+    # qloo_planner_params, qloo_planner, campaign_initial_planning, campaign_enhanced_plan,
+    # company_info_extraction, company_info_chunk_extraction, company_headline_extraction,
+    # live_company_info_extraction, or * for all)
+    LLM_CACHE_CALL_SITES: str = os.getenv("LLM_CACHE_CALL_SITES", "qloo_tag_selection,qloo_audience_selection,qloo_batched_selection")
+    LLM_CACHE_TTL_SECONDS: int = int(os.getenv("LLM_CACHE_TTL_SECONDS", str(7 * 24 * 3600)))
+    LLM_CACHE_MAX_ENTRIES: int = int(os.getenv("LLM_CACHE_MAX_ENTRIES", "2048"))
+    
+    # Comma-separated emails allowed to use the admin endpoints
+    ADMIN_EMAILS: str = os.getenv("ADMIN_EMAILS", "")
+    
     # Meta Ads Library API
     META_ADS_API_BASE_URL: str = os.getenv("META_ADS_API_BASE_URL", "https://graph.facebook.com/v19.0")
     META_ADS_API_TOKEN: str = os.getenv("META_ADS_API_TOKEN", "")
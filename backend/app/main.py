@@ -1,13 +1,32 @@
+import asyncio
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from app.core.config import settings
 from app.api.routes import router as api_router
+from app.services.qloo import qloo_service
+from app.worker import build_worker_pools
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Open long-lived upstream clients and the in-process worker pools on startup, and close them on shutdown"""
+    await qloo_service.startup()
+    worker_pools = build_worker_pools(inprocess_only=True)
+    for pool in worker_pools:
+        await pool.start()
+    try:
+        yield
+    finally:
+        await asyncio.gather(*(pool.stop() for pool in worker_pools))
+        await qloo_service.shutdown()
 
 app = FastAPI(
     title=settings.PROJECT_NAME,
     description=settings.PROJECT_DESCRIPTION,
     version=settings.VERSION,
     openapi_url=f"{settings.API_V1_STR}/openapi.json",
+    lifespan=lifespan,
 )
 
 # Set up CORS
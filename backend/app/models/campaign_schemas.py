@@ -30,6 +30,16 @@ class CampaignStatusResponse(BaseModel):
 class ListCampaignsResponse(BaseModel):
     campaigns: List[CampaignResponse]
 
+class InsightsWhatIfRequest(BaseModel):
+    # Qloo parameters to change, e.g. {"filter_popularity_min": 0.8, "take": 10}
+    overrides: Dict[str, Any]
+
+class InsightsWhatIfResponse(BaseModel):
+    campaign_id: str
+    params: Dict[str, Any]
+    source: str  # "local" (filtered from the stored entities) or "qloo"
+    entities: List[Dict[str, Any]]
+
 # Detailed campaign models for the campaign details endpoint
 class CampaignObjective(str, Enum):
     """Enumeration of possible campaign objectives."""
@@ -2,7 +2,7 @@ from datetime import datetime, timedelta, timezone
 from typing import Any, Dict, Optional
 
 import httpx
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Query, status
 from fastapi.security import OAuth2PasswordBearer
 from jose import JWTError, jwt
 from pydantic import EmailStr
@@ -210,6 +210,16 @@ async def get_current_user(token: str = Depends(oauth2_scheme)) -> User:
     user_data["id"] = str(user_data.pop("_id"))
     return User(**user_data)
 
+async def get_current_user_with_query_token(
+    token: Optional[str] = Depends(oauth2_scheme),
+    query_token: Optional[str] = Query(None, alias="token")
+) -> User:
+    """
+    Get current authenticated user, also accepting the token as a query parameter
+    (EventSource clients cannot set an Authorization header)
+    """
+    return await get_current_user(token or query_token)
+
 async def get_current_active_user(current_user: User = Depends(get_current_user)) -> User:
     """
     Get current active user
@@ -220,3 +230,15 @@ async def get_current_active_user(current_user: User = Depends(get_current_user)
             detail="Inactive user",
         )
     return current_user
+
+async def get_current_admin_user(current_user: User = Depends(get_current_active_user)) -> User:
+    """
+    Get current user and require that it is listed in ADMIN_EMAILS
+    """
+    admin_emails = {email.strip().lower() for email in settings.ADMIN_EMAILS.split(",") if email.strip()}
+    if current_user.email.lower() not in admin_emails:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Admin privileges required",
+        )
+    return current_user
@@ -0,0 +1,184 @@
+"""
+Two-tier TTL cache (in-process LRU backed by a MongoDB collection with a TTL index)
+used to keep slow-changing upstream API results close to the application
+"""
+import hashlib
+import json
+import logging
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, NamedTuple, Optional
+
+from motor.motor_asyncio import AsyncIOMotorCollection
+
+from app.db.client import get_async_mongodb_db
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# All caches created by the application, by name (used by the admin endpoints)
+cache_registry: Dict[str, "TwoTierCache"] = {}
+
+
+def canonical_key(value: Any) -> str:
+    """
+    Build a stable cache key from a JSON-serialisable value
+
+    Args:
+        value: Value describing the request (dicts are serialised with sorted keys)
+
+    Returns:
+        Hex SHA-256 digest of the canonical JSON form
+    """
+    payload = json.dumps(value, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class CacheEntry(NamedTuple):
+    """A cached value together with the time it was stored (epoch seconds)"""
+    value: Any
+    stored_at: float
+
+    @property
+    def age(self) -> float:
+        """Seconds elapsed since the value was stored"""
+        return time.time() - self.stored_at
+
+
+class TwoTierCache:
+    """In-process LRU cache with an optional MongoDB-backed second tier"""
+
+    def __init__(self, name: str, ttl_seconds: int, max_entries: int = 1024, collection: Optional[str] = None):
+        """
+        Args:
+            name: Cache name used for metrics and the admin endpoints
+            ttl_seconds: Lifetime of an entry in both tiers
+            max_entries: Maximum number of entries kept in process memory
+            collection: MongoDB collection for the persistent tier (memory only when None)
+        """
+        self.name = name
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.collection_name = collection
+        self._memory: "OrderedDict[str, CacheEntry]" = OrderedDict()
+        self._index_ready = False
+        self.stats = {"memory_hits": 0, "mongo_hits": 0, "misses": 0, "writes": 0}
+        cache_registry[name] = self
+
+    async def _collection(self) -> AsyncIOMotorCollection:
+        """Return the backing collection, creating the TTL index on first use"""
+        db = await get_async_mongodb_db()
+        collection = db[self.collection_name]
+        if not self._index_ready:
+            await collection.create_index("expires_at", expireAfterSeconds=0)
+            self._index_ready = True
+        return collection
+
+    def _remember(self, key: str, entry: CacheEntry) -> None:
+        """Store an entry in the in-process tier, evicting the least recently used ones"""
+        self._memory[key] = entry
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    async def get_entry(self, key: str) -> Optional[CacheEntry]:
+        """
+        Look up an entry in memory first, then in MongoDB
+
+        Args:
+            key: Cache key
+
+        Returns:
+            The cached entry, or None on a miss
+        """
+        entry = self._memory.get(key)
+        if entry is not None:
+            if entry.age < self.ttl_seconds:
+                self._memory.move_to_end(key)
+                self.stats["memory_hits"] += 1
+                return entry
+            del self._memory[key]
+
+        if self.collection_name:
+            try:
+                collection = await self._collection()
+                doc = await collection.find_one({"_id": key})
+                # The TTL monitor only runs periodically, so check the age explicitly as well
+                if doc and time.time() - doc["stored_at"] < self.ttl_seconds:
+                    entry = CacheEntry(json.loads(doc["payload"]), doc["stored_at"])
+                    self._remember(key, entry)
+                    self.stats["mongo_hits"] += 1
+                    return entry
+            except Exception as e:
+                logger.warning(f"Cache '{self.name}' lookup failed: {e}")
+
+        self.stats["misses"] += 1
+        return None
+
+    async def get(self, key: str) -> Any:
+        """Return the cached value for a key, or None on a miss"""
+        entry = await self.get_entry(key)
+        return entry.value if entry else None
+
+    async def set(self, key: str, value: Any) -> None:
+        """
+        Store a value in both tiers
+
+        Args:
+            key: Cache key
+            value: JSON-serialisable value
+        """
+        stored_at = time.time()
+        self._remember(key, CacheEntry(value, stored_at))
+        self.stats["writes"] += 1
+
+        if self.collection_name:
+            try:
+                collection = await self._collection()
+                await collection.replace_one(
+                    {"_id": key},
+                    {
+                        "_id": key,
+                        # Stored as JSON so arbitrary API payload keys survive the round trip
+                        "payload": json.dumps(value, default=str),
+                        "stored_at": stored_at,
+                        "expires_at": datetime.now(timezone.utc) + timedelta(seconds=self.ttl_seconds)
+                    },
+                    upsert=True
+                )
+            except Exception as e:
+                logger.warning(f"Cache '{self.name}' write failed: {e}")
+
+    async def invalidate(self, key: Optional[str] = None) -> int:
+        """
+        Remove one entry, or every entry when no key is given
+
+        Args:
+            key: Cache key to remove
+
+        Returns:
+            Number of persistent entries removed
+        """
+        if key is None:
+            self._memory.clear()
+        else:
+            self._memory.pop(key, None)
+
+        deleted = 0
+        if self.collection_name:
+            collection = await self._collection()
+            result = await collection.delete_many({} if key is None else {"_id": key})
+            deleted = result.deleted_count
+        logger.info(f"Invalidated cache '{self.name}' ({deleted} persistent entries removed)")
+        return deleted
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Return hit/miss counters and the current in-memory size"""
+        hits = self.stats["memory_hits"] + self.stats["mongo_hits"]
+        lookups = hits + self.stats["misses"]
+        return {
+            **self.stats,
+            "memory_entries": len(self._memory),
+            "hit_rate": round(hits / lookups, 4) if lookups else 0.0
+        }
@@ -2,13 +2,14 @@
 Campaign processing service for generating ad campaigns from conversation transcripts
 using LangChain, LangGraph, and OpenAI GPT-4.1
 """
+import asyncio
 import json
 import logging
-from typing import Dict, List, Any, Optional, TypedDict, Annotated, Sequence
+from typing import Dict, List, Any, Optional, Tuple, TypedDict, Annotated, Sequence
 import httpx
 
 from traceloop.sdk import Traceloop
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, ValidationError
 from langchain_openai import ChatOpenAI
 from langchain_core.prompts import ChatPromptTemplate
 from langgraph.graph import StateGraph, END, START
@@ -18,7 +19,14 @@ from bson.objectid import ObjectId
 
 from app.core.config import settings
 from app.db.client import get_async_mongodb_db
-from app.services.qloo import qloo_service, QlooParameterSet
+from app.services.qloo import qloo_service, QlooParameterSet, fingerprint_api_params
+from app.services.prompt_budget import budget_prompt_sections
+from app.services.job_queue import JobQueue, PermanentJobError
+from app.services.checkpoints import checkpoint_store
+from app.services.progress import progress_broker
+from app.services import llm_cache
+from app.services.matcher import similarity
+from app.services.insights_bundle import load_insights_bundle
 
 # Initialize traceloop for observability
 Traceloop.init(
@@ -136,6 +144,47 @@ class EnhancedCampaignOutput(BaseModel):
     kpis: List[str] = Field(..., description="Key Performance Indicators to measure campaign success")
     budget_allocation_strategy: str = Field(..., description="Strategy for allocating the campaign budget")
 
+class PlanSectionTracker:
+    """
+    Detects completed sections in the partial JSON snapshots of a streamed EnhancedCampaignOutput
+
+    The model writes the keys one after another, so a key is complete as soon as a
+    later key appears (and every key is complete when the stream ends). Creative ideas
+    are reported one by one as each list item completes.
+    """
+
+    def __init__(self):
+        self.emitted_sections = set()
+        self.emitted_ideas = 0
+
+    def update(self, partial: Dict[str, Any], final: bool = False) -> List[Tuple[str, Dict[str, Any]]]:
+        """
+        Args:
+            partial: Latest partial snapshot of the plan
+            final: Whether the stream has ended
+
+        Returns:
+            (event, data) pairs for sections and creative ideas completed since the last update
+        """
+        events = []
+        keys = list(partial)
+        for index, section in enumerate(keys):
+            complete = final or index < len(keys) - 1
+            if section == "creative_ideas":
+                ideas = partial.get("creative_ideas") or []
+                completed_ideas = len(ideas) if complete else max(len(ideas) - 1, 0)
+                while self.emitted_ideas < completed_ideas:
+                    try:
+                        idea = CreativeIdea.model_validate(ideas[self.emitted_ideas]).model_dump()
+                        events.append(("creative_idea", {"index": self.emitted_ideas, "idea": idea}))
+                    except ValidationError as e:
+                        logger.warning(f"Skipping invalid streamed creative idea: {e}")
+                    self.emitted_ideas += 1
+            elif complete and section not in self.emitted_sections:
+                self.emitted_sections.add(section)
+                events.append(("plan_section", {"section": section, "content": partial[section]}))
+        return events
+
 class CampaignState(TypedDict):
     """State for the campaign generation workflow"""
     campaign_id: str
@@ -145,9 +194,36 @@ class CampaignState(TypedDict):
     company_details: Optional[str]
     title: Optional[str]
     qloo_query: Optional[str]
+    qloo_params: Optional[QlooParameterSet]
     qloo_data: Optional[List[Dict[str, Any]]]
     enhanced_campaign: Optional[EnhancedCampaignOutput]
     error: Optional[str]
+    completed_nodes: List[str]
+    prompt_budget: Dict[str, Any]
+
+# Pydantic models used to restore a checkpointed CampaignState
+CAMPAIGN_STATE_MODELS = {"qloo_params": QlooParameterSet, "enhanced_campaign": EnhancedCampaignOutput}
+
+async def _campaign_job_given_up(job: Dict[str, Any]) -> None:
+    """Record the error of a campaign whose job kept losing its worker and will not run again"""
+    campaign_id = job["payload"]["campaign_id"]
+    message = job.get("last_error") or "Campaign processing was interrupted too many times"
+    db = await get_async_mongodb_db()
+    await db.campaigns.update_one(
+        {"_id": ObjectId(campaign_id)},
+        {"$set": {"status": "error", "error_message": message, "updated_at": datetime.now()}}
+    )
+    await progress_broker.publish(campaign_id, "failed", {"message": message})
+
+# Durable queue of campaign generation jobs, drained by app.worker
+campaign_jobs = JobQueue(
+    "campaign_jobs",
+    collection="campaign_jobs",
+    lease_seconds=settings.CAMPAIGN_JOB_LEASE_SECONDS,
+    max_attempts=settings.CAMPAIGN_JOB_MAX_ATTEMPTS,
+    backoff_seconds=settings.CAMPAIGN_JOB_BACKOFF_SECONDS,
+    on_give_up=_campaign_job_given_up
+)
 
 class CampaignService:
     """Service for processing and generating ad campaigns"""
@@ -160,6 +236,9 @@ class CampaignService:
             temperature=0.2
         )
         
+        # Running campaign workflows by campaign ID, so they can be cancelled
+        self._tasks: Dict[str, asyncio.Task] = {}
+        
         # Set up LangGraph workflow
         self.setup_langgraph()
 
@@ -168,9 +247,13 @@ class CampaignService:
         self.workflow = StateGraph(CampaignState)
         
         # Add nodes for each step in the campaign generation process
-        self.workflow.add_node("initial_planning", self.initial_planning)
-        self.workflow.add_node("fetch_qloo_data", self.fetch_qloo_data)
-        self.workflow.add_node("generate_enhanced_campaign", self.generate_enhanced_campaign)
+        # Each node is checkpointed so a retried campaign resumes after the last completed node
+        for name, node in (
+            ("initial_planning", self.initial_planning),
+            ("fetch_qloo_data", self.fetch_qloo_data),
+            ("generate_enhanced_campaign", self.generate_enhanced_campaign),
+        ):
+            self.workflow.add_node(name, checkpoint_store.node("campaign", name, node, "campaign_id"))
 
         # Define the workflow edges
         self.workflow.add_edge(START, "initial_planning")
@@ -180,15 +263,62 @@ class CampaignService:
 
         self.workflow_app = self.workflow.compile()
 
-    def initial_planning(self, state: CampaignState) -> CampaignState:
+    @staticmethod
+    def _speculative_qloo_query(state: CampaignState) -> str:
+        """Qloo query built from the company metadata alone, available before initial planning"""
+        return f"Target audience, tastes and interests of customers for {state['company_name']}: {state['company_details']}"
+
+    async def _speculative_qloo_params(self, state: CampaignState) -> QlooParameterSet:
+        """Plan and resolve Qloo parameters from the company metadata while initial planning runs"""
+        bundle = await load_insights_bundle(state["user_id"])
+        return await qloo_service.qloo_llm(
+            company_name=state["company_name"],
+            company_details=state["company_details"],
+            query=self._speculative_qloo_query(state),
+            known_resolutions=bundle["resolutions"] if bundle else None
+        )
+
+    async def _use_speculative_plan(self, state: CampaignState, speculative: asyncio.Task) -> None:
+        """
+        Keep the speculative Qloo parameters if the generated query asks for the same thing
+        
+        The speculative plan is kept when the content of the generated qloo_query is covered
+        by the company metadata it was planned from; otherwise it is cancelled and
+        fetch_qloo_data plans from the generated query as usual.
+        
+        Args:
+            state: State after initial planning
+            speculative: Task planning from the company metadata
+        """
+        score = similarity(state["qloo_query"], self._speculative_qloo_query(state))
+        if score < settings.QLOO_SPECULATIVE_MIN_SIMILARITY:
+            logger.info(f"Discarding speculative Qloo plan (similarity {score:.2f})")
+            speculative.cancel()
+            return
+        
+        try:
+            state["qloo_params"] = await speculative
+            logger.info(f"Keeping speculative Qloo plan (similarity {score:.2f})")
+        except Exception as e:
+            logger.warning(f"Speculative Qloo planning failed, planning from the generated query: {e}")
+
+    async def initial_planning(self, state: CampaignState) -> CampaignState:
         """Generate campaign title and Qloo query in a single step"""
+        # Start Qloo planning from the company metadata alongside the planning call
+        speculative = None
+        if settings.QLOO_SPECULATIVE_PLANNING and state["company_details"]:
+            speculative = asyncio.create_task(self._speculative_qloo_params(state))
+            # A discarded plan's failure is never awaited; mark it as retrieved
+            speculative.add_done_callback(lambda task: task.cancelled() or task.exception())
         try:
-            # Extract messages from transcript for the prompt
-            messages_text = ""
-            for msg in state["transcript"]:
-                sender = msg.get("sender", "unknown")
-                text = msg.get("text", "")
-                messages_text += f"{sender}: {text}\n\n"
+            # Fit the company details and transcript to the prompt's token budget
+            sections, decisions = budget_prompt_sections(
+                "initial_planning",
+                settings.PROMPT_INITIAL_PLANNING_TOKEN_BUDGET,
+                state["company_details"],
+                state["transcript"]
+            )
+            state["prompt_budget"] = {**state.get("prompt_budget", {}), "initial_planning": decisions}
             
             # Create the prompt for initial planning
             prompt = ChatPromptTemplate.from_messages([
@@ -207,29 +337,32 @@ class CampaignService:
                 ("human", f"""
                 Company Name: {state["company_name"]}
                 
-                Company Details: {state["company_details"]}
+                Company Details: {sections["company_details"]}
                 
                 Conversation Transcript:
-                {messages_text}
+                {sections["transcript"]}
                 
                 Generate both a campaign title and a Qloo query for finding relevant audience data:
                 """)
             ])
             
-            # Bind the schema to the LLM for structured output
-            model_with_structure = self.llm.with_structured_output(InitialPlanningOutput)
-            
-            # Create and invoke the chain
-            chain = prompt | model_with_structure
-            result = chain.invoke({})
+            # Invoke the structured-output call (served from the LLM cache when opted in)
+            result = await llm_cache.ainvoke_structured(self.llm, InitialPlanningOutput, prompt, "campaign_initial_planning")
             
             # Update state with the generated title and query
             state["title"] = result.title
             state["qloo_query"] = result.qloo_query
+            await progress_broker.publish(state["campaign_id"], "planning_completed", {"title": result.title})
+            
+            if speculative:
+                await self._use_speculative_plan(state, speculative)
             
         except Exception as e:
             logger.error(f"Error in initial planning: {e}")
             state["error"] = f"Initial planning error: {str(e)}"
+        finally:
+            if speculative and not speculative.done():
+                speculative.cancel()
             
         return state
     
@@ -240,18 +373,33 @@ class CampaignService:
                 state["error"] = "No query available to fetch Qloo data"
                 return state
                 
-            # Generate parameters using qloo_llm
-            parameters = await qloo_service.qloo_llm(
-                company_name=state["company_name"],
-                company_details=state["company_details"],
-                query=state["qloo_query"]
-            )
+            # The onboarding bundle holds tag/audience IDs and entities already resolved for this user
+            bundle = await load_insights_bundle(state["user_id"])
+            
+            # Generate parameters using qloo_llm, unless the speculative plan was kept;
+            # only resolvers the campaign query changes are re-resolved
+            parameters = state.get("qloo_params")
+            if parameters is None:
+                parameters = await qloo_service.qloo_llm(
+                    company_name=state["company_name"],
+                    company_details=state["company_details"],
+                    query=state["qloo_query"],
+                    checkpoint_key=state["campaign_id"],
+                    known_resolutions=bundle["resolutions"] if bundle else None
+                )
+                state["qloo_params"] = parameters
+            await progress_broker.publish(state["campaign_id"], "qloo_params_resolved", {"entity_type": parameters.filter_type})
             
-            # Get insights from Qloo API
-            insights = await qloo_service.get_insights(params=parameters)
+            # Get insights from Qloo API, or reuse the bundle entities for an identical request
+            if bundle and bundle.get("entities") and bundle.get("fingerprint") == fingerprint_api_params(parameters.to_api_params()):
+                logger.info(f"Reusing onboarding Qloo entities for campaign {state['campaign_id']}")
+                insights = bundle["entities"]
+            else:
+                insights = await qloo_service.get_insights(params=parameters)
             
             # Update state with the fetched data
             state["qloo_data"] = insights
+            await progress_broker.publish(state["campaign_id"], "insights_fetched", {"count": len(insights or [])})
             
         except Exception as e:
             logger.error(f"Error fetching Qloo data: {e}")
@@ -259,15 +407,18 @@ class CampaignService:
             
         return state
     
-    def generate_enhanced_campaign(self, state: CampaignState) -> CampaignState:
+    async def generate_enhanced_campaign(self, state: CampaignState) -> CampaignState:
         """Generate a complete enhanced campaign based on all the collected data"""
         try:
-            # Extract messages from transcript for the prompt
-            messages_text = ""
-            for msg in state["transcript"]:
-                sender = msg.get("sender", "unknown")
-                text = msg.get("text", "")
-                messages_text += f"{sender}: {text}\n\n"
+            # Fit the company details, transcript and Qloo data to the prompt's token budget
+            sections, decisions = budget_prompt_sections(
+                "enhanced_campaign",
+                settings.PROMPT_ENHANCED_CAMPAIGN_TOKEN_BUDGET,
+                state["company_details"],
+                state["transcript"],
+                state["qloo_data"]
+            )
+            state["prompt_budget"] = {**state.get("prompt_budget", {}), "enhanced_campaign": decisions}
             
             # Extract audience IDs from Qloo data for use in the prompt
             audience_ids = []
@@ -278,11 +429,9 @@ class CampaignService:
             
             # Format Qloo data for the prompt - escaping curly braces to avoid template variable interpretation
             if state["qloo_data"]:
-                # Use repr to convert the dictionary to a string and preserve escape sequences
-                # Then replace single quotes with double quotes for valid JSON format
-                qloo_data_str = repr(state["qloo_data"]).replace("'", "\"")
-                # Escape curly braces to avoid template variable interpretation
-                qloo_data_summary = qloo_data_str.replace("{", "{{").replace("}", "}}")
+                # Only the fields the strategist prompt needs, minified and within the section budget;
+                # escape curly braces to avoid template variable interpretation
+                qloo_data_summary = sections["qloo_data"].replace("{", "{{").replace("}", "}}")
             else:
                 qloo_data_summary = "No data available"
             
@@ -308,27 +457,27 @@ class CampaignService:
                 Company Name: {state["company_name"]}
                 Campaign Title: {state["title"]}
                 
-                Company Details: {state["company_details"]}
+                Company Details: {sections["company_details"]}
                 
                 Audience Data & Insights:
                 {qloo_data_summary}
                 
                 Conversation Transcript:
-                {messages_text}
+                {sections["transcript"]}
                 
                 Generate a complete enhanced campaign plan:
                 """)
             ])
             
-            # Bind the schema to the LLM for structured output
-            model_with_structure = self.llm.with_structured_output(EnhancedCampaignOutput)
-            
-            # Create and invoke the chain
-            chain = prompt | model_with_structure
-            result = chain.invoke({})
+            if settings.CAMPAIGN_PLAN_STREAMING:
+                # Stream the plan and publish each section as soon as it is complete
+                result = await self._stream_enhanced_campaign(prompt, state["campaign_id"])
+            else:
+                result = await llm_cache.ainvoke_structured(self.llm, EnhancedCampaignOutput, prompt, "campaign_enhanced_plan")
             
             # Update state with the generated enhanced campaign
             state["enhanced_campaign"] = result
+            await progress_broker.publish(state["campaign_id"], "plan_generated")
             
         except Exception as e:
             logger.error(f"Error generating enhanced campaign: {e}")
@@ -336,6 +485,54 @@ class CampaignService:
             
         return state
 
+    async def _stream_enhanced_campaign(self, prompt: ChatPromptTemplate, campaign_id: str) -> EnhancedCampaignOutput:
+        """
+        Generate the enhanced campaign with a streamed structured output
+        
+        Partial JSON is parsed as tokens arrive; completed sections and creative ideas are
+        published as progress events, and the final object is validated against the schema.
+        
+        Args:
+            prompt: Enhanced campaign prompt
+            campaign_id: ID of the campaign the events belong to
+            
+        Returns:
+            The validated enhanced campaign
+        """
+        tracker = PlanSectionTracker()
+        
+        # A regenerated campaign with an identical prompt is served from the LLM cache
+        cache_key = None
+        if llm_cache.is_enabled("campaign_enhanced_plan"):
+            cache_key = llm_cache.response_key(self.llm, EnhancedCampaignOutput, llm_cache.render_messages(prompt))
+            cached = await llm_cache.get_cached("campaign_enhanced_plan", cache_key)
+            if cached is not None:
+                for event, data in tracker.update(cached, final=True):
+                    await progress_broker.publish(campaign_id, event, data)
+                return EnhancedCampaignOutput.model_validate(cached)
+        
+        # A JSON schema (rather than the model class) makes the output parser yield partial objects
+        model_with_structure = self.llm.with_structured_output(
+            EnhancedCampaignOutput.model_json_schema(), method="json_schema"
+        )
+        chain = prompt | model_with_structure
+        
+        partial: Dict[str, Any] = {}
+        async for chunk in chain.astream({}):
+            if not isinstance(chunk, dict):
+                continue
+            partial = chunk
+            for event, data in tracker.update(partial):
+                await progress_broker.publish(campaign_id, event, data)
+        
+        for event, data in tracker.update(partial, final=True):
+            await progress_broker.publish(campaign_id, event, data)
+        
+        result = EnhancedCampaignOutput.model_validate(partial)
+        if cache_key:
+            await llm_cache.llm_response_cache.set(cache_key, result.model_dump(mode="json"))
+        return result
+
     async def process_campaign(self, campaign_id: str) -> Dict[str, Any]:
         """
         Process a campaign from the database and generate an ad campaign
@@ -351,17 +548,18 @@ class CampaignService:
             
             # Fetch the campaign from database
             campaign = await db.campaigns.find_one({"_id": ObjectId(campaign_id)})
+            # Missing documents are reported as not retryable
             if not campaign:
-                return {"success": False, "error": f"Campaign not found with ID: {campaign_id}"}
+                return {"success": False, "retryable": False, "error": f"Campaign not found with ID: {campaign_id}"}
             
             user_id = campaign.get("user_id")
             if not user_id:
-                return {"success": False, "error": "Campaign has no associated user ID"}
+                return {"success": False, "retryable": False, "error": "Campaign has no associated user ID"}
             
             # Get user metadata for company info
             user_result = await db.users.find_one({"_id": ObjectId(user_id)}, {"user_metadata": 1})
             if not user_result:
-                return {"success": False, "error": f"User not found with ID: {user_id}"}
+                return {"success": False, "retryable": False, "error": f"User not found with ID: {user_id}"}
             
             user_metadata = user_result.get("user_metadata", {}) or {}
             company_name = user_metadata.get("company_name", "Unknown Company")
@@ -376,11 +574,19 @@ class CampaignService:
                 company_details=company_details,
                 title=None,
                 qloo_query=None,
+                qloo_params=None,
                 qloo_data=None,
-                ad_campaign=None,
-                error=None
+                enhanced_campaign=None,
+                error=None,
+                completed_nodes=[],
+                prompt_budget={}
             )
             
+            # Resume from the last completed node of a previous attempt
+            checkpoint = await checkpoint_store.load("campaign", campaign_id, CAMPAIGN_STATE_MODELS)
+            if checkpoint:
+                initial_state.update({**checkpoint, "error": None})
+            
             # Execute the workflow
             final_state = await self.workflow_app.ainvoke(initial_state)
             
@@ -396,6 +602,7 @@ class CampaignService:
                         "updated_at": datetime.now()
                     }}
                 )
+                await progress_broker.publish(campaign_id, "error", {"message": final_state["error"]})
                 
                 return {"success": False, "error": final_state["error"]}
             
@@ -417,12 +624,21 @@ class CampaignService:
                     "todo_list": [item.model_dump() for item in enhanced_campaign.todo_list],
                     "kpis": enhanced_campaign.kpis,
                     "budget_allocation_strategy": enhanced_campaign.budget_allocation_strategy,
+                    # Kept so insights can be re-queried with tweaked parameters without re-planning
+                    "qloo_params": final_state["qloo_params"].model_dump(mode="json") if final_state.get("qloo_params") else None,
+                    "qloo_entities": final_state.get("qloo_data") or [],
+                    # What was trimmed to fit each prompt's token budget
+                    "prompt_budget": final_state.get("prompt_budget", {}),
                     "updated_at": datetime.now()
                 }}
             )
             
             if update_result.modified_count == 0:
                 logger.warning(f"Campaign {campaign_id} was not updated")
+            
+            # The campaign is complete; its checkpoints are no longer needed
+            await checkpoint_store.clear(campaign_id)
+            await progress_broker.publish(campaign_id, "processed", {"title": final_state["title"]})
                 
             return {
                 "success": True,
@@ -431,6 +647,34 @@ class CampaignService:
                 "status": "processed"
             }
             
+        except asyncio.CancelledError:
+            # Pool shutdown and lost leases also cancel the task; those jobs are requeued,
+            # so the campaign is only marked cancelled when a user asked for it
+            try:
+                cancel_requested = await asyncio.shield(campaign_jobs.is_cancel_requested(campaign_id))
+            except (Exception, asyncio.CancelledError) as lookup_error:
+                logger.error(f"Error checking campaign cancellation: {lookup_error}")
+                cancel_requested = False
+            if not cancel_requested:
+                logger.info(f"Campaign {campaign_id} processing interrupted; the job will be retried")
+                raise
+            logger.info(f"Campaign {campaign_id} processing cancelled")
+            
+            try:
+                # Record the cancellation, shielded so the write survives the cancelled task
+                db = await get_async_mongodb_db()
+                await asyncio.shield(db.campaigns.update_one(
+                    {"_id": ObjectId(campaign_id)},
+                    {"$set": {
+                        "status": "cancelled",
+                        "updated_at": datetime.now()
+                    }}
+                ))
+                await asyncio.shield(progress_broker.publish(campaign_id, "cancelled"))
+            except (Exception, asyncio.CancelledError) as update_error:
+                logger.error(f"Error updating campaign status: {update_error}")
+            
+            raise
         except Exception as e:
             logger.exception(f"Error processing campaign: {e}")
             
@@ -445,10 +689,90 @@ class CampaignService:
                         "updated_at": datetime.now()
                     }}
                 )
+                await progress_broker.publish(campaign_id, "error", {"message": str(e)})
             except Exception as update_error:
                 logger.error(f"Error updating campaign status: {update_error}")
                 
             return {"success": False, "error": str(e)}
 
+    async def enqueue_campaign(self, campaign_id: str) -> str:
+        """
+        Queue a campaign for generation by the worker pool
+        
+        Args:
+            campaign_id: ID of the campaign to process
+            
+        Returns:
+            ID of the queued job
+        """
+        return await campaign_jobs.enqueue("process_campaign", {"campaign_id": campaign_id}, dedupe_key=campaign_id)
+
+    async def run_campaign_job(self, job: Dict[str, Any]) -> None:
+        """
+        Job handler for campaign generation; raises so that failed attempts are retried, or
+        PermanentJobError when a retry cannot succeed (e.g. the campaign no longer exists)
+        
+        Args:
+            job: Claimed job document
+        """
+        campaign_id = job["payload"]["campaign_id"]
+        # A previous or interrupted attempt may have recorded an error or cancelled status
+        db = await get_async_mongodb_db()
+        await db.campaigns.update_one(
+            {"_id": ObjectId(campaign_id)},
+            {"$set": {"status": "processing", "updated_at": datetime.now()}}
+        )
+        await progress_broker.publish(campaign_id, "started", {"attempt": job["attempts"]})
+        
+        result = await self.start_campaign(campaign_id)
+        if not result.get("success"):
+            error = result.get("error") or "Campaign processing failed"
+            retryable = result.get("retryable", True)
+            if not retryable:
+                # Undo the processing status set above; the job fails without retries
+                await db.campaigns.update_one(
+                    {"_id": ObjectId(campaign_id)},
+                    {"$set": {"status": "error", "error_message": error, "updated_at": datetime.now()}}
+                )
+            if not retryable or job["attempts"] >= campaign_jobs.max_attempts:
+                # No retry follows; tell subscribers the campaign is finished
+                await progress_broker.publish(campaign_id, "failed", {"message": error})
+            if not retryable:
+                raise PermanentJobError(error)
+            raise RuntimeError(error)
+
+    def start_campaign(self, campaign_id: str) -> asyncio.Task:
+        """
+        Run process_campaign in the background and keep a handle for cancellation
+        
+        Args:
+            campaign_id: ID of the campaign to process
+            
+        Returns:
+            The background task
+        """
+        task = asyncio.create_task(self.process_campaign(campaign_id))
+        self._tasks[campaign_id] = task
+        task.add_done_callback(lambda done: self._tasks.pop(campaign_id, None) if self._tasks.get(campaign_id) is done else None)
+        return task
+
+    async def cancel_campaign(self, campaign_id: str) -> bool:
+        """
+        Cancel a queued or running campaign workflow; outstanding LLM and HTTP calls are aborted
+        
+        Args:
+            campaign_id: ID of the campaign to cancel
+            
+        Returns:
+            True if a queued or running workflow was cancelled
+        """
+        # Flag the job first so the interrupted workflow records the cancellation;
+        # workers in other processes cancel the job on their next heartbeat
+        requested = await campaign_jobs.request_cancel(campaign_id)
+        task = self._tasks.get(campaign_id)
+        if task and not task.done():
+            task.cancel()
+        return requested or task is not None
+
 # Initialize the singleton service
 campaign_service = CampaignService()
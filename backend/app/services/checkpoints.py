@@ -0,0 +1,160 @@
+"""
+Per-node checkpoints of LangGraph workflow state in MongoDB, so that a retried
+workflow resumes after the last node that completed instead of starting over
+"""
+import functools
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Any, Awaitable, Callable, Dict, Optional, Type
+
+from motor.motor_asyncio import AsyncIOMotorCollection
+from pydantic import BaseModel
+
+from app.core.config import settings
+from app.db.client import get_async_mongodb_db
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+Node = Callable[[Dict[str, Any]], Awaitable[Dict[str, Any]]]
+
+
+def _dump(value: Any) -> Any:
+    """Convert pydantic models (also inside lists) into BSON-friendly dicts"""
+    if isinstance(value, BaseModel):
+        return value.model_dump(mode="json")
+    if isinstance(value, list):
+        return [_dump(item) for item in value]
+    return value
+
+
+def _load(value: Any, model: Type[BaseModel]) -> Any:
+    """Rebuild pydantic models (also inside lists) from stored dicts"""
+    if isinstance(value, dict):
+        return model.model_validate(value)
+    if isinstance(value, list):
+        return [_load(item, model) for item in value]
+    return value
+
+
+class CheckpointStore:
+    """Stores the state of a workflow run after every completed node"""
+
+    def __init__(self, collection: str, ttl_seconds: int):
+        """
+        Args:
+            collection: MongoDB collection for the checkpoints
+            ttl_seconds: How long a checkpoint is kept after its last update
+        """
+        self.collection_name = collection
+        self.ttl_seconds = ttl_seconds
+        self._index_ready = False
+
+    async def _collection(self) -> AsyncIOMotorCollection:
+        """Return the backing collection, creating the TTL index on first use"""
+        db = await get_async_mongodb_db()
+        collection = db[self.collection_name]
+        if not self._index_ready:
+            await collection.create_index("expires_at", expireAfterSeconds=0)
+            await collection.create_index("run_id")
+            self._index_ready = True
+        return collection
+
+    async def load(self, workflow: str, run_id: str,
+                   models: Optional[Dict[str, Type[BaseModel]]] = None) -> Optional[Dict[str, Any]]:
+        """
+        Load the last checkpointed state of a run
+
+        Args:
+            workflow: Workflow name
+            run_id: ID of the run (e.g. the campaign ID)
+            models: State field -> pydantic model used to rebuild that field
+
+        Returns:
+            The checkpointed state, or None if there is no checkpoint
+        """
+        if not settings.WORKFLOW_CHECKPOINTS_ENABLED:
+            return None
+        try:
+            collection = await self._collection()
+            document = await collection.find_one({"_id": f"{workflow}:{run_id}"})
+        except Exception as e:
+            logger.warning(f"Could not load checkpoint {workflow}:{run_id}: {e}")
+            return None
+        if not document:
+            return None
+        state = document["state"]
+        for field, model in (models or {}).items():
+            if state.get(field) is not None:
+                state[field] = _load(state[field], model)
+        logger.info(f"Resuming {workflow} run {run_id} after nodes {state.get('completed_nodes')}")
+        return state
+
+    async def save(self, workflow: str, run_id: str, node: str, state: Dict[str, Any]) -> None:
+        """
+        Store the state of a run after a node completed
+
+        Args:
+            workflow: Workflow name
+            run_id: ID of the run
+            node: Node that just completed
+            state: Workflow state
+        """
+        now = datetime.now(timezone.utc)
+        try:
+            collection = await self._collection()
+            await collection.replace_one(
+                {"_id": f"{workflow}:{run_id}"},
+                {
+                    "workflow": workflow,
+                    "run_id": run_id,
+                    "node": node,
+                    "state": {key: _dump(value) for key, value in state.items()},
+                    "updated_at": now,
+                    "expires_at": now + timedelta(seconds=self.ttl_seconds),
+                },
+                upsert=True
+            )
+        except Exception as e:
+            logger.warning(f"Could not save checkpoint {workflow}:{run_id} after {node}: {e}")
+
+    async def clear(self, run_id: str) -> None:
+        """Delete the checkpoints of every workflow for a run"""
+        try:
+            collection = await self._collection()
+            await collection.delete_many({"run_id": run_id})
+        except Exception as e:
+            logger.warning(f"Could not clear checkpoints for {run_id}: {e}")
+
+    def node(self, workflow: str, name: str, fn: Node, run_id_field: str) -> Node:
+        """
+        Wrap a workflow node so it is skipped when already completed and checkpointed when it succeeds
+
+        The state must have a `completed_nodes` list. A node counts as completed when it
+        returns without an error in the state; runs without an ID are not checkpointed.
+
+        Args:
+            workflow: Workflow name
+            name: Node name
+            fn: The node
+            run_id_field: State field holding the run ID
+
+        Returns:
+            The wrapped node
+        """
+        @functools.wraps(fn)
+        async def wrapper(state: Dict[str, Any]) -> Dict[str, Any]:
+            if name in state.get("completed_nodes", []):
+                logger.info(f"Skipping {workflow} node '{name}', restored from checkpoint")
+                return state
+            state = await fn(state)
+            run_id = state.get(run_id_field)
+            if run_id and settings.WORKFLOW_CHECKPOINTS_ENABLED and not state.get("error"):
+                state["completed_nodes"] = [*state.get("completed_nodes", []), name]
+                await self.save(workflow, run_id, name, state)
+            return state
+        return wrapper
+
+
+# Initialize the singleton store
+checkpoint_store = CheckpointStore("workflow_checkpoints", settings.WORKFLOW_CHECKPOINT_TTL_SECONDS)
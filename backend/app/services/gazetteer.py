@@ -0,0 +1,224 @@
+"""
+Offline gazetteer of major cities and regions, used to geocode common localities
+without a network call
+"""
+import re
+from typing import Dict, Optional, Tuple
+
+# Two-letter US state codes expanded in US locations ("New York, NY" -> "new york, new york")
+US_STATES: Dict[str, str] = {
+    "al": "alabama", "ak": "alaska", "az": "arizona", "ar": "arkansas", "ca": "california",
+    "co": "colorado", "ct": "connecticut", "de": "delaware", "dc": "district of columbia",
+    "fl": "florida", "ga": "georgia", "hi": "hawaii", "id": "idaho", "il": "illinois",
+    "in": "indiana", "ia": "iowa", "ks": "kansas", "ky": "kentucky", "la": "louisiana",
+    "me": "maine", "md": "maryland", "ma": "massachusetts", "mi": "michigan", "mn": "minnesota",
+    "ms": "mississippi", "mo": "missouri", "mt": "montana", "ne": "nebraska", "nv": "nevada",
+    "nh": "new hampshire", "nj": "new jersey", "nm": "new mexico", "ny": "new york",
+    "nc": "north carolina", "nd": "north dakota", "oh": "ohio", "ok": "oklahoma", "or": "oregon",
+    "pa": "pennsylvania", "ri": "rhode island", "sc": "south carolina", "sd": "south dakota",
+    "tn": "tennessee", "tx": "texas", "ut": "utah", "vt": "vermont", "va": "virginia",
+    "wa": "washington", "wv": "west virginia", "wi": "wisconsin", "wy": "wyoming",
+}
+
+# Country spellings that are dropped when trailing a more specific locality
+_US_SUFFIXES = {"us", "usa", "united states", "united states of america", "america"}
+
+_COUNTRY_ALIASES: Dict[str, str] = {
+    "uk": "united kingdom",
+    "great britain": "united kingdom",
+    "england": "united kingdom",
+    "uae": "united arab emirates",
+    "usa": "united states",
+    "us": "united states",
+    "united states of america": "united states",
+}
+
+# Two-letter country codes of bundled countries ("Mumbai, IN" -> "mumbai, india"); several are
+# also US state codes, which are told apart by the bundled places
+_COUNTRY_CODES: Dict[str, str] = {
+    "ae": "united arab emirates", "ar": "argentina", "au": "australia", "br": "brazil",
+    "ca": "canada", "de": "germany", "es": "spain", "fr": "france", "gb": "united kingdom",
+    "ie": "ireland", "in": "india", "it": "italy", "jp": "japan", "kr": "south korea",
+    "mx": "mexico", "nl": "netherlands", "pt": "portugal",
+}
+
+# normalised name -> (latitude, longitude, label, ISO country code)
+_PLACES: Dict[str, Tuple[float, float, str, str]] = {
+    # United States - cities
+    "new york, new york": (40.7128, -74.0060, "New York, NY, United States", "USA"),
+    "manhattan, new york": (40.7831, -73.9712, "Manhattan, New York, NY, United States", "USA"),
+    "brooklyn, new york": (40.6782, -73.9442, "Brooklyn, New York, NY, United States", "USA"),
+    "los angeles, california": (34.0522, -118.2437, "Los Angeles, CA, United States", "USA"),
+    "chicago, illinois": (41.8781, -87.6298, "Chicago, IL, United States", "USA"),
+    "houston, texas": (29.7604, -95.3698, "Houston, TX, United States", "USA"),
+    "phoenix, arizona": (33.4484, -112.0740, "Phoenix, AZ, United States", "USA"),
+    "philadelphia, pennsylvania": (39.9526, -75.1652, "Philadelphia, PA, United States", "USA"),
+    "san antonio, texas": (29.4241, -98.4936, "San Antonio, TX, United States", "USA"),
+    "san diego, california": (32.7157, -117.1611, "San Diego, CA, United States", "USA"),
+    "dallas, texas": (32.7767, -96.7970, "Dallas, TX, United States", "USA"),
+    "austin, texas": (30.2672, -97.7431, "Austin, TX, United States", "USA"),
+    "san jose, california": (37.3382, -121.8863, "San Jose, CA, United States", "USA"),
+    "san francisco, california": (37.7749, -122.4194, "San Francisco, CA, United States", "USA"),
+    "seattle, washington": (47.6062, -122.3321, "Seattle, WA, United States", "USA"),
+    "denver, colorado": (39.7392, -104.9903, "Denver, CO, United States", "USA"),
+    "washington, district of columbia": (38.9072, -77.0369, "Washington, DC, United States", "USA"),
+    "boston, massachusetts": (42.3601, -71.0589, "Boston, MA, United States", "USA"),
+    "nashville, tennessee": (36.1627, -86.7816, "Nashville, TN, United States", "USA"),
+    "atlanta, georgia": (33.7490, -84.3880, "Atlanta, GA, United States", "USA"),
+    "miami, florida": (25.7617, -80.1918, "Miami, FL, United States", "USA"),
+    "orlando, florida": (28.5383, -81.3792, "Orlando, FL, United States", "USA"),
+    "las vegas, nevada": (36.1699, -115.1398, "Las Vegas, NV, United States", "USA"),
+    "portland, oregon": (45.5152, -122.6784, "Portland, OR, United States", "USA"),
+    "detroit, michigan": (42.3314, -83.0458, "Detroit, MI, United States", "USA"),
+    "minneapolis, minnesota": (44.9778, -93.2650, "Minneapolis, MN, United States", "USA"),
+    "new orleans, louisiana": (29.9511, -90.0715, "New Orleans, LA, United States", "USA"),
+    # United States - regions
+    "united states": (39.8283, -98.5795, "United States", "USA"),
+    "california": (36.7783, -119.4179, "California, United States", "USA"),
+    "texas": (31.9686, -99.9018, "Texas, United States", "USA"),
+    "florida": (27.6648, -81.5158, "Florida, United States", "USA"),
+    "san francisco bay area": (37.8272, -122.2913, "San Francisco Bay Area, CA, United States", "USA"),
+    "silicon valley": (37.3875, -122.0575, "Silicon Valley, CA, United States", "USA"),
+    # International - cities
+    "london, united kingdom": (51.5074, -0.1278, "London, United Kingdom", "GBR"),
+    "paris, france": (48.8566, 2.3522, "Paris, France", "FRA"),
+    "berlin, germany": (52.5200, 13.4050, "Berlin, Germany", "DEU"),
+    "madrid, spain": (40.4168, -3.7038, "Madrid, Spain", "ESP"),
+    "barcelona, spain": (41.3851, 2.1734, "Barcelona, Spain", "ESP"),
+    "rome, italy": (41.9028, 12.4964, "Rome, Italy", "ITA"),
+    "milan, italy": (45.4642, 9.1900, "Milan, Italy", "ITA"),
+    "amsterdam, netherlands": (52.3676, 4.9041, "Amsterdam, Netherlands", "NLD"),
+    "dublin, ireland": (53.3498, -6.2603, "Dublin, Ireland", "IRL"),
+    "lisbon, portugal": (38.7223, -9.1393, "Lisbon, Portugal", "PRT"),
+    "toronto, canada": (43.6532, -79.3832, "Toronto, ON, Canada", "CAN"),
+    "vancouver, canada": (49.2827, -123.1207, "Vancouver, BC, Canada", "CAN"),
+    "montreal, canada": (45.5017, -73.5673, "Montreal, QC, Canada", "CAN"),
+    "mexico city, mexico": (19.4326, -99.1332, "Mexico City, Mexico", "MEX"),
+    "sao paulo, brazil": (-23.5505, -46.6333, "Sao Paulo, Brazil", "BRA"),
+    "buenos aires, argentina": (-34.6037, -58.3816, "Buenos Aires, Argentina", "ARG"),
+    "tokyo, japan": (35.6762, 139.6503, "Tokyo, Japan", "JPN"),
+    "seoul, south korea": (37.5665, 126.9780, "Seoul, South Korea", "KOR"),
+    "singapore": (1.3521, 103.8198, "Singapore", "SGP"),
+    "hong kong": (22.3193, 114.1694, "Hong Kong", "HKG"),
+    "sydney, australia": (-33.8688, 151.2093, "Sydney, NSW, Australia", "AUS"),
+    "melbourne, australia": (-37.8136, 144.9631, "Melbourne, VIC, Australia", "AUS"),
+    "dubai, united arab emirates": (25.2048, 55.2708, "Dubai, United Arab Emirates", "ARE"),
+    "mumbai, india": (19.0760, 72.8777, "Mumbai, India", "IND"),
+    "bangalore, india": (12.9716, 77.5946, "Bengaluru, India", "IND"),
+    "new delhi, india": (28.6139, 77.2090, "New Delhi, India", "IND"),
+    # International - countries
+    "united kingdom": (55.3781, -3.4360, "United Kingdom", "GBR"),
+    "canada": (56.1304, -106.3468, "Canada", "CAN"),
+    "india": (20.5937, 78.9629, "India", "IND"),
+    "australia": (-25.2744, 133.7751, "Australia", "AUS"),
+    "germany": (51.1657, 10.4515, "Germany", "DEU"),
+    "france": (46.2276, 2.2137, "France", "FRA"),
+}
+
+# Unambiguous short names and nicknames -> canonical entry
+_ALIASES: Dict[str, str] = {
+    "new york": "new york, new york",
+    "new york city": "new york, new york",
+    "nyc": "new york, new york",
+    "manhattan": "manhattan, new york",
+    "brooklyn": "brooklyn, new york",
+    "los angeles": "los angeles, california",
+    "chicago": "chicago, illinois",
+    "houston": "houston, texas",
+    "philadelphia": "philadelphia, pennsylvania",
+    "san diego": "san diego, california",
+    "san francisco": "san francisco, california",
+    "sf": "san francisco, california",
+    "seattle": "seattle, washington",
+    "denver": "denver, colorado",
+    "washington dc": "washington, district of columbia",
+    "boston": "boston, massachusetts",
+    "nashville": "nashville, tennessee",
+    "atlanta": "atlanta, georgia",
+    "miami": "miami, florida",
+    "las vegas": "las vegas, nevada",
+    "new orleans": "new orleans, louisiana",
+    "bay area": "san francisco bay area",
+    "london": "london, united kingdom",
+    "paris": "paris, france",
+    "berlin": "berlin, germany",
+    "madrid": "madrid, spain",
+    "barcelona": "barcelona, spain",
+    "rome": "rome, italy",
+    "milan": "milan, italy",
+    "amsterdam": "amsterdam, netherlands",
+    "dublin": "dublin, ireland",
+    "lisbon": "lisbon, portugal",
+    "toronto": "toronto, canada",
+    "vancouver": "vancouver, canada",
+    "montreal": "montreal, canada",
+    "mexico city": "mexico city, mexico",
+    "sao paulo": "sao paulo, brazil",
+    "buenos aires": "buenos aires, argentina",
+    "tokyo": "tokyo, japan",
+    "seoul": "seoul, south korea",
+    "sydney": "sydney, australia",
+    "melbourne": "melbourne, australia",
+    "dubai": "dubai, united arab emirates",
+    "mumbai": "mumbai, india",
+    "bangalore": "bangalore, india",
+    "bengaluru": "bangalore, india",
+    "bengaluru, india": "bangalore, india",
+    "delhi": "new delhi, india",
+    "new delhi": "new delhi, india",
+    "delhi, india": "new delhi, india",
+}
+
+
+def normalize_location(location: str) -> str:
+    """
+    Normalise a free-text location into a canonical lookup key
+
+    Lower-cases, drops punctuation, expands country aliases and a trailing state or
+    country code, and removes a trailing US country qualifier ("Austin, TX, USA" ->
+    "austin, texas"). A code that is both a US state and a country code ("IN", "CA")
+    is only expanded when the location is known to be in the US or in that country;
+    otherwise it is kept as is.
+
+    Args:
+        location: Location string such as 'New York, NY'
+
+    Returns:
+        Normalised key
+    """
+    text = re.sub(r"[^\w\s,]", "", location.lower())
+    parts = [" ".join(part.split()) for part in text.split(",")]
+    parts = [part for part in parts if part]
+
+    in_us = len(parts) > 1 and parts[-1] in _US_SUFFIXES
+    if in_us:
+        parts = parts[:-1]
+
+    normalized = [_COUNTRY_ALIASES.get(part, part) for part in parts]
+    if len(parts) > 1:
+        head = ", ".join(normalized[:-1])
+        state, country = US_STATES.get(parts[-1]), _COUNTRY_CODES.get(parts[-1])
+        if state and (in_us or not country or f"{head}, {state}" in _PLACES):
+            normalized[-1] = state
+        elif country and (not state or f"{head}, {country}" in _PLACES):
+            normalized[-1] = country
+    return ", ".join(normalized)
+
+
+def lookup(location: str) -> Optional[Dict[str, object]]:
+    """
+    Look up a location in the offline gazetteer
+
+    Args:
+        location: Free-text location
+
+    Returns:
+        Dict with lat, lng, label and country_code, or None if the locality is not bundled
+    """
+    key = normalize_location(location)
+    key = _ALIASES.get(key, key)
+    place = _PLACES.get(key)
+    if not place:
+        return None
+    lat, lng, label, country_code = place
+    return {"lat": lat, "lng": lng, "label": label, "country_code": country_code}
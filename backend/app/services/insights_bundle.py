@@ -0,0 +1,59 @@
+"""
+Per-user Qloo insights bundle saved at onboarding (resolved parameters, tag/audience
+resolutions and entities), reused when generating that user's campaigns
+"""
+import logging
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional
+
+from app.core.config import settings
+from app.db.client import get_async_mongodb_db
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+
+async def save_insights_bundle(user_id: str, bundle: Dict[str, Any]) -> None:
+    """
+    Store (or replace) the insights bundle of a user
+
+    Args:
+        user_id: User ID as string
+        bundle: Bundle built by QlooService.build_insights_bundle
+    """
+    db = await get_async_mongodb_db()
+    await db.qloo_bundles.replace_one(
+        {"_id": user_id},
+        {
+            **bundle,
+            "_id": user_id,
+            "stored_at": time.time(),
+            "updated_at": datetime.now(timezone.utc),
+        },
+        upsert=True
+    )
+    logger.info(f"Stored Qloo insights bundle for user {user_id} ({len(bundle.get('resolutions', {}))} resolutions)")
+
+
+async def load_insights_bundle(user_id: str) -> Optional[Dict[str, Any]]:
+    """
+    Load the insights bundle of a user if it is recent enough to reuse
+
+    Args:
+        user_id: User ID as string
+
+    Returns:
+        The bundle, or None if there is none, it is too old, or reuse is disabled
+    """
+    if not settings.QLOO_ONBOARDING_BUNDLE_ENABLED:
+        return None
+    try:
+        db = await get_async_mongodb_db()
+        bundle = await db.qloo_bundles.find_one({"_id": user_id})
+    except Exception as e:
+        logger.warning(f"Could not load Qloo insights bundle for user {user_id}: {e}")
+        return None
+    if not bundle or time.time() - bundle.get("stored_at", 0) > settings.QLOO_ONBOARDING_BUNDLE_MAX_AGE_SECONDS:
+        return None
+    return bundle
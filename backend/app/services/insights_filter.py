@@ -0,0 +1,85 @@
+"""
+Local filtering of Qloo insights results, used to answer a request that only narrows an
+earlier one (smaller take, tighter popularity range or location radius) without an API call
+"""
+import math
+import re
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple
+
+if TYPE_CHECKING:
+    from app.services.qloo import QlooParameterSet
+
+# Overrides that can only remove entities from a result, so they can be applied locally
+NARROWING_PARAMS = {"take", "filter_popularity_min", "filter_popularity_max", "filter_location_radius"}
+
+
+def _entity_point(entity: Dict[str, Any]) -> Optional[Tuple[float, float]]:
+    """(lat, lng) of an insights entity, if it has a location"""
+    location = entity.get("location") or {}
+    lat, lng = location.get("lat"), location.get("lon", location.get("lng"))
+    return (lat, lng) if lat is not None and lng is not None else None
+
+
+def _params_point(params: "QlooParameterSet") -> Optional[Tuple[float, float]]:
+    """(lat, lng) of the location filter of a parameter set, if it is a point"""
+    if params.filter_location_lat is not None and params.filter_location_lng is not None:
+        return params.filter_location_lat, params.filter_location_lng
+    match = re.match(r"^\s*POINT\s*\(\s*(-?[\d.]+)\s+(-?[\d.]+)\s*\)\s*$", params.filter_location or "", re.IGNORECASE)
+    return (float(match.group(2)), float(match.group(1))) if match else None
+
+
+def _distance_meters(a: Tuple[float, float], b: Tuple[float, float]) -> float:
+    """Great-circle distance between two (lat, lng) points"""
+    lat1, lng1, lat2, lng2 = map(math.radians, (*a, *b))
+    h = math.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * math.cos(lat2) * math.sin((lng2 - lng1) / 2) ** 2
+    return 2 * 6371000 * math.asin(math.sqrt(h))
+
+
+def narrow_entities(entities: List[Dict[str, Any]], base: "QlooParameterSet",
+                    target: "QlooParameterSet") -> Optional[List[Dict[str, Any]]]:
+    """
+    Answer a narrowed insights request by filtering the entities of the base request
+    
+    Args:
+        entities: Entities returned for base, in ranking order
+        base: Parameters the entities were fetched with
+        target: Parameters that differ from base only in narrowing filters
+        
+    Returns:
+        The filtered entities, or None if the request cannot be answered locally
+    """
+    base_values, target_values = base.model_dump(), target.model_dump()
+    changed = {name for name in target_values if target_values[name] != base_values[name]}
+    if not changed <= NARROWING_PARAMS:
+        return None
+    
+    def tighter(name: str, is_min: bool) -> bool:
+        old, new = base_values[name], target_values[name]
+        if name not in changed:
+            return True
+        return new is not None and (old is None or (new >= old if is_min else new <= old))
+    
+    if not (tighter("filter_popularity_min", True) and tighter("filter_popularity_max", False)
+            and tighter("filter_location_radius", False)):
+        return None
+    
+    result = entities
+    if {"filter_popularity_min", "filter_popularity_max"} & changed:
+        if any(entity.get("popularity") is None for entity in result):
+            return None
+        low, high = target.filter_popularity_min, target.filter_popularity_max
+        result = [e for e in result if (low is None or e["popularity"] >= low) and (high is None or e["popularity"] <= high)]
+    if "filter_location_radius" in changed:
+        center = _params_point(target)
+        points = [_entity_point(entity) for entity in result]
+        if center is None or any(point is None for point in points):
+            return None
+        result = [e for e, point in zip(result, points) if _distance_meters(center, point) <= target.filter_location_radius]
+    
+    # Filtering keeps the ranking, so the first `take` survivors match what the API returns,
+    # unless the base result was truncated and too few entities survived
+    take = target.take or len(result)
+    base_truncated = base.take is not None and len(entities) >= base.take
+    if len(result) < take and base_truncated:
+        return None
+    return result[:take]
@@ -0,0 +1,432 @@
+"""
+Durable job queue stored in a MongoDB collection, with lease-based claiming,
+heartbeats, retries with exponential backoff and a pool of async workers
+"""
+import asyncio
+import logging
+import os
+import socket
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from bson.objectid import ObjectId
+from motor.motor_asyncio import AsyncIOMotorCollection
+from pymongo import ASCENDING, ReturnDocument
+from pymongo.errors import DuplicateKeyError
+
+from app.db.client import get_async_mongodb_db
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# All job queues created by the application, by name (used by the admin endpoints)
+job_queue_registry: Dict[str, "JobQueue"] = {}
+
+JobHandler = Callable[[Dict[str, Any]], Awaitable[None]]
+
+
+class PermanentJobError(Exception):
+    """Raised by a job handler for a failure that retrying cannot fix; the job fails without retries"""
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+class JobQueue:
+    """
+    Queue of jobs in a MongoDB collection
+
+    A job document moves through the statuses queued -> running -> done, or back to
+    queued for a retry, and ends as failed or cancelled. Workers claim a job with an
+    atomic find-and-modify that grants a time-limited lease. A running job whose lease
+    has expired (its worker crashed or was redeployed) can be claimed again.
+
+    A done or cancelled job keeps its dedupe key, so enqueueing the key again returns it
+    without running it twice. A failed job gives its dedupe key up, so the same work can
+    be enqueued again. Finished jobs are deleted after the retention period, if one is set.
+    """
+
+    def __init__(self, name: str, collection: str, lease_seconds: int = 120, max_attempts: int = 3,
+                 backoff_seconds: int = 30, max_backoff_seconds: int = 900,
+                 on_give_up: Optional[JobHandler] = None, retention_seconds: Optional[int] = None):
+        """
+        Args:
+            name: Queue name used for metrics and the admin endpoints
+            collection: MongoDB collection holding the jobs
+            lease_seconds: How long a claim is valid without a heartbeat
+            max_attempts: Attempts before a job is marked failed
+            backoff_seconds: Delay before the first retry (doubled for every further attempt)
+            max_backoff_seconds: Upper bound for the retry delay
+            on_give_up: Called with the job when it is marked failed at claim time, after its
+                lease expired max_attempts times (no handler runs for it again)
+            retention_seconds: How long finished (done, failed or cancelled) jobs are kept;
+                None keeps them forever
+        """
+        self.name = name
+        self.collection_name = collection
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self.backoff_seconds = backoff_seconds
+        self.max_backoff_seconds = max_backoff_seconds
+        self.on_give_up = on_give_up
+        self.retention_seconds = retention_seconds
+        self._indexes_ready = False
+        self._wakeup = asyncio.Event()
+        job_queue_registry[name] = self
+
+    async def _collection(self) -> AsyncIOMotorCollection:
+        """Return the backing collection, creating the indexes on first use"""
+        db = await get_async_mongodb_db()
+        collection = db[self.collection_name]
+        if not self._indexes_ready:
+            await collection.create_index([("status", ASCENDING), ("run_at", ASCENDING)])
+            await collection.create_index([("status", ASCENDING), ("lease_expires_at", ASCENDING)])
+            await collection.create_index(
+                "dedupe_key", unique=True,
+                partialFilterExpression={"dedupe_key": {"$type": "string"}}
+            )
+            # Only finished jobs get an expires_at
+            await collection.create_index("expires_at", expireAfterSeconds=0)
+            self._indexes_ready = True
+        return collection
+
+    async def enqueue(self, job_type: str, payload: Dict[str, Any], dedupe_key: Optional[str] = None,
+                      delay_seconds: float = 0) -> str:
+        """
+        Add a job to the queue
+
+        Args:
+            job_type: Handler name the job is dispatched to
+            payload: JSON-serialisable job arguments
+            dedupe_key: Optional unique key; enqueueing an existing key returns the existing job
+            delay_seconds: Delay before the job becomes claimable
+
+        Returns:
+            ID of the (new or existing) job
+        """
+        collection = await self._collection()
+        now = _now()
+        document = {
+            "type": job_type,
+            "payload": payload,
+            "status": "queued",
+            "attempts": 0,
+            "run_at": now + timedelta(seconds=delay_seconds),
+            "lease_expires_at": None,
+            "worker_id": None,
+            "cancel_requested": False,
+            "last_error": None,
+            "created_at": now,
+            "updated_at": now,
+        }
+        if dedupe_key is not None:
+            document["dedupe_key"] = dedupe_key
+        try:
+            result = await collection.insert_one(document)
+        except DuplicateKeyError:
+            existing = await collection.find_one({"dedupe_key": dedupe_key}, {"_id": 1})
+            logger.info(f"Job '{dedupe_key}' already in queue '{self.name}'")
+            return str(existing["_id"])
+        self._wakeup.set()
+        return str(result.inserted_id)
+
+    async def claim(self, worker_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Atomically claim the next runnable job
+
+        Args:
+            worker_id: Identifier of the claiming worker
+
+        Returns:
+            The claimed job document, or None if no job is runnable
+        """
+        collection = await self._collection()
+        while True:
+            now = _now()
+            # A job cancelled while its worker was down is finalised instead of run again
+            await collection.update_many(
+                {"status": "running", "cancel_requested": True, "lease_expires_at": {"$lt": now}},
+                {"$set": {"status": "cancelled", "lease_expires_at": None, "updated_at": now, **self._finished_fields()}}
+            )
+            job = await collection.find_one_and_update(
+                {
+                    "cancel_requested": {"$ne": True},
+                    "$or": [
+                        {"status": "queued", "run_at": {"$lte": now}},
+                        {"status": "running", "lease_expires_at": {"$lt": now}},
+                    ],
+                },
+                {
+                    "$set": {
+                        "status": "running",
+                        "worker_id": worker_id,
+                        "lease_expires_at": now + timedelta(seconds=self.lease_seconds),
+                        "started_at": now,
+                        "updated_at": now,
+                    },
+                    "$inc": {"attempts": 1},
+                },
+                sort=[("run_at", ASCENDING)],
+                return_document=ReturnDocument.AFTER,
+            )
+            if job is None:
+                return None
+            if job["attempts"] <= self.max_attempts:
+                return job
+            # A job that keeps taking its worker down is not retried forever
+            logger.error(f"Job {job['_id']} in queue '{self.name}' exceeded {self.max_attempts} attempts")
+            given_up = await collection.update_one(
+                {"_id": job["_id"], "worker_id": worker_id},
+                {"$set": {"status": "failed", "lease_expires_at": None, "updated_at": now,
+                          "last_error": job.get("last_error") or "Lease expired too many times",
+                          **self._finished_fields()},
+                 "$unset": {"dedupe_key": ""}}
+            )
+            if given_up.modified_count and self.on_give_up:
+                try:
+                    await self.on_give_up(job)
+                except Exception as e:
+                    logger.error(f"Error handling given-up job {job['_id']} in queue '{self.name}': {e}")
+
+    async def heartbeat(self, job_id: ObjectId, worker_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Extend the lease of a running job
+
+        Args:
+            job_id: ID of the job
+            worker_id: Worker holding the lease
+
+        Returns:
+            The updated job, or None if the lease was lost to another worker
+        """
+        collection = await self._collection()
+        now = _now()
+        return await collection.find_one_and_update(
+            {"_id": job_id, "worker_id": worker_id, "status": "running"},
+            {"$set": {"lease_expires_at": now + timedelta(seconds=self.lease_seconds), "updated_at": now}},
+            projection={"cancel_requested": 1},
+            return_document=ReturnDocument.AFTER,
+        )
+
+    def _finished_fields(self) -> Dict[str, Any]:
+        """Fields set when a job reaches a final status, including its expiry when retention is set"""
+        now = _now()
+        fields: Dict[str, Any] = {"finished_at": now}
+        if self.retention_seconds is not None:
+            fields["expires_at"] = now + timedelta(seconds=self.retention_seconds)
+        return fields
+
+    async def complete(self, job: Dict[str, Any], worker_id: str) -> None:
+        """Mark a job as done"""
+        await self._finish(job, worker_id, {"status": "done", **self._finished_fields()})
+
+    async def cancelled(self, job: Dict[str, Any], worker_id: str) -> None:
+        """Mark a job as cancelled"""
+        await self._finish(job, worker_id, {"status": "cancelled", **self._finished_fields()})
+
+    async def release(self, job: Dict[str, Any], worker_id: str) -> None:
+        """Return an interrupted job to the queue without counting the attempt"""
+        collection = await self._collection()
+        await collection.update_one(
+            {"_id": job["_id"], "worker_id": worker_id, "status": "running"},
+            {"$set": {"status": "queued", "run_at": _now(), "lease_expires_at": None,
+                      "worker_id": None, "updated_at": _now()},
+             "$inc": {"attempts": -1}}
+        )
+
+    async def fail(self, job: Dict[str, Any], worker_id: str, error: str, retry: bool = True) -> None:
+        """
+        Record a failed attempt and schedule a retry with exponential backoff
+
+        After the last attempt the job is marked failed and its dedupe key is released.
+
+        Args:
+            job: The claimed job
+            worker_id: Worker holding the lease
+            error: Error message of the attempt
+            retry: False to fail the job permanently without further attempts
+        """
+        if not retry or job["attempts"] >= self.max_attempts:
+            logger.error(f"Job {job['_id']} in queue '{self.name}' failed permanently: {error}")
+            await self._finish(job, worker_id, {"status": "failed", "last_error": error, **self._finished_fields()},
+                               unset=["dedupe_key"])
+            return
+        delay = min(self.backoff_seconds * 2 ** (job["attempts"] - 1), self.max_backoff_seconds)
+        logger.warning(f"Job {job['_id']} in queue '{self.name}' failed (attempt {job['attempts']}), retrying in {delay}s: {error}")
+        await self._finish(job, worker_id, {
+            "status": "queued",
+            "run_at": _now() + timedelta(seconds=delay),
+            "last_error": error,
+        })
+
+    async def _finish(self, job: Dict[str, Any], worker_id: str, fields: Dict[str, Any],
+                      unset: Optional[List[str]] = None) -> None:
+        """Apply a final update to a job while this worker still holds its lease"""
+        collection = await self._collection()
+        update: Dict[str, Any] = {"$set": {**fields, "lease_expires_at": None, "updated_at": _now()}}
+        if unset:
+            update["$unset"] = {field: "" for field in unset}
+        result = await collection.update_one(
+            {"_id": job["_id"], "worker_id": worker_id, "status": "running"},
+            update
+        )
+        if result.modified_count == 0:
+            logger.warning(f"Job {job['_id']} in queue '{self.name}' lease was lost before it finished")
+
+    async def request_cancel(self, dedupe_key: str) -> bool:
+        """
+        Cancel a job by its dedupe key
+
+        A queued job is cancelled immediately; a running job is flagged and cancelled
+        by its worker on the next heartbeat.
+
+        Args:
+            dedupe_key: Dedupe key the job was enqueued with
+
+        Returns:
+            True if a queued or running job was found
+        """
+        collection = await self._collection()
+        now = _now()
+        queued = await collection.update_one(
+            {"dedupe_key": dedupe_key, "status": "queued"},
+            {"$set": {"status": "cancelled", "cancel_requested": True, "updated_at": now, **self._finished_fields()}}
+        )
+        if queued.modified_count:
+            return True
+        running = await collection.update_one(
+            {"dedupe_key": dedupe_key, "status": "running"},
+            {"$set": {"cancel_requested": True, "updated_at": now}}
+        )
+        return running.modified_count > 0
+
+    async def is_cancel_requested(self, dedupe_key: str) -> bool:
+        """Whether cancellation was requested for the job with a dedupe key"""
+        collection = await self._collection()
+        job = await collection.find_one({"dedupe_key": dedupe_key}, {"cancel_requested": 1})
+        return bool(job and job.get("cancel_requested"))
+
+    def wake(self) -> None:
+        """Wake workers in this process waiting for work"""
+        self._wakeup.set()
+
+    async def wait_for_work(self, timeout: float) -> None:
+        """Sleep until a job is enqueued in this process or the timeout elapses"""
+        try:
+            await asyncio.wait_for(self._wakeup.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+        self._wakeup.clear()
+
+    async def get_stats(self) -> Dict[str, Any]:
+        """Return the number of jobs per status"""
+        collection = await self._collection()
+        counts = {}
+        async for row in collection.aggregate([{"$group": {"_id": "$status", "count": {"$sum": 1}}}]):
+            counts[row["_id"]] = row["count"]
+        return {"collection": self.collection_name, "jobs": counts}
+
+
+class WorkerPool:
+    """Pool of async workers draining a JobQueue, dispatching jobs by type to handlers"""
+
+    def __init__(self, queue: JobQueue, handlers: Dict[str, JobHandler], concurrency: int = 4,
+                 poll_interval: float = 2.0, shutdown_grace_seconds: float = 30.0):
+        """
+        Args:
+            queue: Queue to drain
+            handlers: Job type -> async handler taking the job document (raise to fail the attempt)
+            concurrency: Number of jobs run at the same time
+            poll_interval: Seconds between polls when the queue is empty
+            shutdown_grace_seconds: Time running jobs get to finish when the pool stops
+        """
+        self.queue = queue
+        self.handlers = handlers
+        self.concurrency = concurrency
+        self.poll_interval = poll_interval
+        self.shutdown_grace_seconds = shutdown_grace_seconds
+        self.worker_id = f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:6]}"
+        self._stopping = asyncio.Event()
+        self._loops: List[asyncio.Task] = []
+
+    async def start(self) -> None:
+        """Start the worker loops"""
+        self._stopping.clear()
+        self._loops = [asyncio.create_task(self._worker_loop(index)) for index in range(self.concurrency)]
+        logger.info(f"Worker pool {self.worker_id} started with {self.concurrency} workers on queue '{self.queue.name}'")
+
+    async def stop(self) -> None:
+        """Stop claiming jobs, give running jobs a grace period, then interrupt and release them"""
+        self._stopping.set()
+        self.queue.wake()
+        if not self._loops:
+            return
+        _, pending = await asyncio.wait(self._loops, timeout=self.shutdown_grace_seconds)
+        for loop in pending:
+            loop.cancel()
+        await asyncio.gather(*self._loops, return_exceptions=True)
+        self._loops = []
+        logger.info(f"Worker pool {self.worker_id} stopped")
+
+    async def _worker_loop(self, index: int) -> None:
+        """Claim and run jobs until the pool stops"""
+        worker_id = f"{self.worker_id}/{index}"
+        while not self._stopping.is_set():
+            try:
+                job = await self.queue.claim(worker_id)
+            except Exception as e:
+                logger.error(f"Error claiming job from queue '{self.queue.name}': {e}")
+                job = None
+            if job is None:
+                await self.queue.wait_for_work(self.poll_interval)
+                continue
+            try:
+                await self._run(job, worker_id)
+            except Exception as e:
+                # The lease expires and the job is retried by the next claim
+                logger.exception(f"Error running job {job['_id']} from queue '{self.queue.name}': {e}")
+
+    async def _run(self, job: Dict[str, Any], worker_id: str) -> None:
+        """Run one job, heartbeating its lease and honouring cancellation requests"""
+        handler = self.handlers.get(job["type"])
+        if handler is None:
+            await self.queue.fail(job, worker_id, f"No handler registered for job type '{job['type']}'")
+            return
+
+        task = asyncio.create_task(handler(job))
+        heartbeat_interval = max(self.queue.lease_seconds / 3, 1)
+        try:
+            while True:
+                done, _ = await asyncio.wait({task}, timeout=heartbeat_interval)
+                if done:
+                    break
+                try:
+                    lease = await self.queue.heartbeat(job["_id"], worker_id)
+                except Exception as e:
+                    logger.warning(f"Heartbeat for job {job['_id']} failed: {e}")
+                    continue
+                if lease is None:
+                    logger.warning(f"Lost lease on job {job['_id']}, abandoning it")
+                    task.cancel()
+                    await asyncio.gather(task, return_exceptions=True)
+                    return
+                if lease.get("cancel_requested"):
+                    logger.info(f"Cancellation requested for job {job['_id']}")
+                    task.cancel()
+        except asyncio.CancelledError:
+            # The pool is shutting down past its grace period: interrupt and requeue the job
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+            await asyncio.shield(self.queue.release(job, worker_id))
+            raise
+
+        if task.cancelled():
+            await self.queue.cancelled(job, worker_id)
+        elif task.exception() is not None:
+            error = task.exception()
+            await self.queue.fail(job, worker_id, str(error) or type(error).__name__,
+                                  retry=not isinstance(error, PermanentJobError))
+        else:
+            await self.queue.complete(job, worker_id)
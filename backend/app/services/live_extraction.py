@@ -0,0 +1,262 @@
+"""
+Incremental company information extraction while an onboarding conversation is live:
+transcript deltas are folded into a running CompanyInfo per conversation, and competitor
+discovery starts as soon as the company name and details stop changing
+"""
+import asyncio
+import logging
+import time
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+
+from langchain_openai import ChatOpenAI
+
+from app.core.config import settings
+from app.services.llm_cache import ainvoke_structured
+from app.services.matcher import normalize_text, similarity
+from app.services.prompt_payload import estimate_tokens
+from app.services.qloo import qloo_service
+from app.services.transcript_processor import CompanyInfo
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+
+class LiveExtractionResult(NamedTuple):
+    """Outcome of a live extraction when its conversation ends"""
+    company_name: str
+    company_details: str
+    # Insights bundle discovered during the call, if it matches the final company info
+    bundle: Optional[Dict[str, Any]]
+
+
+def _same_company(a: Tuple[str, str], b: Tuple[str, str]) -> bool:
+    """Whether two (company_name, company_details) pairs describe the same company well enough"""
+    return (
+        bool(normalize_text(a[0]))
+        and normalize_text(a[0]) == normalize_text(b[0])
+        and similarity(a[1], b[1]) >= settings.LIVE_EXTRACTION_STABLE_SIMILARITY
+    )
+
+
+class LiveTranscriptExtractor:
+    """Keeps the company information of one live conversation up to date"""
+
+    def __init__(self, conversation_id: str, user_id: str, llm: ChatOpenAI):
+        """
+        Args:
+            conversation_id: ID of the onboarding conversation
+            user_id: ID of the user having the conversation
+            llm: Chat model used for the extraction updates
+        """
+        self.conversation_id = conversation_id
+        self.user_id = str(user_id)
+        self.llm = llm
+        self.turns: List[str] = []
+        self.processed = 0
+        self.info: Optional[CompanyInfo] = None
+        self.stable_updates = 0
+        self.discovery: Optional[asyncio.Task] = None
+        self.discovery_for: Optional[Tuple[str, str]] = None
+        self.updated_at = time.monotonic()
+        self._task: Optional[asyncio.Task] = None
+
+    def pending_tokens(self) -> int:
+        """Tokens of the turns received but not yet folded into the company info"""
+        return sum(estimate_tokens(turn) for turn in self.turns[self.processed:])
+
+    def add(self, start_index: int, messages: List[Dict[str, str]]) -> None:
+        """
+        Append transcript turns and start an update when enough new text arrived
+
+        Args:
+            start_index: Index of the first message in the conversation; messages already
+                received (e.g. a retried delta) are ignored
+            messages: Messages with role and content
+        """
+        self.updated_at = time.monotonic()
+        skip = len(self.turns) - start_index
+        for message in messages[max(skip, 0):]:
+            self.turns.append(f"{message['role']}: {message['content']}")
+        if (self._task is None or self._task.done()) and self.pending_tokens() >= settings.LIVE_EXTRACTION_MIN_NEW_TOKENS:
+            self._task = asyncio.create_task(self._run(final=False))
+
+    async def _run(self, final: bool) -> None:
+        """Fold pending turns into the company info until too few remain (or none, when final)"""
+        while self.processed < len(self.turns) and (final or self.pending_tokens() >= settings.LIVE_EXTRACTION_MIN_NEW_TOKENS):
+            end = len(self.turns)
+            try:
+                info = await self._update(self.turns[self.processed:end])
+            except Exception as e:
+                logger.warning(f"Live extraction update failed for conversation {self.conversation_id}: {e}")
+                return
+            self.processed = end
+            self._observe(info)
+
+    async def _update(self, new_turns: List[str]) -> CompanyInfo:
+        """Ask the model to update the running company info with new transcript turns"""
+        current = (
+            f"Company name: {self.info.company_name}\nCompany details: {self.info.company_details}"
+            if self.info else "Nothing extracted yet."
+        )
+        transcript = "\n".join(new_turns)
+        prompt = f"""You are an expert business analyst. You are following a live conversation between a user and an AI assistant.
+        Below is what you know about the user's company so far, followed by the newest part of the conversation.
+        Return the updated company name and a comprehensive paragraph summarizing the company, keeping everything that is still true
+        and adding what the new part says about industry, target audience, products or services, challenges, goals, and selling points.
+
+        What you know so far:
+        {current}
+
+        Newest part of the conversation:
+
+        {transcript}
+        """
+        return await ainvoke_structured(self.llm, CompanyInfo, prompt, "live_company_info_extraction")
+
+    def _observe(self, info: CompanyInfo) -> None:
+        """Track how stable the company info is and start competitor discovery once it is"""
+        previous, self.info = self.info, info
+        current = (info.company_name, info.company_details)
+        if previous and _same_company((previous.company_name, previous.company_details), current):
+            self.stable_updates += 1
+        else:
+            self.stable_updates = 0
+        if self.stable_updates < settings.LIVE_EXTRACTION_STABLE_UPDATES:
+            return
+        if self.discovery_for and _same_company(self.discovery_for, current):
+            return
+        if self.discovery:
+            # The company changed after discovery started; discover again for the new one
+            self.discovery.cancel()
+        logger.info(f"Starting competitor discovery for '{info.company_name}' during conversation {self.conversation_id}")
+        self.discovery_for = current
+        self.discovery = asyncio.create_task(qloo_service.build_insights_bundle(*current))
+        # A cancelled or unused discovery's failure is never awaited; mark it as retrieved
+        self.discovery.add_done_callback(lambda task: task.cancelled() or task.exception())
+
+    async def finish(self, final_transcript: str) -> Optional[LiveExtractionResult]:
+        """
+        Fold the remaining turns in and return the result, if it covers the final transcript
+
+        Args:
+            final_transcript: Full transcript received when the conversation ended
+
+        Returns:
+            The final company info and matching discovery bundle, or None if the processed
+            deltas are not the beginning of the transcript, did not cover enough of it, or
+            an update failed
+        """
+        if self._task and not self._task.done():
+            await self._task
+        await self._run(final=True)
+
+        # Turns whose update failed are not in the company info, so only processed turns count
+        seen = "\n".join(self.turns[:self.processed])
+        if not self.info or self.processed < len(self.turns) \
+                or not normalize_text(final_transcript).startswith(normalize_text(seen)) \
+                or estimate_tokens(seen) < settings.LIVE_EXTRACTION_MIN_COVERAGE * estimate_tokens(final_transcript):
+            logger.info(f"Live extraction of conversation {self.conversation_id} does not cover the final transcript")
+            self.cancel()
+            return None
+
+        final = (self.info.company_name, self.info.company_details)
+        bundle = None
+        if self.discovery and self.discovery_for and _same_company(self.discovery_for, final):
+            try:
+                bundle = await self.discovery
+            except Exception as e:
+                logger.warning(f"Live competitor discovery failed for conversation {self.conversation_id}: {e}")
+        elif self.discovery:
+            self.discovery.cancel()
+        return LiveExtractionResult(*final, bundle)
+
+    def cancel(self) -> None:
+        """Stop any running update and discovery"""
+        for task in (self._task, self.discovery):
+            if task and not task.done():
+                task.cancel()
+
+
+class LiveExtractionManager:
+    """Live extractors by conversation ID (state is held in the API process)"""
+
+    def __init__(self):
+        self.llm = ChatOpenAI(
+            api_key=settings.OPENAI_API_KEY,
+            model="gpt-4.1",
+            temperature=0.2
+        )
+        self._extractors: Dict[str, LiveTranscriptExtractor] = {}
+
+    def _evict_idle(self) -> None:
+        """Drop extractors of conversations that stopped sending deltas without finishing"""
+        cutoff = time.monotonic() - settings.LIVE_EXTRACTION_IDLE_SECONDS
+        for conversation_id, extractor in list(self._extractors.items()):
+            if extractor.updated_at < cutoff:
+                extractor.cancel()
+                del self._extractors[conversation_id]
+
+    def add_delta(self, conversation_id: str, user_id: str, start_index: int,
+                  messages: List[Dict[str, str]]) -> LiveTranscriptExtractor:
+        """
+        Feed new transcript messages of a live conversation
+
+        Args:
+            conversation_id: ID of the conversation
+            user_id: ID of the user sending the delta
+            start_index: Index of the first message in the conversation
+            messages: Messages with role and content
+
+        Returns:
+            The extractor of the conversation
+
+        Raises:
+            PermissionError: If the conversation belongs to another user
+        """
+        self._evict_idle()
+        extractor = self._extractors.get(conversation_id)
+        if extractor is None:
+            extractor = self._extractors[conversation_id] = LiveTranscriptExtractor(conversation_id, user_id, self.llm)
+        elif extractor.user_id != str(user_id):
+            raise PermissionError(f"Conversation {conversation_id} belongs to another user")
+        extractor.add(start_index, messages)
+        return extractor
+
+    def discard(self, conversation_id: str) -> None:
+        """Stop and forget the live extraction of a conversation whose result is not needed"""
+        extractor = self._extractors.pop(conversation_id, None)
+        if extractor:
+            extractor.cancel()
+
+    async def finish(self, conversation_id: str, user_id: str, final_transcript: str) -> Optional[LiveExtractionResult]:
+        """
+        End the live extraction of a conversation
+
+        Args:
+            conversation_id: ID of the conversation
+            user_id: ID of the user completing the conversation
+            final_transcript: Full transcript received when the conversation ended
+
+        Returns:
+            The live result, or None if there is none to reuse
+        """
+        extractor = self._extractors.pop(conversation_id, None)
+        if extractor is None:
+            return None
+        if extractor.user_id != str(user_id):
+            logger.warning(f"Live extraction of conversation {conversation_id} belongs to another user; ignoring it")
+            extractor.cancel()
+            return None
+        if not settings.LIVE_EXTRACTION_ENABLED:
+            extractor.cancel()
+            return None
+        try:
+            return await extractor.finish(final_transcript)
+        except Exception as e:
+            logger.warning(f"Could not finish live extraction of conversation {conversation_id}: {e}")
+            extractor.cancel()
+            return None
+
+
+# Initialize the singleton manager
+live_extractions = LiveExtractionManager()
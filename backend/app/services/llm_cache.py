@@ -0,0 +1,112 @@
+"""
+Exact-match cache for structured-output LLM calls, keyed on the model, temperature,
+rendered messages and output schema. Call sites opt in through LLM_CACHE_CALL_SITES.
+"""
+import logging
+from typing import Any, Dict, List, Optional, Type, TypeVar, Union
+
+from langchain_core.messages import BaseMessage, HumanMessage
+from langchain_core.prompts import ChatPromptTemplate
+from langchain_openai import ChatOpenAI
+from pydantic import BaseModel
+
+from app.core.config import settings
+from app.services.cache import TwoTierCache, canonical_key
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T", bound=BaseModel)
+
+llm_response_cache = TwoTierCache(
+    "llm_responses",
+    ttl_seconds=settings.LLM_CACHE_TTL_SECONDS,
+    max_entries=settings.LLM_CACHE_MAX_ENTRIES,
+    collection="llm_response_cache"
+)
+
+# Hit/miss counters per call site
+call_site_stats: Dict[str, Dict[str, int]] = {}
+
+
+def is_enabled(call_site: str) -> bool:
+    """Whether a call site has opted in to the response cache"""
+    enabled = {site.strip() for site in settings.LLM_CACHE_CALL_SITES.split(",") if site.strip()}
+    return "*" in enabled or call_site in enabled
+
+
+def render_messages(prompt: Union[ChatPromptTemplate, str]) -> List[BaseMessage]:
+    """Render a prompt (template without variables, or plain text) into chat messages"""
+    if isinstance(prompt, str):
+        return [HumanMessage(content=prompt)]
+    return prompt.format_messages()
+
+
+def response_key(llm: ChatOpenAI, schema: Union[Type[BaseModel], Dict[str, Any]], messages: List[BaseMessage]) -> str:
+    """
+    Build the cache key of a structured-output call
+
+    Args:
+        llm: Chat model (its model name and temperature are part of the key)
+        schema: Output model class or JSON schema
+        messages: Rendered prompt messages
+
+    Returns:
+        Cache key
+    """
+    return canonical_key({
+        "model": llm.model_name,
+        "temperature": llm.temperature,
+        "schema": schema if isinstance(schema, dict) else schema.model_json_schema(),
+        "messages": [[message.type, message.content] for message in messages],
+    })
+
+
+async def get_cached(call_site: str, key: str) -> Optional[Any]:
+    """Look up a cached response and count the hit or miss for the call site"""
+    stats = call_site_stats.setdefault(call_site, {"hits": 0, "misses": 0})
+    value = await llm_response_cache.get(key)
+    stats["hits" if value is not None else "misses"] += 1
+    return value
+
+
+async def ainvoke_structured(llm: ChatOpenAI, schema: Type[T], prompt: Union[ChatPromptTemplate, str],
+                             call_site: str) -> T:
+    """
+    Invoke a structured-output call, serving identical repeated calls from the cache
+
+    Args:
+        llm: Chat model
+        schema: Pydantic output model
+        prompt: Prompt template without variables, or plain text
+        call_site: Name of the call site, matched against LLM_CACHE_CALL_SITES
+
+    Returns:
+        The parsed output
+    """
+    messages = render_messages(prompt)
+    model_with_structure = llm.with_structured_output(schema)
+    if not is_enabled(call_site):
+        return await model_with_structure.ainvoke(messages)
+
+    key = response_key(llm, schema, messages)
+    cached = await get_cached(call_site, key)
+    if cached is not None:
+        logger.info(f"LLM cache hit for {call_site}")
+        return schema.model_validate(cached)
+
+    result = await model_with_structure.ainvoke(messages)
+    await llm_response_cache.set(key, result.model_dump(mode="json"))
+    return result
+
+
+def get_stats() -> Dict[str, Any]:
+    """Return hit/miss counters and hit rates per call site"""
+    return {
+        call_site: {
+            **stats,
+            "hit_rate": round(stats["hits"] / (stats["hits"] + stats["misses"]), 4)
+            if stats["hits"] + stats["misses"] else 0.0,
+        }
+        for call_site, stats in call_site_stats.items()
+    }
@@ -0,0 +1,165 @@
+"""
+Local candidate matcher used to accept unambiguous tag search results
+without an LLM selection call
+"""
+import re
+from difflib import SequenceMatcher
+from typing import Any, Iterable, List, Optional, Set, Tuple
+
+_STOPWORDS = {
+    "a", "an", "and", "the", "of", "for", "to", "in", "on", "with", "by", "or", "that", "are",
+    "is", "be", "as", "at", "from", "related", "relevant", "select", "find", "choose", "pick",
+    "tag", "tags", "audience", "audiences", "id", "ids", "best", "match", "matching", "most",
+}
+
+# Words in a selection query that ask for several IDs
+_PLURAL_CUES = {
+    "all", "any", "every", "several", "multiple", "some", "tags", "ids", "audiences", "list",
+}
+
+
+def normalize_text(text: str) -> str:
+    """Lower-case, replace punctuation and separators with spaces and collapse whitespace"""
+    return " ".join(re.sub(r"[^a-z0-9]+", " ", text.lower()).split())
+
+
+def _stem(word: str) -> str:
+    """Very small plural stemmer ("restaurants" -> "restaurant", "cafes" -> "cafe")"""
+    if len(word) > 4 and word.endswith("ies"):
+        return word[:-3] + "y"
+    if len(word) > 3 and word.endswith("s") and not word.endswith("ss"):
+        return word[:-1]
+    return word
+
+
+def content_tokens(text: str) -> Set[str]:
+    """Stemmed tokens of a text without stopwords"""
+    return {_stem(word) for word in normalize_text(text).split() if word not in _STOPWORDS}
+
+
+def similarity(candidate: str, reference: str) -> float:
+    """
+    Score how well a candidate title matches a reference query (0 to 1)
+
+    Takes the best of the normalised string ratio and the share of the
+    candidate's content tokens that appear in the reference.
+
+    Args:
+        candidate: Candidate title from the API response
+        reference: Query text the candidate should match
+
+    Returns:
+        Similarity score
+    """
+    a, b = normalize_text(candidate), normalize_text(reference)
+    if not a or not b:
+        return 0.0
+    if a == b:
+        return 1.0
+    ratio = SequenceMatcher(None, a, b).ratio()
+    candidate_tokens, reference_tokens = content_tokens(a), content_tokens(b)
+    containment = len(candidate_tokens & reference_tokens) / len(candidate_tokens) if candidate_tokens else 0.0
+    return max(ratio, containment)
+
+
+def name_similarity(candidate: str, reference: str) -> float:
+    """
+    Score how closely a candidate title matches a short name query (0 to 1)
+
+    Near-exact comparison of the stemmed titles: a candidate that only shares a word
+    with the reference scores low, so a short title is never accepted because it
+    appears inside a longer query.
+
+    Args:
+        candidate: Candidate title from the API response
+        reference: Name query the candidate should match (e.g. a tag search filter_query)
+
+    Returns:
+        Similarity score
+    """
+    a = " ".join(_stem(word) for word in normalize_text(candidate).split())
+    b = " ".join(_stem(word) for word in normalize_text(reference).split())
+    if not a or not b:
+        return 0.0
+    if a == b:
+        return 1.0
+    return SequenceMatcher(None, a, b).ratio()
+
+
+def wants_several(query: str) -> bool:
+    """
+    Whether a selection query asks for more than one ID ("all", "tags", "audience IDs", ...)
+
+    Args:
+        query: Query describing which IDs to select
+
+    Returns:
+        True when the query asks for several IDs
+    """
+    return bool(set(normalize_text(query).split()) & _PLURAL_CUES)
+
+
+def _humanize_urn(urn: str) -> str:
+    """'urn:audience:life_stage' -> 'life stage'"""
+    return urn.rsplit(":", 1)[-1].replace("_", " ")
+
+
+def extract_candidates(data: Any) -> List[Tuple[str, str]]:
+    """
+    Collect (id, title) pairs from a tag or audience search response
+
+    Args:
+        data: Raw API response
+
+    Returns:
+        Candidates in response order, without duplicates
+    """
+    candidates: List[Tuple[str, str]] = []
+    seen = set()
+
+    def walk(value: Any) -> None:
+        if isinstance(value, dict):
+            candidate_id = value.get("id") or value.get("tag_id") or value.get("entity_id")
+            if not candidate_id and isinstance(value.get("type"), str) and value["type"].startswith("urn:audience"):
+                candidate_id = value["type"]
+            if isinstance(candidate_id, str) and candidate_id not in seen:
+                name = value.get("name") or _humanize_urn(candidate_id)
+                seen.add(candidate_id)
+                candidates.append((candidate_id, str(name)))
+                return
+            for item in value.values():
+                walk(item)
+        elif isinstance(value, list):
+            for item in value:
+                walk(item)
+
+    walk(data)
+    return candidates
+
+
+def pick_confident_match(candidates: List[Tuple[str, str]], references: Iterable[str],
+                         threshold: float, margin: float) -> Optional[str]:
+    """
+    Return the candidate ID when one candidate clearly matches the references
+
+    Args:
+        candidates: (id, title) pairs
+        references: Name queries to score against with name_similarity (best score wins)
+        threshold: Minimum score for the top candidate
+        margin: Minimum lead of the top candidate over the runner-up
+
+    Returns:
+        The confident candidate ID, or None when the result set is ambiguous
+    """
+    references = [reference for reference in references if reference]
+    if not candidates or not references:
+        return None
+    scored = sorted(
+        ((max(name_similarity(name, reference) for reference in references), candidate_id) for candidate_id, name in candidates),
+        reverse=True
+    )
+    top_score, top_id = scored[0]
+    runner_up = scored[1][0] if len(scored) > 1 else 0.0
+    if top_score >= threshold and top_score - runner_up >= margin:
+        return top_id
+    return None
@@ -0,0 +1,348 @@
+"""
+Post-onboarding pipeline shared by the OpenAI realtime and Tavus flows: extracts the
+company information, discovers similar companies and completes the user's onboarding,
+running independent steps concurrently and timing each of them
+"""
+import asyncio
+import logging
+import time
+from datetime import datetime, timezone
+from typing import Any, Awaitable, Dict, Optional, Tuple, TypeVar
+
+from bson.objectid import ObjectId
+from langchain_openai import ChatOpenAI
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from pydantic import BaseModel, Field
+
+from app.core.config import settings
+from app.db.client import get_async_mongodb_db
+from app.services.insights_bundle import save_insights_bundle
+from app.services.live_extraction import live_extractions
+from app.services.llm_cache import ainvoke_structured
+from app.services.matcher import normalize_text, similarity
+from app.services.prompt_budget import truncate_text
+from app.services.qloo import qloo_service
+from app.services.singleflight import SingleFlight
+from app.services.transcript_dedupe import transcript_extractions, transcript_hash
+from app.services.transcript_processor import extract_company_info_from_transcript
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# Concurrent pipeline runs for the same user and transcript share one run
+onboarding_flight = SingleFlight("onboarding_pipeline")
+
+
+class CompanyHeadline(BaseModel):
+    """Company name and a one-line description, extracted quickly from the start of a call"""
+    company_name: str = Field(
+        description="The company name mentioned in the conversation, or an empty string if none is mentioned"
+    )
+    summary: str = Field(
+        description="One sentence describing what the company does and for whom"
+    )
+
+
+async def find_and_store_similar_companies(db: AsyncIOMotorDatabase, user_id: str, user_metadata: Dict[str, Any],
+                                           bundle: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """
+    Find and store similar companies for a user based on their company information
+
+    Args:
+        db: MongoDB database connection
+        user_id: User ID as string
+        user_metadata: User metadata containing company information
+        bundle: Insights bundle already built for this company (e.g. during the live call)
+
+    Returns:
+        Dictionary with results information
+    """
+    try:
+        company_name = user_metadata.get("company_name", "")
+        company_details = user_metadata.get("company_details", "")
+
+        if not company_name:
+            print(f"No company name found in metadata for user {user_id}")
+            return {"success": False, "message": "No company information available"}
+
+        if not company_details:
+            print(f"No company details found in metadata for user {user_id}")
+            return {"success": False, "message": "No company information available"}
+
+        # Get similar companies using the QLoo service, keeping the resolved plan for campaign generation
+        if bundle is None:
+            bundle = await qloo_service.build_insights_bundle(company_name, company_details)
+        similar_companies = bundle["entities"]
+        try:
+            await save_insights_bundle(user_id, bundle)
+        except Exception as e:
+            print(f"Error storing Qloo insights bundle for user {user_id}: {str(e)}")
+
+        # Store competitors in the database
+        if similar_companies:
+            competitor_entry = {
+                "user_id": user_id,
+                "competitors_data": similar_companies,
+                "source": "qloo",
+                "created_at": datetime.now(timezone.utc),
+                "updated_at": datetime.now(timezone.utc)
+            }
+
+            # Insert competitor entry
+            result = await db.competitors.insert_one(competitor_entry)
+            print(f"Stored competitors data with {len(similar_companies)} companies for user {user_id}")
+
+            return {
+                "success": True,
+                "count": len(similar_companies),
+                "insert_id": str(result.inserted_id)
+            }
+        else:
+            print(f"No similar companies found for {company_name}")
+            return {"success": False, "message": "No similar companies found"}
+
+    except Exception as e:
+        print(f"Error finding and storing similar companies: {str(e)}")
+        import traceback
+        print(traceback.format_exc())
+        return {"success": False, "error": str(e)}
+
+
+async def _timed(timings: Dict[str, int], step: str, awaitable: Awaitable[T]) -> T:
+    """Await a step and record its duration in milliseconds"""
+    started = time.perf_counter()
+    try:
+        return await awaitable
+    finally:
+        timings[step] = round((time.perf_counter() - started) * 1000)
+
+
+async def extract_company_headline(transcript: str) -> Optional[CompanyHeadline]:
+    """
+    Extract the company name and a one-line description from the start of a transcript
+
+    Args:
+        transcript: Plain text of the conversation transcript
+
+    Returns:
+        The headline, or None if the extraction failed
+    """
+    llm = ChatOpenAI(
+        api_key=settings.OPENAI_API_KEY,
+        model="gpt-4.1",
+        temperature=0.2
+    )
+    # Companies introduce themselves early in the call, so the beginning is enough
+    excerpt = truncate_text(transcript, settings.ONBOARDING_HEADLINE_TOKENS)
+    prompt = f"""You are an expert business analyst. Read the beginning of this conversation transcript between a user and an AI assistant.
+    Return the name of the user's company and one sentence describing what it does and for whom.
+
+    Here is the beginning of the conversation transcript:
+
+    {excerpt}
+    """
+    try:
+        return await ainvoke_structured(llm, CompanyHeadline, prompt, "company_headline_extraction")
+    except Exception as e:
+        logger.warning(f"Company headline extraction failed: {e}")
+        return None
+
+
+async def _extract_and_discover(user_id: str, conversation_id: str, transcript: str,
+                                timings: Dict[str, int]) -> Tuple[str, str, Optional[Dict[str, Any]]]:
+    """
+    Extract the company information and discover similar companies
+
+    Reuses the live extraction of the call when it covers the transcript. Otherwise the full
+    extraction runs alongside a quick headline extraction, and competitor discovery starts
+    from the headline while the details are still being extracted; its result is kept when
+    the full extraction names the same company and the headline summary agrees with the
+    extracted details. Otherwise discovery runs again from the full details.
+
+    Args:
+        user_id: ID of the user who had the conversation
+        conversation_id: ID of the conversation
+        transcript: Plain text of the conversation transcript
+        timings: Per-step timings to record into
+
+    Returns:
+        Tuple of (company_name, company_details, insights bundle or None)
+    """
+    live = await _timed(timings, "live_extraction", live_extractions.finish(conversation_id, user_id, transcript))
+    bundle = live.bundle if live else None
+    if live:
+        company_name, company_details = live.company_name, live.company_details
+    else:
+        extraction = asyncio.create_task(_timed(timings, "extraction", extract_company_info_from_transcript(transcript)))
+        headline_task = asyncio.create_task(_timed(timings, "headline_extraction", extract_company_headline(transcript)))
+        await asyncio.wait({extraction, headline_task}, return_when=asyncio.FIRST_COMPLETED)
+
+        discovery = None
+        headline = headline_task.result() if headline_task.done() else None
+        if headline and normalize_text(headline.company_name) and not extraction.done():
+            discovery = asyncio.create_task(_timed(
+                timings, "early_discovery",
+                qloo_service.build_insights_bundle(headline.company_name, headline.summary)
+            ))
+            # A discarded discovery's failure is never awaited; mark it as retrieved
+            discovery.add_done_callback(lambda task: task.cancelled() or task.exception())
+        elif not headline_task.done():
+            headline_task.cancel()
+
+        company_name, company_details = await extraction
+        if discovery and normalize_text(company_name) == normalize_text(headline.company_name) \
+                and similarity(headline.summary, company_details) >= settings.ONBOARDING_HEADLINE_MIN_SIMILARITY:
+            try:
+                bundle = await discovery
+            except Exception as e:
+                logger.warning(f"Early competitor discovery failed for user {user_id}: {e}")
+        elif discovery:
+            discovery.cancel()
+
+    if not company_name:
+        logger.warning(f"Failed to extract company name from transcript for conversation_id: {conversation_id}")
+
+    # Discover from the full company info unless an earlier discovery is reused
+    if bundle is None and company_name and company_details:
+        try:
+            bundle = await _timed(timings, "discovery", qloo_service.build_insights_bundle(company_name, company_details))
+        except Exception as e:
+            logger.warning(f"Competitor discovery failed for user {user_id}: {e}")
+    return company_name, company_details, bundle
+
+
+async def run_onboarding_pipeline(user_id: str, conversation_id: str, transcript: str) -> Dict[str, Any]:
+    """
+    Complete a user's onboarding from the final conversation transcript
+
+    Processing is deduplicated by transcript content: concurrent calls for the same user and
+    transcript share one run, duplicates in other processes wait for the stored result, and
+    a transcript that was already processed for the user returns immediately.
+
+    Args:
+        user_id: ID of the user who had the conversation
+        conversation_id: ID of the conversation
+        transcript: Plain text of the conversation transcript
+
+    Returns:
+        Dictionary with the results and per-step timings in milliseconds
+    """
+    key = transcript_hash(transcript)
+    return await onboarding_flight.do(
+        f"{user_id}:{key}",
+        lambda: _run_onboarding_pipeline(user_id, conversation_id, transcript, key)
+    )
+
+
+async def _run_onboarding_pipeline(user_id: str, conversation_id: str, transcript: str, key: str) -> Dict[str, Any]:
+    """
+    Run the onboarding pipeline for a transcript hash
+
+    The company information and bundle come from the stored result of the hash or from
+    _extract_and_discover; the user is then updated in a single write, concurrently with
+    storing the competitors, and the step timings are recorded on the user last.
+
+    Args:
+        user_id: ID of the user who had the conversation
+        conversation_id: ID of the conversation
+        transcript: Plain text of the conversation transcript
+        key: Hash of the transcript
+
+    Returns:
+        Dictionary with the results and per-step timings in milliseconds
+    """
+    db = await get_async_mongodb_db()
+    timings: Dict[str, int] = {}
+    started = time.perf_counter()
+
+    claim = await _timed(timings, "dedupe", transcript_extractions.claim(key))
+    if claim.stored:
+        stored = claim.stored
+        # The live extraction of this conversation has nothing left to contribute
+        live_extractions.discard(conversation_id)
+        if str(user_id) in stored.get("completed_users", []):
+            logger.info(f"Transcript {key[:12]} was already processed for user {user_id}; skipping")
+            return {
+                "success": True,
+                "deduplicated": True,
+                "company_name": stored["company_name"],
+                "conversation_id": conversation_id,
+                "user_id": user_id,
+            }
+        logger.info(f"Reusing stored extraction of transcript {key[:12]} for user {user_id}")
+        company_name, company_details, bundle = stored["company_name"], stored["company_details"], stored.get("bundle")
+    else:
+        try:
+            company_name, company_details, bundle = await _extract_and_discover(user_id, conversation_id, transcript, timings)
+        except BaseException:
+            await transcript_extractions.release(key, claim.token)
+            raise
+        if company_name:
+            await transcript_extractions.complete(key, claim.token, {
+                "company_name": company_name,
+                "company_details": company_details,
+                "bundle": bundle,
+            })
+        else:
+            # Failed extractions are not stored, so a retry extracts again
+            await transcript_extractions.release(key, claim.token)
+
+    metadata = {"company_name": company_name, "company_details": company_details}
+    now = datetime.now(timezone.utc)
+    completed = {
+        **metadata,
+        "transcript_processed_at": now,
+        "processed_conversation_id": conversation_id,
+        "onboarding_state": "completed",
+        "conversation_id": conversation_id,
+    }
+    # One write for the result: merge into the stored metadata server-side instead of re-reading the user
+    # ($literal keeps extracted text starting with "$" from being read as a field path)
+    write = db.users.update_one(
+        {"_id": ObjectId(user_id)},
+        [{"$set": {
+            "user_metadata": {"$mergeObjects": [{"$ifNull": ["$user_metadata", {}]}, {"$literal": completed}]},
+            "is_onboarded": True,
+            "updated_at": now,
+        }}]
+    )
+    if bundle is not None or not (company_name and company_details):
+        store_competitors = find_and_store_similar_companies(db, user_id, metadata, bundle=bundle)
+    else:
+        store_competitors = _discovery_failed()
+    user_result, competitors = await asyncio.gather(
+        _timed(timings, "user_update", write),
+        _timed(timings, "competitors", store_competitors),
+    )
+
+    timings["total"] = round((time.perf_counter() - started) * 1000)
+    logger.info(f"Onboarding pipeline for user {user_id} finished: {timings}")
+
+    if user_result.matched_count == 0:
+        logger.error(f"User not found with ID: {user_id}")
+        return {"success": False, "error": "User not found", "timings": timings}
+
+    # Stored once every step has run, so they include the writes and the total
+    await db.users.update_one(
+        {"_id": ObjectId(user_id)},
+        {"$set": {"user_metadata.onboarding_timings": dict(timings)}}
+    )
+
+    if company_name:
+        await transcript_extractions.add_completed_user(key, user_id)
+
+    return {
+        "success": True,
+        "company_name": company_name,
+        "conversation_id": conversation_id,
+        "user_id": user_id,
+        "competitors": competitors,
+        "timings": timings,
+    }
+
+
+async def _discovery_failed() -> Dict[str, Any]:
+    """Competitor result when discovery failed (it is not retried within the same run)"""
+    return {"success": False, "message": "Competitor discovery failed"}
@@ -0,0 +1,157 @@
+"""
+Campaign progress events: an in-process pub/sub broker whose events are also persisted
+to MongoDB, so subscribers in the API process see events published by workers running
+in other processes (through change streams) and late subscribers can replay them
+"""
+import asyncio
+import logging
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Any, AsyncIterator, Dict, Optional, Set
+
+from motor.motor_asyncio import AsyncIOMotorCollection
+
+from app.core.config import settings
+from app.db.client import get_async_mongodb_db
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Events after which a campaign produces no further progress
+TERMINAL_EVENTS = {"processed", "cancelled", "failed"}
+
+
+class ProgressBroker:
+    """Publishes campaign progress events and streams them to subscribers"""
+
+    def __init__(self, collection: str = "campaign_events", queue_size: int = 100):
+        """
+        Args:
+            collection: MongoDB collection the events are persisted to
+            queue_size: Maximum number of undelivered events kept per subscriber
+        """
+        self.collection_name = collection
+        self.queue_size = queue_size
+        self._subscribers: Dict[str, Set[asyncio.Queue]] = {}
+        self._index_ready = False
+
+    async def _collection(self) -> AsyncIOMotorCollection:
+        """Return the backing collection, creating the indexes on first use"""
+        db = await get_async_mongodb_db()
+        collection = db[self.collection_name]
+        if not self._index_ready:
+            await collection.create_index("expires_at", expireAfterSeconds=0)
+            await collection.create_index([("campaign_id", 1), ("at", 1)])
+            self._index_ready = True
+        return collection
+
+    def _deliver(self, event: Dict[str, Any]) -> None:
+        """Hand an event to the subscribers in this process"""
+        for queue in self._subscribers.get(event["campaign_id"], ()):
+            try:
+                queue.put_nowait(event)
+            except asyncio.QueueFull:
+                logger.warning(f"Dropping progress event for slow subscriber of campaign {event['campaign_id']}")
+
+    async def publish(self, campaign_id: str, event: str, data: Optional[Dict[str, Any]] = None) -> None:
+        """
+        Publish a progress event for a campaign
+
+        Args:
+            campaign_id: ID of the campaign
+            event: Event name (e.g. planning_completed)
+            data: Optional JSON-serialisable details
+        """
+        now = datetime.now(timezone.utc)
+        message = {
+            "id": uuid.uuid4().hex,
+            "campaign_id": campaign_id,
+            "event": event,
+            "data": data or {},
+            "at": now.isoformat(),
+        }
+        self._deliver(message)
+        try:
+            collection = await self._collection()
+            await collection.insert_one({
+                **message,
+                "_id": message["id"],
+                "expires_at": now + timedelta(seconds=settings.PROGRESS_EVENTS_TTL_SECONDS),
+            })
+        except Exception as e:
+            logger.warning(f"Could not persist progress event {event} for campaign {campaign_id}: {e}")
+
+    @staticmethod
+    def _from_document(document: Dict[str, Any]) -> Dict[str, Any]:
+        return {key: document[key] for key in ("id", "campaign_id", "event", "data", "at")}
+
+    async def _watch(self, campaign_id: str, queue: asyncio.Queue, ready: asyncio.Event) -> None:
+        """Feed events inserted by other processes into a subscriber queue"""
+        try:
+            collection = await self._collection()
+            pipeline = [{"$match": {"operationType": "insert", "fullDocument.campaign_id": campaign_id}}]
+            async with collection.watch(pipeline) as stream:
+                ready.set()
+                async for change in stream:
+                    try:
+                        queue.put_nowait(self._from_document(change["fullDocument"]))
+                    except asyncio.QueueFull:
+                        logger.warning(f"Dropping progress event for slow subscriber of campaign {campaign_id}")
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            # Change streams need a replica set; fall back to in-process events only
+            logger.warning(f"Progress change stream unavailable for campaign {campaign_id}: {e}")
+        finally:
+            ready.set()
+
+    async def subscribe(self, campaign_id: str, keepalive_seconds: float) -> AsyncIterator[Optional[Dict[str, Any]]]:
+        """
+        Stream the events of a campaign: stored events first, then live ones
+
+        Args:
+            campaign_id: ID of the campaign
+            keepalive_seconds: Yield None after this long without an event
+
+        Yields:
+            Events without duplicates, or None as a keep-alive tick
+        """
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+        self._subscribers.setdefault(campaign_id, set()).add(queue)
+        watcher = None
+        seen: Set[str] = set()
+        try:
+            if settings.PROGRESS_CHANGE_STREAMS_ENABLED:
+                # Open the change stream before replaying, so no event falls in between
+                ready = asyncio.Event()
+                watcher = asyncio.create_task(self._watch(campaign_id, queue, ready))
+                await ready.wait()
+            try:
+                collection = await self._collection()
+                async for document in collection.find({"campaign_id": campaign_id}).sort("at", 1):
+                    seen.add(document["id"])
+                    yield self._from_document(document)
+            except Exception as e:
+                logger.warning(f"Could not replay progress events for campaign {campaign_id}: {e}")
+
+            while True:
+                try:
+                    event = await asyncio.wait_for(queue.get(), keepalive_seconds)
+                except asyncio.TimeoutError:
+                    yield None
+                    continue
+                if event["id"] in seen:
+                    continue
+                seen.add(event["id"])
+                yield event
+        finally:
+            subscribers = self._subscribers.get(campaign_id, set())
+            subscribers.discard(queue)
+            if not subscribers:
+                self._subscribers.pop(campaign_id, None)
+            if watcher:
+                watcher.cancel()
+
+
+# Initialize the singleton broker
+progress_broker = ProgressBroker()
@@ -0,0 +1,211 @@
+"""
+Token-budgeted assembly of the campaign prompts: splits a prompt's budget across its
+sections (company details, transcript, Qloo data), trims each section to its share and
+records what was trimmed so it can be stored with the campaign
+"""
+import logging
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.core.config import settings
+from app.services.prompt_payload import compact_payload_with_stats, estimate_tokens
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Relative share of the budget each section gets when the sections do not all fit
+SECTION_WEIGHTS: Dict[str, float] = {
+    "company_details": 1.0,
+    "transcript": 2.0,
+    "qloo_data": 2.0,
+}
+
+# Share of the transcript budget spent on the opening turns; the rest goes to the latest turns
+TRANSCRIPT_HEAD_SHARE = 1 / 3
+
+
+def allocate_budget(total: int, demands: Dict[str, int]) -> Dict[str, int]:
+    """
+    Split a token budget across sections by weight, giving unused shares to the others
+
+    Sections that need less than their weighted share get exactly what they need; the
+    remaining budget is re-divided among the other sections until none fits.
+
+    Args:
+        total: Token budget of the prompt sections
+        demands: Section name -> tokens the untrimmed section needs
+
+    Returns:
+        Section name -> token budget
+    """
+    allocation: Dict[str, int] = {}
+    remaining = dict(demands)
+    left = total
+    while remaining:
+        weight_sum = sum(SECTION_WEIGHTS.get(name, 1.0) for name in remaining)
+        share = {name: left * SECTION_WEIGHTS.get(name, 1.0) / weight_sum for name in remaining}
+        satisfied = {name: demand for name, demand in remaining.items() if demand <= share[name]}
+        if not satisfied:
+            allocation.update({name: int(share[name]) for name in remaining})
+            break
+        for name, demand in satisfied.items():
+            allocation[name] = demand
+            left -= demand
+            del remaining[name]
+    return allocation
+
+
+def truncate_text(text: str, budget: int) -> str:
+    """
+    Cut a text at a word boundary so it fits a token budget
+
+    Args:
+        text: Text to trim
+        budget: Token budget
+
+    Returns:
+        The text, or its beginning followed by "..."
+    """
+    tokens = estimate_tokens(text)
+    if tokens <= budget:
+        return text
+    cut = int(len(text) * budget / tokens)
+    while cut > 0:
+        candidate = text[:cut].rsplit(None, 1)[0] if " " in text[:cut] else text[:cut]
+        candidate = candidate.rstrip() + "..."
+        if estimate_tokens(candidate) <= budget:
+            return candidate
+        cut = int(cut * 0.9)
+    return ""
+
+
+def format_transcript(messages: List[Dict[str, Any]]) -> List[str]:
+    """Format transcript messages as "sender: text" turns"""
+    return [f"{msg.get('sender', 'unknown')}: {msg.get('text', '')}" for msg in messages]
+
+
+def fit_transcript(messages: List[Dict[str, Any]], budget: int) -> Tuple[str, Dict[str, Any]]:
+    """
+    Fit a transcript to a token budget by eliding its middle turns
+
+    The opening turns (company introduction) and the latest turns (current requirements)
+    are kept; the turns in between are replaced by a marker saying how many were omitted.
+
+    Args:
+        messages: Transcript messages with sender and text
+        budget: Token budget
+
+    Returns:
+        The transcript text and the trimming decision
+    """
+    turns = format_transcript(messages)
+    costs = [estimate_tokens(turn) for turn in turns]
+    decision = {"tokens": sum(costs), "budget": budget, "messages": len(turns)}
+    if sum(costs) <= budget:
+        return "\n\n".join(turns), {**decision, "kept_tokens": sum(costs), "action": "kept"}
+
+    marker_cost = estimate_tokens("[... 1000 messages omitted ...]")
+    available = max(budget - marker_cost, 0)
+    head_end, tail_start, used = 0, len(turns), 0
+    while head_end < tail_start and used + costs[head_end] <= available * TRANSCRIPT_HEAD_SHARE:
+        used += costs[head_end]
+        head_end += 1
+    while tail_start > head_end and used + costs[tail_start - 1] <= available:
+        tail_start -= 1
+        used += costs[tail_start]
+
+    tail = turns[tail_start:]
+    if not head_end and not tail:
+        # Not even the latest turn fits: keep as much of it as the budget allows
+        tail_start -= 1
+        tail = [truncate_text(turns[-1], available)]
+    omitted = tail_start - head_end
+    kept = turns[:head_end]
+    if omitted:
+        kept.append(f"[... {omitted} messages omitted ...]")
+    kept.extend(tail)
+
+    text = "\n\n".join(kept)
+    return text, {**decision, "kept_tokens": estimate_tokens(text), "action": "elided_middle" if omitted else "truncated", "omitted_messages": omitted}
+
+
+def fit_text(text: str, budget: int) -> Tuple[str, Dict[str, Any]]:
+    """
+    Fit free text to a token budget by truncating it
+
+    Args:
+        text: Text to trim
+        budget: Token budget
+
+    Returns:
+        The text and the trimming decision
+    """
+    tokens = estimate_tokens(text)
+    fitted = truncate_text(text, budget)
+    return fitted, {
+        "tokens": tokens,
+        "budget": budget,
+        "kept_tokens": estimate_tokens(fitted),
+        "action": "kept" if fitted == text else "truncated",
+    }
+
+
+def fit_qloo_data(data: List[Dict[str, Any]], budget: int) -> Tuple[str, Dict[str, Any]]:
+    """
+    Fit Qloo entities to a token budget by dropping the lowest-ranked ones
+
+    Args:
+        data: Qloo entities in ranking order
+        budget: Token budget
+
+    Returns:
+        Minified JSON (braces are NOT escaped for prompt templates) and the trimming decision
+    """
+    text, dropped = compact_payload_with_stats(data, "campaign_insights", budget)
+    return text, {
+        "entities": len(data),
+        "budget": budget,
+        "kept_tokens": estimate_tokens(text),
+        "action": "dropped_items" if dropped else "kept",
+        "dropped_entities": dropped,
+    }
+
+
+def budget_prompt_sections(prompt: str, total_budget: int, company_details: str,
+                           transcript: List[Dict[str, Any]],
+                           qloo_data: Optional[List[Dict[str, Any]]] = None) -> Tuple[Dict[str, str], Dict[str, Any]]:
+    """
+    Trim the variable sections of a campaign prompt to a shared token budget
+
+    Args:
+        prompt: Prompt name, used in logs and the decision record
+        total_budget: Token budget for all sections together
+        company_details: Company details text
+        transcript: Conversation transcript messages
+        qloo_data: Qloo entities, for prompts that include them
+
+    Returns:
+        Section name -> fitted text (braces NOT escaped) and the budgeting decisions
+    """
+    demands = {
+        "company_details": estimate_tokens(company_details or ""),
+        "transcript": estimate_tokens("\n\n".join(format_transcript(transcript))),
+    }
+    if qloo_data:
+        # The Qloo section never grows past its own cap, even when the other sections are small
+        qloo_cap = settings.PROMPT_CAMPAIGN_INSIGHTS_TOKEN_BUDGET
+        demands["qloo_data"] = min(estimate_tokens(compact_payload_with_stats(qloo_data, "campaign_insights", qloo_cap)[0]), qloo_cap)
+
+    allocation = allocate_budget(total_budget, demands)
+    sections: Dict[str, str] = {}
+    decisions: Dict[str, Any] = {}
+    sections["company_details"], decisions["company_details"] = fit_text(company_details or "", allocation["company_details"])
+    sections["transcript"], decisions["transcript"] = fit_transcript(transcript, allocation["transcript"])
+    if qloo_data:
+        sections["qloo_data"], decisions["qloo_data"] = fit_qloo_data(qloo_data, allocation["qloo_data"])
+
+    trimmed = [name for name, decision in decisions.items() if decision["action"] != "kept"]
+    logger.info(
+        f"Prompt '{prompt}': ~{sum(demands.values())} tokens of sections for a budget of {total_budget}"
+        + (f", trimmed {', '.join(trimmed)}" if trimmed else "")
+    )
+    return sections, {"budget": total_budget, "sections": decisions}
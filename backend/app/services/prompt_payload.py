@@ -0,0 +1,206 @@
+"""
+Compact serialisation of API payloads embedded in LLM prompts: keeps only the fields
+each prompt needs, minifies the JSON and trims it to a per-prompt token budget
+"""
+import json
+import logging
+import math
+import re
+from typing import Any, Dict, FrozenSet, NamedTuple, Optional, Tuple
+
+from app.core.config import settings
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+_TOKEN_PATTERN = re.compile(r"[A-Za-z]+|\d|[^\sA-Za-z\d]")
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Approximate the number of BPE tokens in a text without a tokenizer download
+
+    Words count one token per four letters, digits and punctuation one token each,
+    which tracks OpenAI tokenizers closely for English prose and JSON.
+
+    Args:
+        text: Text to measure
+
+    Returns:
+        Estimated token count
+    """
+    return sum(
+        math.ceil(len(piece) / 4) if piece[0].isalpha() else 1
+        for piece in _TOKEN_PATTERN.findall(text)
+    )
+
+
+class Projection(NamedTuple):
+    """Fields kept for one prompt"""
+    keep: FrozenSet[str]
+    drop: FrozenSet[str]
+    max_string_length: int
+    budget_setting: str
+
+
+# Sub-trees that never help the model choose IDs or write a campaign
+_NOISE = frozenset({
+    "images", "image", "external", "websites", "url", "urls", "akas", "hours",
+    "phone", "geocode", "specialty_dishes", "menu", "reviews", "good_for",
+})
+
+PROJECTIONS: Dict[str, Projection] = {
+    "tag_selection": Projection(
+        keep=frozenset({"id", "tag_id", "name", "type", "subtype", "types"}),
+        drop=_NOISE | {"properties"},
+        max_string_length=120,
+        budget_setting="PROMPT_TAG_SELECTION_TOKEN_BUDGET",
+    ),
+    "audience_selection": Projection(
+        keep=frozenset({"id", "entity_id", "name", "type", "parents"}),
+        drop=_NOISE | {"properties"},
+        max_string_length=120,
+        budget_setting="PROMPT_AUDIENCE_SELECTION_TOKEN_BUDGET",
+    ),
+    "campaign_insights": Projection(
+        keep=frozenset({
+            "name", "type", "subtype", "popularity", "affinity",
+            "short_description", "description", "keywords", "address", "price_level",
+        }),
+        drop=_NOISE | {"entity_id", "tag_id", "id", "disambiguation", "location", "business_rating"},
+        max_string_length=300,
+        budget_setting="PROMPT_CAMPAIGN_INSIGHTS_TOKEN_BUDGET",
+    ),
+}
+
+
+def _project(value: Any, projection: Projection) -> Any:
+    """Recursively keep whitelisted leaves, walking into containers that are not dropped"""
+    if isinstance(value, dict):
+        projected = {}
+        for key, item in value.items():
+            if key in projection.drop:
+                continue
+            if isinstance(item, (dict, list)):
+                item = _project(item, projection)
+                if item:
+                    projected[key] = item
+            elif key in projection.keep and item not in (None, ""):
+                if isinstance(item, str) and len(item) > projection.max_string_length:
+                    item = item[:projection.max_string_length].rstrip() + "..."
+                projected[key] = item
+        return projected
+    if isinstance(value, list):
+        items = [_project(item, projection) for item in value]
+        return [item for item in items if item not in ({}, [], None)]
+    return value
+
+
+def _ranked_list(value: Any) -> list:
+    """
+    Find the ranked result list of a payload: the payload itself when it is a list, else the
+    longest list reachable through dicts only (never a list nested inside a result, such as
+    an entity's tags)
+    """
+    if isinstance(value, list):
+        return value
+    best: list = []
+    for child in value.values() if isinstance(value, dict) else []:
+        candidate = child if isinstance(child, list) else _ranked_list(child)
+        if len(candidate) > len(best):
+            best = candidate
+    return best
+
+
+def _longest_list(value: Any) -> list:
+    """Find the longest list anywhere inside a payload"""
+    best = value if isinstance(value, list) else []
+    children = value.values() if isinstance(value, dict) else value if isinstance(value, list) else []
+    for child in children:
+        if isinstance(child, (dict, list)):
+            candidate = _longest_list(child)
+            if len(candidate) > len(best):
+                best = candidate
+    return best
+
+
+def _dumps(value: Any) -> str:
+    return json.dumps(value, separators=(",", ":"), ensure_ascii=False, default=str)
+
+
+def compact_payload_with_stats(data: Any, prompt: str, budget: Optional[int] = None) -> Tuple[str, int]:
+    """
+    Serialise an API payload for a prompt: project, minify and trim to the token budget
+
+    Args:
+        data: Raw API payload (dict or list)
+        prompt: Projection name from PROJECTIONS
+        budget: Token budget overriding the projection's budget setting
+
+    Returns:
+        Minified JSON string (braces are NOT escaped for prompt templates) and the number of
+        ranked results dropped
+    """
+    projection = PROJECTIONS[prompt]
+    if budget is None:
+        budget = getattr(settings, projection.budget_setting)
+    tokens_before = estimate_tokens(json.dumps(data, indent=2, default=str))
+
+    payload = _project(data, projection)
+    text = _dumps(payload)
+    tokens = estimate_tokens(text)
+
+    # Keep the longest prefix of the ranked results (API results are ranked) that fits the budget
+    items = _ranked_list(payload)
+    dropped = 0
+    if tokens > budget and items:
+        ranked = list(items)
+        low, high = 0, len(ranked)
+        while low < high:
+            middle = (low + high + 1) // 2
+            items[:] = ranked[:middle]
+            if estimate_tokens(_dumps(payload)) <= budget:
+                low = middle
+            else:
+                high = middle - 1
+        # Keep at least the top result; it is trimmed below if it does not fit on its own
+        low = max(low, 1)
+        items[:] = ranked[:low]
+        dropped = len(ranked) - low
+        text = _dumps(payload)
+        tokens = estimate_tokens(text)
+
+    # Still over budget (a single oversized result): trim the longest nested lists, then cut the text
+    while tokens > budget:
+        nested = max((_longest_list(item) for item in items), key=len, default=[]) if items else _longest_list(payload)
+        if not nested:
+            break
+        nested.pop()
+        text = _dumps(payload)
+        tokens = estimate_tokens(text)
+    if tokens > budget:
+        while len(text) > 3 and estimate_tokens(text) > budget:
+            text = text[:int(len(text) * min(budget / estimate_tokens(text), 0.9)) - 3] + "..."
+        tokens = estimate_tokens(text)
+        logger.warning(f"Prompt payload '{prompt}' was hard-truncated to fit {budget} tokens")
+
+    logger.info(
+        f"Prompt payload '{prompt}': ~{tokens_before} -> ~{tokens} tokens"
+        + (f" ({dropped} results dropped to fit {budget})" if dropped else "")
+    )
+    return text, dropped
+
+
+def compact_payload(data: Any, prompt: str, budget: Optional[int] = None) -> str:
+    """
+    Serialise an API payload for a prompt: project, minify and trim to the token budget
+
+    Args:
+        data: Raw API payload (dict or list)
+        prompt: Projection name from PROJECTIONS
+        budget: Token budget overriding the projection's budget setting
+
+    Returns:
+        Minified JSON string (braces are NOT escaped for prompt templates)
+    """
+    return compact_payload_with_stats(data, prompt, budget)[0]
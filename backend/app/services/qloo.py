@@ -1,15 +1,24 @@
-import json
+import asyncio
 import logging
-from typing import Dict, List, Any, Optional, TypedDict, Annotated, Sequence
+from functools import lru_cache
+from typing import Dict, List, Any, Literal, Optional, Tuple, Type, TypedDict, Annotated, Sequence, Union
 import httpx
 
 from traceloop.sdk import Traceloop
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, create_model
 from langchain_openai import ChatOpenAI
 from langchain_core.prompts import ChatPromptTemplate
 from langgraph.graph import StateGraph, END, START
 from enum import Enum
 from app.core.config import settings
+from app.services import gazetteer
+from app.services.cache import TwoTierCache, canonical_key
+from app.services.insights_filter import narrow_entities
+from app.services.checkpoints import checkpoint_store
+from app.services.llm_cache import ainvoke_structured
+from app.services.matcher import extract_candidates, normalize_text, pick_confident_match, wants_several
+from app.services.prompt_payload import compact_payload
+from app.services.singleflight import SingleFlight
 
 Traceloop.init(
     disable_batch=True,
@@ -579,6 +588,45 @@ class QlooParameterSet(BaseModel):
         return params
 
 
+# Insights API parameters whose values are comma-separated lists
+LIST_API_PARAMS = {
+    "filter.tags",
+    "filter.exclude.tags",
+    "filter.external.exists",
+    "filter.references_brand",
+    "filter.release_country",
+    "filter.results.entities",
+    "filter.exclude.entities",
+    "filter.results.tags",
+    "signal.demographics.audiences",
+    "signal.interests.entities",
+    "signal.interests.tags",
+}
+
+
+def fingerprint_api_params(api_params: Dict[str, Any]) -> str:
+    """
+    Build a canonical fingerprint of insights API parameters
+    
+    Keys are sorted and list-valued parameters are de-duplicated and sorted,
+    so equivalent parameter sets map to the same fingerprint.
+    
+    Args:
+        api_params: Parameters as returned by QlooParameterSet.to_api_params()
+        
+    Returns:
+        Hex digest identifying the request
+    """
+    canonical = {}
+    for key, value in api_params.items():
+        if key in LIST_API_PARAMS and isinstance(value, str):
+            value = ",".join(sorted({item.strip() for item in value.split(",") if item.strip()}))
+        elif isinstance(value, bool):
+            value = str(value).lower()
+        canonical[key] = value
+    return canonical_key(canonical)
+
+
 class CompanyInfo(BaseModel):
     """Model for company information extracted from metadata"""
     company_name: str = Field(description="Name of the company")
@@ -707,6 +755,17 @@ class AudienceIdsOutput(BaseModel):
     audience_ids: List[str] = Field(..., description="List of audience IDs extracted from the API response")
 
 
+class ResolverSelection(BaseModel):
+    """IDs selected for one resolver in a batched selection call"""
+    resolver_key: str = Field(..., description="Key of the resolver this selection belongs to (e.g. tags_0)")
+    ids: List[str] = Field(default_factory=list, description="Relevant IDs taken from that resolver's API response")
+
+
+class BatchedSelectionOutput(BaseModel):
+    """Model for IDs selected by the LLM for several resolvers at once"""
+    selections: List[ResolverSelection] = Field(..., description="One selection per resolver key")
+
+
 class PlannerOutput(BaseModel):
     qloo_params: QlooParameterSet = Field(..., description="Instance of qloo params where you try to set possible values you can set and not dependent on any extra steps")
     tag_resolving_queries: List[TagParamsResolver] = Field(default_factory=list, description="Parameters for which we need to do tag search to resolve those")
@@ -714,6 +773,115 @@ class PlannerOutput(BaseModel):
     audience_resolving_queries: List[AudienceParamsResolver] = Field(default_factory=list, description="Parameters for which we need to do audience search to resolve those")
 
 
+# Entity types accepted by filter_type
+QLOO_ENTITY_TYPES = [
+    "urn:entity:artist",
+    "urn:entity:book",
+    "urn:entity:brand",
+    "urn:entity:destination",
+    "urn:entity:movie",
+    "urn:entity:person",
+    "urn:entity:place",
+    "urn:entity:podcast",
+    "urn:entity:tv_show",
+    "urn:entity:videogame",
+    "urn:heatmap",
+]
+
+# QlooParameterSet fields valid for every entity type
+PLANNER_COMMON_FIELDS = [
+    "filter_tags", "operator_filter_tags", "filter_exclude_tags", "operator_exclude_tags",
+    "filter_popularity_min", "filter_popularity_max",
+    "filter_results_entities", "filter_exclude_entities", "filter_results_tags", "filter_parents_types",
+    "signal_demographics_age", "signal_demographics_age_weight",
+    "signal_demographics_audiences", "signal_demographics_audiences_weight",
+    "signal_demographics_gender", "signal_demographics_gender_weight",
+    "signal_interests_entities", "signal_interests_entities_weight",
+    "signal_interests_tags", "signal_interests_tags_weight",
+    "signal_location", "signal_location_radius", "signal_location_query", "signal_location_weight",
+    "bias_trends", "feature_explainability", "page", "take", "offset",
+]
+
+_LOCATION_FIELDS = [
+    "filter_location", "filter_location_lat", "filter_location_lng", "filter_location_radius",
+    "filter_location_query", "filter_location_geohash",
+    "filter_exclude_location", "filter_exclude_location_query", "filter_exclude_location_geohash",
+    "filter_geocode_admin1_region", "filter_geocode_admin2_region",
+    "filter_geocode_country_code", "filter_geocode_name",
+]
+
+_SCREEN_FIELDS = [
+    "filter_content_rating", "filter_release_year_min", "filter_release_year_max",
+    "filter_release_date_min", "filter_release_date_max",
+    "filter_release_country", "operator_filter_release_country",
+    "filter_rating_min", "filter_rating_max",
+]
+
+# Additional QlooParameterSet fields that only apply to some entity types
+PLANNER_ENTITY_FIELDS: Dict[str, List[str]] = {
+    "urn:entity:place": _LOCATION_FIELDS + [
+        "filter_external_exists", "operator_filter_external_exists",
+        "filter_external_resy_count_min", "filter_external_resy_count_max",
+        "filter_external_resy_rating_min", "filter_external_resy_rating_max",
+        "filter_external_resy_party_size_min", "filter_external_resy_party_size_max",
+        "filter_external_tripadvisor_rating_count_min", "filter_external_tripadvisor_rating_count_max",
+        "filter_external_tripadvisor_rating_min", "filter_external_tripadvisor_rating_max",
+        "filter_rating_min", "filter_rating_max",
+        "filter_properties_business_rating_min", "filter_properties_business_rating_max",
+        "filter_price_level_min", "filter_price_level_max",
+        "filter_price_range_from", "filter_price_range_to", "filter_price_min", "filter_price_max",
+        "filter_exists", "filter_hours", "filter_hotel_class_min", "filter_hotel_class_max",
+        "filter_references_brand", "diversify_by", "diversify_take", "sort_by",
+    ],
+    "urn:entity:destination": _LOCATION_FIELDS,
+    "urn:heatmap": _LOCATION_FIELDS + ["output_heatmap_boundary"],
+    "urn:entity:movie": _SCREEN_FIELDS,
+    "urn:entity:tv_show": _SCREEN_FIELDS + [
+        "filter_finale_year_min", "filter_finale_year_max",
+        "filter_latest_known_year_min", "filter_latest_known_year_max",
+    ],
+    "urn:entity:videogame": ["filter_release_year_min", "filter_release_year_max"],
+    "urn:entity:book": ["filter_publication_year_min", "filter_publication_year_max"],
+    "urn:entity:person": [
+        "filter_date_of_birth_min", "filter_date_of_birth_max",
+        "filter_date_of_death_min", "filter_date_of_death_max", "filter_gender",
+    ],
+}
+
+
+class EntityTypeSelection(BaseModel):
+    """First planner stage: the entity type the insights query should return"""
+    filter_type: Literal[tuple(QLOO_ENTITY_TYPES)] = Field(..., description="Type of entities the insights API should return")
+
+
+@lru_cache(maxsize=None)
+def planner_output_model(filter_type: str) -> Type[BaseModel]:
+    """
+    Build a planner output schema containing only the parameters valid for an entity type
+    
+    Args:
+        filter_type: Entity type selected in the first planner stage
+        
+    Returns:
+        Pydantic model mirroring PlannerOutput with a slimmed-down qloo_params schema
+    """
+    field_names = PLANNER_COMMON_FIELDS + PLANNER_ENTITY_FIELDS.get(filter_type, [])
+    suffix = filter_type.split(":")[-1].title().replace("_", "")
+    params_model = create_model(
+        f"QlooParams{suffix}",
+        __doc__=f"QLoo API parameters valid for {filter_type}",
+        **{name: (QlooParameterSet.model_fields[name].annotation, QlooParameterSet.model_fields[name]) for name in field_names}
+    )
+    planner_fields = PlannerOutput.model_fields
+    return create_model(
+        f"PlannerOutput{suffix}",
+        qloo_params=(params_model, Field(..., description=planner_fields["qloo_params"].description)),
+        tag_resolving_queries=(List[TagParamsResolver], planner_fields["tag_resolving_queries"]),
+        location_resolving_queries=(List[LocationResolver], planner_fields["location_resolving_queries"]),
+        audience_resolving_queries=(List[AudienceParamsResolver], planner_fields["audience_resolving_queries"])
+    )
+
+
 class QlooState(TypedDict):
     """State object for the LangGraph workflow"""
     company_name: str
@@ -724,6 +892,19 @@ class QlooState(TypedDict):
     audience_resolving_queries: List[AudienceParamsResolver]
     error: Optional[str]
     query: str
+    checkpoint_key: Optional[str]
+    completed_nodes: List[str]
+    known_resolutions: Dict[str, List[str]]
+    resolutions: Dict[str, List[str]]
+
+
+# Pydantic models used to restore a checkpointed QlooState
+QLOO_STATE_MODELS = {
+    "final_params": QlooParameterSet,
+    "tag_resolving_queries": TagParamsResolver,
+    "location_resolving_queries": LocationResolver,
+    "audience_resolving_queries": AudienceParamsResolver,
+}
 
 
 class QlooService:
@@ -739,6 +920,39 @@ class QlooService:
         }
         self.here_api_key = settings.HERE_API_KEY
         
+        # Long-lived pooled HTTP clients, one per upstream (opened by the app lifespan)
+        self.qloo_client: Optional[httpx.AsyncClient] = None
+        self.here_client: Optional[httpx.AsyncClient] = None
+        
+        # Tag taxonomies change slowly, so tag searches are cached across users
+        self.tag_cache = TwoTierCache(
+            name="qloo_tags",
+            ttl_seconds=settings.QLOO_TAG_CACHE_TTL_SECONDS,
+            max_entries=settings.QLOO_TAG_CACHE_MAX_ENTRIES,
+            collection="qloo_tag_cache"
+        )
+        self.geocode_cache = TwoTierCache(
+            name="geocode",
+            ttl_seconds=settings.GEOCODE_CACHE_TTL_SECONDS,
+            max_entries=settings.GEOCODE_CACHE_MAX_ENTRIES,
+            collection="geocode_cache"
+        )
+        # Insights entries outlive their TTL by the stale window so they can be served during a refresh
+        self.insights_cache = TwoTierCache(
+            name="qloo_insights",
+            ttl_seconds=settings.QLOO_INSIGHTS_CACHE_TTL_SECONDS + settings.QLOO_INSIGHTS_CACHE_STALE_SECONDS,
+            max_entries=settings.QLOO_INSIGHTS_CACHE_MAX_ENTRIES,
+            collection="qloo_insights_cache"
+        )
+        self._insights_refreshing: set = set()
+        
+        # Identical concurrent upstream calls share a single in-flight request
+        self.tag_flight = SingleFlight("qloo_tags")
+        self.audience_flight = SingleFlight("qloo_audiences")
+        self.geocode_flight = SingleFlight("geocode")
+        self.insights_flight = SingleFlight("qloo_insights")
+        self._background_tasks: set = set()
+        
         # Initialize LLM
         self.llm = ChatOpenAI(
             api_key=settings.OPENAI_API_KEY,
@@ -749,7 +963,64 @@ class QlooService:
         # Set up LLM for parameter generation using LangGraph
         self.setup_langgraph()
 
-    def planner(self, state: QlooState) -> QlooState:
+    def _build_http_client(self, headers: Optional[Dict[str, str]] = None) -> httpx.AsyncClient:
+        """
+        Build a pooled keep-alive HTTP client using the configured limits and timeouts
+        
+        Args:
+            headers: Default headers sent with every request
+            
+        Returns:
+            Configured httpx.AsyncClient
+        """
+        limits = httpx.Limits(
+            max_connections=settings.UPSTREAM_HTTP_MAX_CONNECTIONS,
+            max_keepalive_connections=settings.UPSTREAM_HTTP_MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=settings.UPSTREAM_HTTP_KEEPALIVE_EXPIRY
+        )
+        timeout = httpx.Timeout(
+            connect=settings.UPSTREAM_HTTP_CONNECT_TIMEOUT,
+            read=settings.UPSTREAM_HTTP_READ_TIMEOUT,
+            write=settings.UPSTREAM_HTTP_WRITE_TIMEOUT,
+            pool=settings.UPSTREAM_HTTP_POOL_TIMEOUT
+        )
+        try:
+            return httpx.AsyncClient(headers=headers, limits=limits, timeout=timeout, http2=settings.UPSTREAM_HTTP2)
+        except ImportError:
+            # HTTP/2 needs the optional h2 package, fall back to HTTP/1.1 keep-alive
+            logger.warning("HTTP/2 requested but h2 is not installed, using HTTP/1.1")
+            return httpx.AsyncClient(headers=headers, limits=limits, timeout=timeout)
+
+    async def startup(self) -> None:
+        """Open the pooled HTTP clients for QLoo and Here Maps"""
+        if self.qloo_client is None or self.qloo_client.is_closed:
+            self.qloo_client = self._build_http_client(headers=self.headers)
+        if self.here_client is None or self.here_client.is_closed:
+            self.here_client = self._build_http_client()
+        logger.info("QLoo service HTTP clients started")
+
+    async def shutdown(self) -> None:
+        """Close the pooled HTTP clients"""
+        for client in (self.qloo_client, self.here_client):
+            if client is not None and not client.is_closed:
+                await client.aclose()
+        self.qloo_client = None
+        self.here_client = None
+        logger.info("QLoo service HTTP clients closed")
+
+    def _get_qloo_client(self) -> httpx.AsyncClient:
+        """Return the pooled QLoo client, opening it lazily when used outside the app lifespan"""
+        if self.qloo_client is None or self.qloo_client.is_closed:
+            self.qloo_client = self._build_http_client(headers=self.headers)
+        return self.qloo_client
+
+    def _get_here_client(self) -> httpx.AsyncClient:
+        """Return the pooled Here Maps client, opening it lazily when used outside the app lifespan"""
+        if self.here_client is None or self.here_client.is_closed:
+            self.here_client = self._build_http_client()
+        return self.here_client
+
+    async def planner(self, state: QlooState) -> QlooState:
         """
         Generate parameters using LLM with structured output and update the state
         
@@ -760,8 +1031,7 @@ class QlooService:
             Updated state with generated parameters and resolving queries
         """
         # Create the prompt - keeping the same prompt as requested
-        prompt = ChatPromptTemplate.from_messages([
-            ("system", f"""
+        system_prompt = f"""
 You are AdBuddy's data agent with access to the Qloo API for taste-based insights.
 
 ### Bussiness Information
@@ -786,19 +1056,39 @@ Generate appropriate Qloo parameters for the insights API. Some parameters requi
    - urn:audience:spending_habits
 
 For filter_type parameter: Select the appropriate entity type based on the query context.
-            """),
-            ("human", state["query"])
-        ])
-        
-        # Bind the schema to the LLM for structured output
-        model_with_structure = self.llm.with_structured_output(PlannerOutput)
-        
-        # Create and invoke the chain
-        chain = prompt | model_with_structure
+            """
         
         try:
-            # Get the structured output
-            planner_output = chain.invoke({})
+            if settings.QLOO_PLANNER_SLIM_SCHEMAS:
+                # Stage 1: pick the entity type with a tiny schema
+                type_prompt = ChatPromptTemplate.from_messages([
+                    ("system", system_prompt + "\nFirst select only the filter_type for this query."),
+                    ("human", state["query"])
+                ])
+                filter_type = (await ainvoke_structured(self.llm, EntityTypeSelection, type_prompt, "qloo_planner_type")).filter_type
+                logger.info(f"Planner selected entity type {filter_type}")
+                
+                # Stage 2: generate parameters against the schema valid for that type only
+                params_prompt = ChatPromptTemplate.from_messages([
+                    ("system", system_prompt + f"\nThe filter_type has already been set to {filter_type}; only parameters valid for it are available."),
+                    ("human", state["query"])
+                ])
+                slim_output = await ainvoke_structured(self.llm, planner_output_model(filter_type), params_prompt, "qloo_planner_params")
+                
+                planner_output = PlannerOutput(
+                    qloo_params=QlooParameterSet(filter_type=filter_type, **slim_output.qloo_params.model_dump()),
+                    tag_resolving_queries=slim_output.tag_resolving_queries,
+                    location_resolving_queries=slim_output.location_resolving_queries,
+                    audience_resolving_queries=slim_output.audience_resolving_queries
+                )
+            else:
+                prompt = ChatPromptTemplate.from_messages([
+                    ("system", system_prompt),
+                    ("human", state["query"])
+                ])
+                
+                # Get the structured output
+                planner_output = await ainvoke_structured(self.llm, PlannerOutput, prompt, "qloo_planner")
 
             state["final_params"] = planner_output.qloo_params
             state["tag_resolving_queries"] = planner_output.tag_resolving_queries
@@ -827,15 +1117,17 @@ For filter_type parameter: Select the appropriate entity type based on the query
                 return state
                 
             # Process all resolving queries and get updated parameters
-            processed_params = await self._process_resolving_queries(
+            processed_params, resolutions = await self._process_resolving_queries(
                 state["final_params"],
                 state["tag_resolving_queries"],
                 state["audience_resolving_queries"],
-                state["location_resolving_queries"]
+                state["location_resolving_queries"],
+                state.get("known_resolutions") or {}
             )
             
             # Update the state with processed parameters
             state["final_params"] = processed_params
+            state["resolutions"] = resolutions
             
             return state
         except Exception as e:
@@ -848,8 +1140,8 @@ For filter_type parameter: Select the appropriate entity type based on the query
         self.workflow = StateGraph(QlooState)
         
         # Add nodes for planning and processing resolvers
-        self.workflow.add_node("planner", self.planner)
-        self.workflow.add_node("process_resolvers", self.process_resolvers)
+        self.workflow.add_node("planner", checkpoint_store.node("qloo", "planner", self.planner, "checkpoint_key"))
+        self.workflow.add_node("process_resolvers", checkpoint_store.node("qloo", "process_resolvers", self.process_resolvers, "checkpoint_key"))
 
         # Define the workflow edges
         self.workflow.add_edge(START, "planner")
@@ -858,6 +1150,150 @@ For filter_type parameter: Select the appropriate entity type based on the query
 
         self.workflow_app = self.workflow.compile()
 
+    @staticmethod
+    def _tag_search_params(query_params: Optional[TagResolvingQuery]) -> Dict[str, str]:
+        """
+        Convert a TagResolvingQuery into canonical tag search API parameters
+        
+        Args:
+            query_params: Tag search query from the planner
+            
+        Returns:
+            API parameters with normalised query text and sorted tag lists
+        """
+        params = {}
+        if query_params:
+            if query_params.feature_typo_tolerance is not None:
+                params["feature.typo_tolerance"] = str(query_params.feature_typo_tolerance).lower()
+            if query_params.filter_results_tags:
+                params["filter.results.tags"] = ",".join(sorted(set(query_params.filter_results_tags)))
+            if query_params.filter_parents_types:
+                params["filter.parents.types"] = query_params.filter_parents_types
+            if query_params.filter_popularity_min is not None:
+                params["filter.popularity.min"] = str(query_params.filter_popularity_min)
+            if query_params.filter_popularity_max is not None:
+                params["filter.popularity.max"] = str(query_params.filter_popularity_max)
+            if query_params.filter_query:
+                params["filter.query"] = " ".join(query_params.filter_query.split())
+            if query_params.page:
+                params["page"] = str(query_params.page)
+            if query_params.take:
+                params["take"] = str(query_params.take)
+        return params
+
+    async def _search_tags(self, query_params: Optional[TagResolvingQuery]) -> Dict[str, Any]:
+        """
+        Search tags through the tag cache, calling the tag search API only on a miss
+        
+        Args:
+            query_params: Tag search query from the planner
+            
+        Returns:
+            Raw tag search API response
+        """
+        url = f"{self.api_base_url}/v2/tags"
+        params = self._tag_search_params(query_params)
+        
+        # Tag search is case-insensitive, so the cache key is too
+        cache_key = canonical_key({**params, "filter.query": params.get("filter.query", "").lower()})
+        cached = await self.tag_cache.get(cache_key)
+        if cached is not None:
+            logger.info(f"Tag cache hit for {params}")
+            return cached
+        
+        async def fetch() -> Dict[str, Any]:
+            # Construct full URL with parameters for logging
+            query_string = "&".join([f"{k}={v}" for k, v in params.items()]) if params else ""
+            full_url = f"{url}?{query_string}" if query_string else url
+            logger.info(f"Making API request to: {full_url}")
+            
+            # Make API request over the pooled client
+            client = self._get_qloo_client()
+            response = await client.get(url, params=params)
+            response.raise_for_status()
+            
+            data = response.json()
+            if data:
+                await self.tag_cache.set(cache_key, data)
+            return data
+        
+        return await self.tag_flight.do(cache_key, fetch)
+
+    @staticmethod
+    def _fast_match(data: Dict[str, Any], name: Optional[str], answer_finalising_query: str) -> Optional[str]:
+        """
+        Pick a single ID locally when one search result is nearly identical to the searched name
+        
+        Args:
+            data: Tag or audience search API response
+            name: Short name the search was for (e.g. the tag filter_query)
+            answer_finalising_query: Selection query; the LLM chooses when it asks for several IDs
+            
+        Returns:
+            The matched ID, or None when the LLM should choose
+        """
+        if not settings.QLOO_FAST_MATCH_ENABLED or not data or not name:
+            return None
+        if wants_several(answer_finalising_query):
+            return None
+        return pick_confident_match(
+            extract_candidates(data),
+            [name],
+            threshold=settings.QLOO_FAST_MATCH_THRESHOLD,
+            margin=settings.QLOO_FAST_MATCH_MARGIN
+        )
+
+    def _tag_fast_match(self, tag_resolver: TagParamsResolver, data: Dict[str, Any]) -> Optional[str]:
+        """Run the local fast path for a tag resolver"""
+        filter_query = tag_resolver.query_params.filter_query if tag_resolver.query_params else None
+        fast_match = self._fast_match(data, filter_query, tag_resolver.answer_finalising_query)
+        if fast_match:
+            logger.info(f"Tag fast path selected {fast_match} for {tag_resolver.param_name}")
+        return fast_match
+
+    async def _select_tag_ids(self, tag_resolver: TagParamsResolver, data: Dict[str, Any]) -> List[str]:
+        """
+        Select tag IDs from a tag search response, locally when unambiguous and with the LLM otherwise
+        
+        Args:
+            tag_resolver: Parameters for resolving tags
+            data: Tag search API response
+            
+        Returns:
+            List of selected tag IDs
+        """
+        fast_match = self._tag_fast_match(tag_resolver, data)
+        if fast_match:
+            return [fast_match]
+        
+        # Process results based on the answer finalizing query
+        if not (tag_resolver.answer_finalising_query and data):
+            raise Exception("Not sufficient params to resolve tags")
+        
+        # Use LLM with structured output to process the results
+        # Use raw string to avoid template variable interpretation issues with JSON
+        prompt_messages = [
+            ("system", """
+            Extract relevant tag IDs from the Qloo API response that best match the query.
+            """),
+            ("human", f"""
+            Query: {tag_resolver.answer_finalising_query}
+            
+            API Response (Tags):
+            {compact_payload(data, "tag_selection").replace('{', '{{').replace('}', '}}')}
+            
+            Return only the relevant tag IDs as a list of strings.
+            """)
+        ]
+        prompt = ChatPromptTemplate.from_messages(prompt_messages)
+        
+        try:
+            structured_response = await ainvoke_structured(self.llm, TagIdsOutput, prompt, "qloo_tag_selection")
+            return structured_response.tag_ids
+        except Exception as e:
+            logger.error(f"Error processing tag IDs with LLM: {e}")
+            raise
+
     async def _resolve_tags(self, tag_resolver: TagParamsResolver) -> List[str]:
         """
         Resolve tags using the tag search API
@@ -869,80 +1305,97 @@ For filter_type parameter: Select the appropriate entity type based on the query
             List of resolved tag IDs
         """
         try:
-            url = f"{self.api_base_url}/v2/tags"
-            
-            # Convert query parameters to API parameters
-            params = {}
-            if tag_resolver.query_params:
-                query_params = tag_resolver.query_params
-                if query_params.feature_typo_tolerance is not None:
-                    params["feature.typo_tolerance"] = str(query_params.feature_typo_tolerance).lower()
-                if query_params.filter_results_tags:
-                    params["filter.results.tags"] = ",".join(query_params.filter_results_tags)
-                if query_params.filter_parents_types:
-                    params["filter.parents.types"] = query_params.filter_parents_types
-                if query_params.filter_popularity_min is not None:
-                    params["filter.popularity.min"] = str(query_params.filter_popularity_min)
-                if query_params.filter_popularity_max is not None:
-                    params["filter.popularity.max"] = str(query_params.filter_popularity_max)
-                if query_params.filter_query:
-                    params["filter.query"] = query_params.filter_query
-                if query_params.page:
-                    params["page"] = str(query_params.page)
-                if query_params.take:
-                    params["take"] = str(query_params.take)
+            data = await self._search_tags(tag_resolver.query_params)
+            return await self._select_tag_ids(tag_resolver, data)
+        except Exception as e:
+            logger.exception(f"Error resolving tags: {e}")
+            return []
+
+    async def _search_audiences(self, query_params: Optional[AudienceResolvingQuery]) -> Dict[str, Any]:
+        """
+        Search audience types, sharing identical concurrent searches
+        
+        Args:
+            query_params: Audience search query from the planner
             
+        Returns:
+            Raw audience search API response
+        """
+        url = f"{self.api_base_url}/v2/audiences/types"
+        
+        # Convert query parameters to API parameters
+        params = {}
+        if query_params:
+            if query_params.filter_parents_types:
+                params["filter.parents.types"] = query_params.filter_parents_types
+            if query_params.filter_results_audiences:
+                params["filter.results.audiences"] = ",".join(query_params.filter_results_audiences)
+            if query_params.filter_audience_types:
+                params["filter.audience.types"] = ",".join(query_params.filter_audience_types)
+            if query_params.filter_popularity_min is not None:
+                params["filter.popularity.min"] = str(query_params.filter_popularity_min)
+            if query_params.filter_popularity_max is not None:
+                params["filter.popularity.max"] = str(query_params.filter_popularity_max)
+            if query_params.page:
+                params["page"] = str(query_params.page)
+            if query_params.take:
+                params["take"] = str(query_params.take)
+        
+        async def fetch() -> Dict[str, Any]:
             # Construct full URL with parameters for logging
             query_string = "&".join([f"{k}={v}" for k, v in params.items()]) if params else ""
             full_url = f"{url}?{query_string}" if query_string else url
             logger.info(f"Making API request to: {full_url}")
             
-            # Make API request with 5-minute timeout
-            async with httpx.AsyncClient(timeout=300.0) as client:
-                response = await client.get(url, headers=self.headers, params=params)
-                response.raise_for_status()
-                
-                data = response.json()
-                
-                # Process results based on the answer finalizing query
-                if tag_resolver.answer_finalising_query and data:
-                    # Use LLM with structured output to process the results
-                    # Use raw string to avoid template variable interpretation issues with JSON
-                    prompt_messages = [
-                        ("system", """
-                        Extract relevant tag IDs from the Qloo API response that best match the query.
-                        """),
-                        ("human", f"""
-                        Query: {tag_resolver.answer_finalising_query}
-                        
-                        API Response (Tags):
-                        {json.dumps(data, indent=2).replace('{', '{{').replace('}', '}}')}
-                        
-                        Return only the relevant tag IDs as a list of strings.
-                        """)
-                    ]
-                    prompt = ChatPromptTemplate.from_messages(prompt_messages)
-                    
-                    # Bind the schema to the model for structured output
-                    model_with_structure = self.llm.with_structured_output(TagIdsOutput)
-                    
-                    # Create and invoke the chain
-                    chain = prompt | model_with_structure
-                    
-                    try:
-                        structured_response = await chain.ainvoke({})
-                        tag_ids = structured_response.tag_ids
-                    except Exception as e:
-                        logger.error(f"Error processing tag IDs with LLM: {e}")
-                        raise
-                else:
-                    raise Exception("Not sufficient params to resolve tags")
-                
-                return tag_ids
-                
+            # Make API request over the pooled client
+            client = self._get_qloo_client()
+            response = await client.get(url, params=params)
+            response.raise_for_status()
+            return response.json()
+        
+        return await self.audience_flight.do(canonical_key(params), fetch)
+
+    async def _select_audience_ids(self, audience_resolver: AudienceParamsResolver, data: Dict[str, Any]) -> List[str]:
+        """
+        Select audience IDs from an audience search response with the LLM
+        
+        Audience searches have no name query to compare the results against, so there is
+        no local fast path as there is for tags.
+        
+        Args:
+            audience_resolver: Parameters for resolving audiences
+            data: Audience search API response
+            
+        Returns:
+            List of selected audience IDs
+        """
+        # Process results based on the answer finalizing query
+        if not (audience_resolver.answer_finalising_query and data):
+            raise Exception("Not sufficient params to resolve audience")
+        
+        # Use LLM with structured output to process the results
+        # Use raw string to avoid template variable interpretation issues with JSON
+        prompt_messages = [
+            ("system", """
+            Extract relevant audience IDs from the Qloo API response that best match the query.
+            """),
+            ("human", f"""
+            Query: {audience_resolver.answer_finalising_query}
+            
+            API Response (Audiences):
+            {compact_payload(data, "audience_selection").replace('{', '{{').replace('}', '}}')}
+            
+            Return only the relevant audience IDs as a list of strings.
+            """)
+        ]
+        prompt = ChatPromptTemplate.from_messages(prompt_messages)
+        
+        try:
+            structured_response = await ainvoke_structured(self.llm, AudienceIdsOutput, prompt, "qloo_audience_selection")
+            return structured_response.audience_ids
         except Exception as e:
-            logger.exception(f"Error resolving tags: {e}")
-            return []
+            logger.error(f"Error processing audience IDs with LLM: {e}")
+            raise
 
     async def _resolve_audiences(self, audience_resolver: AudienceParamsResolver) -> List[str]:
         """
@@ -955,80 +1408,132 @@ For filter_type parameter: Select the appropriate entity type based on the query
             List of resolved audience IDs
         """
         try:
-            url = f"{self.api_base_url}/v2/audiences/types"
-            
-            # Convert query parameters to API parameters
-            params = {}
-            if audience_resolver.query_params:
-                query_params = audience_resolver.query_params
-                if query_params.filter_parents_types:
-                    params["filter.parents.types"] = query_params.filter_parents_types
-                if query_params.filter_results_audiences:
-                    params["filter.results.audiences"] = ",".join(query_params.filter_results_audiences)
-                if query_params.filter_audience_types:
-                    params["filter.audience.types"] = ",".join(query_params.filter_audience_types)
-                if query_params.filter_popularity_min is not None:
-                    params["filter.popularity.min"] = str(query_params.filter_popularity_min)
-                if query_params.filter_popularity_max is not None:
-                    params["filter.popularity.max"] = str(query_params.filter_popularity_max)
-                if query_params.page:
-                    params["page"] = str(query_params.page)
-                if query_params.take:
-                    params["take"] = str(query_params.take)
-            
-            # Construct full URL with parameters for logging
-            query_string = "&".join([f"{k}={v}" for k, v in params.items()]) if params else ""
-            full_url = f"{url}?{query_string}" if query_string else url
-            logger.info(f"Making API request to: {full_url}")
-            
-            # Make API request with 5-minute timeout
-            async with httpx.AsyncClient(timeout=300.0) as client:
-                response = await client.get(url, headers=self.headers, params=params)
-                response.raise_for_status()
-                
-                data = response.json()
-                
-                # Process results based on the answer finalizing query
-                if audience_resolver.answer_finalising_query and data:
-                    # Use LLM with structured output to process the results
-                    # Use raw string to avoid template variable interpretation issues with JSON
-                    prompt_messages = [
-                        ("system", """
-                        Extract relevant audience IDs from the Qloo API response that best match the query.
-                        """),
-                        ("human", f"""
-                        Query: {audience_resolver.answer_finalising_query}
-                        
-                        API Response (Audiences):
-                        {json.dumps(data, indent=2).replace('{', '{{').replace('}', '}}')}
-                        
-                        Return only the relevant audience IDs as a list of strings.
-                        """)
-                    ]
-                    prompt = ChatPromptTemplate.from_messages(prompt_messages)
-                    
-                    # Bind the schema to the model for structured output
-                    model_with_structure = self.llm.with_structured_output(AudienceIdsOutput)
-                    
-                    # Create and invoke the chain
-                    chain = prompt | model_with_structure
-                    
-                    try:
-                        structured_response = await chain.ainvoke({})
-                        audience_ids = structured_response.audience_ids
-                    except Exception as e:
-                        logger.error(f"Error processing audience IDs with LLM: {e}")
-                        # Fallback to extracting IDs directly from results
-                        raise
-                else:
-                     raise Exception("Not sufficient params to resolve audience")
-                
-                return audience_ids
-                
+            data = await self._search_audiences(audience_resolver.query_params)
+            return await self._select_audience_ids(audience_resolver, data)
         except Exception as e:
             logger.exception(f"Error resolving audiences: {e}")
             return []
 
+    async def _select_ids_batched(self, pending: List[Dict[str, Any]]) -> Dict[str, List[str]]:
+        """
+        Ask the LLM once to select IDs for several tag/audience resolvers
+        
+        Args:
+            pending: Entries with key, kind ("tags" or "audiences"), resolver and search data
+            
+        Returns:
+            Mapping of resolver key to the selected IDs (only keys the model answered)
+        """
+        sections = []
+        for entry in pending:
+            resolver = entry["resolver"]
+            projection = "tag_selection" if entry["kind"] == "tags" else "audience_selection"
+            sections.append(
+                f"### Resolver {entry['key']}\n"
+                f"Target parameter: {resolver.param_name}\n"
+                f"Query: {resolver.answer_finalising_query}\n"
+                f"API Response ({entry['kind'].title()}):\n"
+                f"{compact_payload(entry['data'], projection)}"
+            )
+        resolver_sections = "\n\n".join(sections).replace('{', '{{').replace('}', '}}')
+        
+        prompt = ChatPromptTemplate.from_messages([
+            ("system", """
+            For each resolver below, extract the relevant tag or audience IDs from its Qloo API response
+            that best match its query. Only use IDs that appear in that resolver's own response.
+            """),
+            ("human", f"""
+            {resolver_sections}
+            
+            Return one selection per resolver key with the relevant IDs as a list of strings.
+            """)
+        ])
+        output = await ainvoke_structured(self.llm, BatchedSelectionOutput, prompt, "qloo_batched_selection")
+        
+        # Discard IDs the model did not take from the resolver's own candidates
+        candidates = {entry["key"]: {candidate_id for candidate_id, _ in extract_candidates(entry["data"])} for entry in pending}
+        selections = {}
+        for selection in output.selections:
+            if selection.resolver_key in candidates:
+                allowed = candidates[selection.resolver_key]
+                selections[selection.resolver_key] = [i for i in selection.ids if not allowed or i in allowed]
+        return selections
+
+    async def _resolve_batched(self,
+                               tag_resolvers: List[TagParamsResolver],
+                               audience_resolvers: List[AudienceParamsResolver],
+                               bounded) -> Tuple[List[List[str]], List[List[str]]]:
+        """
+        Fetch every tag/audience candidate list first, then select IDs with a single LLM call
+        
+        Falls back to one selection call per resolver if the batched call fails or skips a resolver.
+        
+        Args:
+            tag_resolvers: List of tag resolvers
+            audience_resolvers: List of audience resolvers
+            bounded: Wrapper applying the resolver concurrency limit
+            
+        Returns:
+            Tuple of (tag IDs per tag resolver, audience IDs per audience resolver)
+        """
+        async def search(coro):
+            try:
+                return await bounded(coro)
+            except Exception as e:
+                logger.exception(f"Error searching resolver candidates: {e}")
+                return None
+        
+        tag_data, audience_data = await asyncio.gather(
+            asyncio.gather(*(search(self._search_tags(r.query_params)) for r in tag_resolvers)),
+            asyncio.gather(*(search(self._search_audiences(r.query_params)) for r in audience_resolvers))
+        )
+        
+        entries = [
+            {"key": f"tags_{index}", "kind": "tags", "resolver": resolver, "data": data}
+            for index, (resolver, data) in enumerate(zip(tag_resolvers, tag_data))
+        ] + [
+            {"key": f"audiences_{index}", "kind": "audiences", "resolver": resolver, "data": data}
+            for index, (resolver, data) in enumerate(zip(audience_resolvers, audience_data))
+        ]
+        
+        results: Dict[str, List[str]] = {}
+        pending = []
+        for entry in entries:
+            if not entry["data"] or not entry["resolver"].answer_finalising_query:
+                results[entry["key"]] = []
+                continue
+            # Only tags have a local fast path; audiences are always selected by the LLM
+            fast_match = self._tag_fast_match(entry["resolver"], entry["data"]) if entry["kind"] == "tags" else None
+            if fast_match:
+                results[entry["key"]] = [fast_match]
+            else:
+                pending.append(entry)
+        
+        if len(pending) > 1:
+            try:
+                results.update(await self._select_ids_batched(pending))
+                logger.info(f"Batched selection resolved {len(pending)} resolvers in one LLM call")
+            except Exception as e:
+                logger.error(f"Batched selection failed, falling back to per-resolver calls: {e}")
+        
+        async def select_single(entry):
+            try:
+                if entry["kind"] == "tags":
+                    return await bounded(self._select_tag_ids(entry["resolver"], entry["data"]))
+                return await bounded(self._select_audience_ids(entry["resolver"], entry["data"]))
+            except Exception as e:
+                logger.exception(f"Error selecting IDs for {entry['key']}: {e}")
+                return []
+        
+        fallback = [entry for entry in pending if entry["key"] not in results]
+        for entry, ids in zip(fallback, await asyncio.gather(*(select_single(entry) for entry in fallback))):
+            results[entry["key"]] = ids
+        
+        return (
+            [results[f"tags_{index}"] for index in range(len(tag_resolvers))],
+            [results[f"audiences_{index}"] for index in range(len(audience_resolvers))]
+        )
+
     async def _resolve_locations(self, location_resolver: LocationResolver) -> Dict[str, Any]:
         """
         Resolve locations using geocoding
@@ -1057,11 +1562,53 @@ For filter_type parameter: Select the appropriate entity type based on the query
             logger.exception(f"Error resolving location: {e}")
             return {}
 
+    @staticmethod
+    def _merge_resolved_ids(params: QlooParameterSet, param_name: str, ids: List[str]) -> None:
+        """
+        Merge resolved IDs into a list parameter, keeping existing values first and dropping duplicates
+        
+        Args:
+            params: Parameter set to update in place
+            param_name: Target parameter name
+            ids: Newly resolved IDs
+        """
+        if not ids or not hasattr(params, param_name):
+            return
+        current_value = getattr(params, param_name)
+        if isinstance(current_value, list) and current_value:
+            # Order-preserving de-duplication keeps the merge deterministic
+            setattr(params, param_name, list(dict.fromkeys(current_value + ids)))
+        else:
+            # If current value is None or empty list, just set the new values
+            setattr(params, param_name, list(dict.fromkeys(ids)))
+
+    @staticmethod
+    def resolution_key(kind: str, resolver: Union[TagParamsResolver, AudienceParamsResolver]) -> str:
+        """
+        Key identifying what a tag/audience resolver searches for
+        
+        Only the search filters are keyed: the selection query is free text the planner words
+        differently on every run, and paging does not change what is searched for. A resolver
+        without search filters is keyed by its target parameter.
+        
+        Args:
+            kind: "tags" or "audiences"
+            resolver: The resolver
+            
+        Returns:
+            Canonical key of the search filters
+        """
+        filters = resolver.query_params.model_dump(exclude_none=True, exclude={"page", "take"}) if resolver.query_params else {}
+        if isinstance(filters.get("filter_query"), str):
+            filters["filter_query"] = normalize_text(filters["filter_query"])
+        return canonical_key({"kind": kind, "filters": filters or {"param_name": resolver.param_name}})
+
     async def _process_resolving_queries(self, 
                                        params: QlooParameterSet, 
                                        tag_resolvers: List[TagParamsResolver],
                                        audience_resolvers: List[AudienceParamsResolver],
-                                       location_resolvers: List[LocationResolver]) -> QlooParameterSet:
+                                       location_resolvers: List[LocationResolver],
+                                       known_resolutions: Optional[Dict[str, List[str]]] = None) -> Tuple[QlooParameterSet, Dict[str, List[str]]]:
         """
         Process all resolving queries and update the QlooParameterSet accordingly
         
@@ -1070,47 +1617,58 @@ For filter_type parameter: Select the appropriate entity type based on the query
             tag_resolvers: List of tag resolvers
             audience_resolvers: List of audience resolvers
             location_resolvers: List of location resolvers
+            known_resolutions: IDs already resolved for identical tag/audience resolvers, by resolution_key
             
         Returns:
-            Updated QlooParameterSet
+            Tuple of the updated QlooParameterSet and the tag/audience IDs resolved, by resolution_key
         """
-        # Process tag resolvers
-        for tag_resolver in tag_resolvers:
-            tag_ids = await self._resolve_tags(tag_resolver)
-            if tag_ids:
-                # Update the appropriate parameter in params
-                param_name = tag_resolver.param_name
-                if hasattr(params, param_name):
-                    # If the parameter is a list type, extend it rather than replace it
-                    current_value = getattr(params, param_name)
-                    if isinstance(current_value, list) and current_value:
-                        # Combine existing values with new values, avoiding duplicates
-                        combined_values = list(set(current_value + tag_ids))
-                        setattr(params, param_name, combined_values)
-                    else:
-                        # If current value is None or empty list, just set the new values
-                        setattr(params, param_name, tag_ids)
-        
-        # Process audience resolvers
-        for audience_resolver in audience_resolvers:
-            audience_ids = await self._resolve_audiences(audience_resolver)
-            if audience_ids:
-                # Update the appropriate parameter in params
-                param_name = audience_resolver.param_name
-                if hasattr(params, param_name):
-                    # If the parameter is a list type, extend it rather than replace it
-                    current_value = getattr(params, param_name)
-                    if isinstance(current_value, list) and current_value:
-                        # Combine existing values with new values, avoiding duplicates
-                        combined_values = list(set(current_value + audience_ids))
-                        setattr(params, param_name, combined_values)
-                    else:
-                        # If current value is None or empty list, just set the new values
-                        setattr(params, param_name, audience_ids)
-        
-        # Process location resolvers
-        for location_resolver in location_resolvers:
-            location_data = await self._resolve_locations(location_resolver)
+        known_resolutions = known_resolutions or {}
+        tag_keys = [self.resolution_key("tags", r) for r in tag_resolvers]
+        audience_keys = [self.resolution_key("audiences", r) for r in audience_resolvers]
+        
+        # Only resolvers that were not resolved before need a search and a selection
+        pending_tags = [r for r, key in zip(tag_resolvers, tag_keys) if key not in known_resolutions]
+        pending_audiences = [r for r, key in zip(audience_resolvers, audience_keys) if key not in known_resolutions]
+        reused = len(tag_resolvers) + len(audience_resolvers) - len(pending_tags) - len(pending_audiences)
+        if reused:
+            logger.info(f"Reusing {reused} previously resolved tag/audience resolvers")
+
+        # Fan out every resolver concurrently, bounded by the configured limit
+        semaphore = asyncio.Semaphore(max(1, settings.QLOO_RESOLVER_CONCURRENCY))
+
+        async def bounded(coro):
+            async with semaphore:
+                return await coro
+
+        if settings.QLOO_BATCH_SELECTION and len(pending_tags) + len(pending_audiences) > 1:
+            # Fetch all candidate lists, then choose IDs with one LLM call
+            (pending_tag_results, pending_audience_results), location_results = await asyncio.gather(
+                self._resolve_batched(pending_tags, pending_audiences, bounded),
+                asyncio.gather(*(bounded(self._resolve_locations(r)) for r in location_resolvers))
+            )
+        else:
+            pending_tag_results, pending_audience_results, location_results = await asyncio.gather(
+                asyncio.gather(*(bounded(self._resolve_tags(r)) for r in pending_tags)),
+                asyncio.gather(*(bounded(self._resolve_audiences(r)) for r in pending_audiences)),
+                asyncio.gather(*(bounded(self._resolve_locations(r)) for r in location_resolvers))
+            )
+        
+        # Stitch reused and freshly resolved IDs back together in declaration order
+        fresh_tags, fresh_audiences = iter(pending_tag_results), iter(pending_audience_results)
+        tag_results = [known_resolutions[key] if key in known_resolutions else next(fresh_tags) for key in tag_keys]
+        audience_results = [known_resolutions[key] if key in known_resolutions else next(fresh_audiences) for key in audience_keys]
+        resolutions = {
+            key: ids for key, ids in zip(tag_keys + audience_keys, tag_results + audience_results) if ids
+        }
+
+        # Merge in declaration order so the result does not depend on completion order
+        for tag_resolver, tag_ids in zip(tag_resolvers, tag_results):
+            self._merge_resolved_ids(params, tag_resolver.param_name, tag_ids)
+
+        for audience_resolver, audience_ids in zip(audience_resolvers, audience_results):
+            self._merge_resolved_ids(params, audience_resolver.param_name, audience_ids)
+
+        for location_resolver, location_data in zip(location_resolvers, location_results):
             if location_data:
                 # Update the appropriate parameter in params
                 param_name = location_resolver.param_name
@@ -1122,16 +1680,39 @@ For filter_type parameter: Select the appropriate entity type based on the query
                     wkt_point = f"POINT({location_data['lng']} {location_data['lat']})"
                     setattr(params, param_name, wkt_point)
         setattr(params, "take", 25)
-        return params
+        return params, resolutions
 
     async def _geocode_location(self, location: str) -> Optional[GeocodingResult]:
         """
-        Convert a location string to geographic coordinates (latitude, longitude) using Here Maps API.
+        Convert a location string to geographic coordinates (latitude, longitude).
         Input should be a location string like 'San Francisco, CA' or 'London, UK'.
+        
+        Common localities are answered from the offline gazetteer, previously geocoded
+        locations from the geocode cache, and only the remaining ones from Here Maps API.
         """
         try:
-            if not location or not self.here_api_key:
-                logger.warning("Location is empty or Here Maps API key not configured")
+            if not location:
+                logger.warning("Location is empty")
+                return None
+            
+            if settings.GEOCODE_GAZETTEER_ENABLED:
+                place = gazetteer.lookup(location)
+                if place:
+                    logger.info(f"Geocoded '{location}' from the offline gazetteer")
+                    return GeocodingResult(
+                        latitude=place["lat"],
+                        longitude=place["lng"],
+                        address={"label": place["label"], "countryCode": place["country_code"]}
+                    )
+            
+            cache_key = gazetteer.normalize_location(location)
+            cached = await self.geocode_cache.get(cache_key)
+            if cached is not None:
+                logger.info(f"Geocode cache hit for '{location}'")
+                return GeocodingResult(**cached)
+            
+            if not self.here_api_key:
+                logger.warning("Here Maps API key not configured")
                 return None
                 
             url = "https://geocode.search.hereapi.com/v1/geocode"
@@ -1140,7 +1721,8 @@ For filter_type parameter: Select the appropriate entity type based on the query
                 "apiKey": self.here_api_key
             }
             
-            async with httpx.AsyncClient(timeout=300.0) as client:
+            async def fetch() -> Optional[GeocodingResult]:
+                client = self._get_here_client()
                 response = await client.get(url, params=params)
                 response.raise_for_status()
                 
@@ -1158,15 +1740,58 @@ For filter_type parameter: Select the appropriate entity type based on the query
                     address=items[0].get("address", {})
                 )
                 
+                await self.geocode_cache.set(cache_key, result.model_dump())
                 return result
+            
+            return await self.geocode_flight.do(cache_key, fetch)
         except Exception as e:
             logger.exception(f"Error geocoding location '{location}': {e}")
             return None
 
+    async def _fetch_insights(self, api_params: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """
+        Call the insights API directly
+        
+        Args:
+            api_params: Insights API parameters
+            
+        Returns:
+            List of insight entities (empty if the API reports no success)
+        """
+        url = f"{self.api_base_url}/v2/insights"
+        
+        client = self._get_qloo_client()
+        response = await client.get(url, params=api_params)
+        response.raise_for_status()
+        data = response.json()
+        if data.get("success"):
+            return data.get("results", {"entities": []}).get("entities", [])
+        return []
+
+    async def _fetch_and_cache_insights(self, cache_key: str, api_params: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Fetch insights and store non-empty results in the insights cache"""
+        entities = await self._fetch_insights(api_params)
+        if entities:
+            await self.insights_cache.set(cache_key, entities)
+        return entities
+
+    async def _refresh_insights(self, cache_key: str, api_params: Dict[str, Any]) -> None:
+        """Re-fetch a stale insights entry in the background and store the fresh result"""
+        try:
+            await self.insights_flight.do(cache_key, lambda: self._fetch_and_cache_insights(cache_key, api_params))
+        except Exception as e:
+            logger.warning(f"Background insights refresh failed: {e}")
+        finally:
+            self._insights_refreshing.discard(cache_key)
+
     async def get_insights(self, params: QlooParameterSet) -> List[Dict[str, Any]]:
         """
         Get insights from the QLoo API based on provided parameters
         
+        Results are cached by the parameter fingerprint. Entries older than
+        QLOO_INSIGHTS_CACHE_TTL_SECONDS are still served while a background
+        refresh runs, up to QLOO_INSIGHTS_CACHE_STALE_SECONDS past expiry.
+        
         Args:
             params: Dictionary of parameters for the insights API
             
@@ -1174,19 +1799,51 @@ For filter_type parameter: Select the appropriate entity type based on the query
             List of insight results
         """
         try:
-            url = f"{self.api_base_url}/v2/insights"
+            api_params = params.to_api_params()
+            cache_key = fingerprint_api_params(api_params)
             
-            async with httpx.AsyncClient(timeout=300.0) as client:
-                response = await client.get(url, headers=self.headers, params=params.to_api_params())
-                response.raise_for_status()
-                data = response.json()
-                if data.get("success"):
-                    return data.get("results", {"entities": []}).get("entities", [])
+            entry = await self.insights_cache.get_entry(cache_key)
+            if entry is not None:
+                if entry.age >= settings.QLOO_INSIGHTS_CACHE_TTL_SECONDS and cache_key not in self._insights_refreshing:
+                    logger.info(f"Serving stale insights for {cache_key[:12]} while refreshing")
+                    self._insights_refreshing.add(cache_key)
+                    task = asyncio.create_task(self._refresh_insights(cache_key, api_params))
+                    self._background_tasks.add(task)
+                    task.add_done_callback(self._background_tasks.discard)
+                return entry.value
+            
+            return await self.insights_flight.do(cache_key, lambda: self._fetch_and_cache_insights(cache_key, api_params))
         except Exception as e:
             logger.exception(f"Error getting insights: {e}")
         return []
    
-    async def qloo_llm(self, company_name: str, company_details: str, query: str) -> QlooParameterSet:
+    async def what_if_insights(self, base_params: QlooParameterSet, base_entities: Optional[List[Dict[str, Any]]],
+                               overrides: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Re-query insights with a partial parameter override, without re-running the planner
+        
+        Overrides that only narrow the base request (smaller take, tighter popularity range,
+        smaller radius around the same point) are answered by filtering the base entities
+        locally when that gives the same result; anything else calls get_insights.
+        
+        Args:
+            base_params: Resolved parameters the base entities were fetched with
+            base_entities: Entities fetched with base_params (the superset)
+            overrides: QlooParameterSet fields to change
+            
+        Returns:
+            Dict with the effective params, the entities and their source ("local" or "qloo")
+        """
+        params = QlooParameterSet.model_validate({**base_params.model_dump(), **overrides})
+        if base_entities is not None:
+            entities = narrow_entities(base_entities, base_params, params)
+            if entities is not None:
+                return {"params": params, "entities": entities, "source": "local"}
+        return {"params": params, "entities": await self.get_insights(params=params), "source": "qloo"}
+
+    async def qloo_llm(self, company_name: str, company_details: str, query: str,
+                       checkpoint_key: Optional[str] = None,
+                       known_resolutions: Optional[Dict[str, List[str]]] = None) -> QlooParameterSet:
         """
         Generate QLoo API parameters using the LangGraph workflow
         
@@ -1194,11 +1851,39 @@ For filter_type parameter: Select the appropriate entity type based on the query
             company_name: Name of the company
             company_details: Description of the company
             query: Query to generate parameters for
+            checkpoint_key: Run ID to checkpoint the workflow under (e.g. the campaign ID), resuming a previous run
+            known_resolutions: Tag/audience IDs resolved earlier, reused for identical resolvers
             
         Returns:
             QlooParameterSet object with generated parameters
         """
+        parameters, _ = await self.qloo_plan(company_name, company_details, query, checkpoint_key, known_resolutions)
+        return parameters
+
+    async def qloo_plan(self, company_name: str, company_details: str, query: str,
+                        checkpoint_key: Optional[str] = None,
+                        known_resolutions: Optional[Dict[str, List[str]]] = None) -> Tuple[QlooParameterSet, Dict[str, List[str]]]:
+        """
+        Generate QLoo API parameters using the LangGraph workflow, also returning the resolved IDs
+        
+        Args:
+            company_name: Name of the company
+            company_details: Description of the company
+            query: Query to generate parameters for
+            checkpoint_key: Run ID to checkpoint the workflow under (e.g. the campaign ID), resuming a previous run
+            known_resolutions: Tag/audience IDs resolved earlier, reused for identical resolvers
+            
+        Returns:
+            Tuple of the generated QlooParameterSet and the tag/audience IDs by resolution key
+        """
         try:
+            checkpoint = None
+            if checkpoint_key:
+                checkpoint = await checkpoint_store.load("qloo", checkpoint_key, QLOO_STATE_MODELS)
+            if checkpoint and checkpoint.get("query") != query:
+                # The checkpoint belongs to a different query; start over
+                checkpoint = None
+            
             # Initialize the state for the new workflow
             initial_state = QlooState(
                 company_name=company_name,
@@ -1208,13 +1893,19 @@ For filter_type parameter: Select the appropriate entity type based on the query
                 location_resolving_queries=[],
                 audience_resolving_queries=[],
                 final_params=None,
-                error=None
+                error=None,
+                checkpoint_key=checkpoint_key,
+                completed_nodes=[],
+                known_resolutions=known_resolutions or {},
+                resolutions={}
             )
+            if checkpoint:
+                initial_state.update({**checkpoint, "error": None, "known_resolutions": known_resolutions or {}})
             
             # Execute the workflow
             final_state = await self.workflow_app.ainvoke(initial_state)
             if final_state["final_params"]:
-                return final_state["final_params"]
+                return final_state["final_params"], final_state.get("resolutions") or {}
             raise Exception("Failed to resolve the parameters for the insights API")
         except Exception as e:
             logger.exception(f"Error generating QLoo parameters: {e}")
@@ -1240,16 +1931,38 @@ For filter_type parameter: Select the appropriate entity type based on the query
                 return []
 
             if company_details:
-                # Generate parameters using LangGraph workflow directly
-                parameters = await self.qloo_llm(
-                    company_name,
-                    company_details,
-                    "Find businesses similar to the given business"
-                )
-                return await self.get_insights(params=parameters)
+                bundle = await self.build_insights_bundle(company_name, company_details)
+                return bundle["entities"] if bundle else []
         except Exception as e:
             logger.exception(f"Error getting similar companies: {e}")
         return []
 
+    async def build_insights_bundle(self, company_name: str, company_details: str) -> Optional[Dict[str, Any]]:
+        """
+        Plan, resolve and fetch the similar-business insights for a company
+        
+        The result is kept per user at onboarding so that campaign generation can reuse the
+        resolved tag/audience IDs and, when its parameters come out identical, the entities.
+        
+        Args:
+            company_name: Name of the company
+            company_details: Description of the company
+            
+        Returns:
+            Dict with query, params (resolved QlooParameterSet dump), fingerprint, resolutions and entities
+        """
+        query = "Find businesses similar to the given business"
+        parameters, resolutions = await self.qloo_plan(company_name, company_details, query)
+        entities = await self.get_insights(params=parameters)
+        return {
+            "company_name": company_name,
+            "company_details": company_details,
+            "query": query,
+            "params": parameters.model_dump(mode="json"),
+            "fingerprint": fingerprint_api_params(parameters.to_api_params()),
+            "resolutions": resolutions,
+            "entities": entities,
+        }
+
 
 qloo_service = QlooService()
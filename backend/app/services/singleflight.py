@@ -0,0 +1,76 @@
+"""
+Single-flight request coalescing: concurrent callers asking for the same key
+share one in-flight call instead of each issuing their own
+"""
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Dict, TypeVar
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# All single-flight groups created by the application, by name (used by the admin endpoints)
+singleflight_registry: Dict[str, "SingleFlight"] = {}
+
+
+class SingleFlight:
+    """Group of in-flight calls keyed by a canonical request key"""
+
+    def __init__(self, name: str):
+        """
+        Args:
+            name: Group name used for metrics and the admin endpoints
+        """
+        self.name = name
+        self._inflight: Dict[str, asyncio.Task] = {}
+        self._waiters: Dict[asyncio.Task, int] = {}
+        self.stats = {"calls": 0, "executions": 0, "coalesced": 0}
+        singleflight_registry[name] = self
+
+    def _forget(self, key: str, task: asyncio.Task) -> None:
+        """Drop a finished call, unless it has already been replaced"""
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        self._waiters.pop(task, None)
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[T]]) -> T:
+        """
+        Run fn once per key among concurrent callers
+
+        A cancelled caller does not cancel the shared call while other callers are
+        still waiting on it; the call is cancelled once its last caller is.
+
+        Args:
+            key: Canonical request key
+            fn: Factory returning the awaitable that performs the call
+
+        Returns:
+            The shared result (exceptions are raised to every caller)
+        """
+        self.stats["calls"] += 1
+        task = self._inflight.get(key)
+        if task is None:
+            self.stats["executions"] += 1
+            task = asyncio.create_task(fn())
+            self._inflight[key] = task
+            task.add_done_callback(lambda done, key=key: self._forget(key, done))
+        else:
+            self.stats["coalesced"] += 1
+            logger.debug(f"Coalesced '{self.name}' call for {key[:12]}")
+        self._waiters[task] = self._waiters.get(task, 0) + 1
+        try:
+            return await asyncio.shield(task)
+        except asyncio.CancelledError:
+            if not task.done() and self._waiters.get(task) == 1:
+                logger.debug(f"Cancelling '{self.name}' call for {key[:12]}, no callers left")
+                task.cancel()
+            raise
+        finally:
+            if task in self._waiters:
+                self._waiters[task] -= 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Return call counters and the number of calls currently in flight"""
+        return {**self.stats, "in_flight": len(self._inflight)}
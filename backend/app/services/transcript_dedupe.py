@@ -0,0 +1,172 @@
+"""
+Content-hash deduplication of onboarding transcript processing: the extraction and
+discovery results are stored against a hash of the normalised transcript, so webhook
+retries and re-posted transcripts reuse them, and concurrent duplicates wait for the
+run in progress instead of starting their own
+"""
+import asyncio
+import hashlib
+import logging
+import re
+import unicodedata
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, NamedTuple, Optional
+
+from motor.motor_asyncio import AsyncIOMotorCollection
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
+
+from app.core.config import settings
+from app.db.client import get_async_mongodb_db
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+
+def transcript_hash(transcript: str) -> str:
+    """
+    Hash a transcript after normalising Unicode forms, line endings and whitespace
+
+    Args:
+        transcript: Plain text of the conversation transcript
+
+    Returns:
+        Hex SHA-256 digest
+    """
+    normalized = unicodedata.normalize("NFKC", transcript)
+    normalized = "\n".join(" ".join(line.split()) for line in normalized.splitlines())
+    normalized = re.sub(r"\n+", "\n", normalized).strip()
+    return hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+
+
+class Claim(NamedTuple):
+    """Outcome of claiming a transcript hash"""
+    # Token of the claim when this caller must do the work (None when the store is unavailable)
+    token: Optional[str]
+    # Stored result when the transcript was already processed
+    stored: Optional[Dict[str, Any]]
+
+
+class TranscriptExtractionStore:
+    """Results of processed transcripts by content hash, with claims for runs in progress"""
+
+    def __init__(self, collection: str, ttl_seconds: int, claim_seconds: int, poll_seconds: float = 1.0):
+        """
+        Args:
+            collection: MongoDB collection holding the results and claims
+            ttl_seconds: How long a result is kept
+            claim_seconds: After this long a running claim is considered abandoned and can be taken over
+            poll_seconds: Interval between checks while waiting for another run
+        """
+        self.collection_name = collection
+        self.ttl_seconds = ttl_seconds
+        self.claim_seconds = claim_seconds
+        self.poll_seconds = poll_seconds
+        self._index_ready = False
+
+    async def _collection(self) -> AsyncIOMotorCollection:
+        """Return the backing collection, creating the TTL index on first use"""
+        db = await get_async_mongodb_db()
+        collection = db[self.collection_name]
+        if not self._index_ready:
+            await collection.create_index("expires_at", expireAfterSeconds=0)
+            self._index_ready = True
+        return collection
+
+    async def claim(self, key: str) -> Claim:
+        """
+        Claim a transcript hash, or wait for the run that holds it and return its result
+
+        Args:
+            key: Transcript hash
+
+        Returns:
+            A claim with a token (this caller runs the work) or with the stored result
+        """
+        try:
+            collection = await self._collection()
+            while True:
+                now = datetime.now(timezone.utc)
+                token = uuid.uuid4().hex
+                try:
+                    await collection.insert_one({
+                        "_id": key,
+                        "status": "running",
+                        "token": token,
+                        "claimed_at": now,
+                        "completed_users": [],
+                        "expires_at": now + timedelta(seconds=self.ttl_seconds),
+                    })
+                    return Claim(token, None)
+                except DuplicateKeyError:
+                    pass
+
+                document = await collection.find_one({"_id": key})
+                if document is None:
+                    continue
+                if document["status"] == "done":
+                    return Claim(None, document)
+                if document["claimed_at"].replace(tzinfo=timezone.utc) < now - timedelta(seconds=self.claim_seconds):
+                    # The run holding the claim crashed or stalled; take it over
+                    taken = await collection.find_one_and_update(
+                        {"_id": key, "status": "running", "token": document["token"]},
+                        {"$set": {"token": token, "claimed_at": now}},
+                        return_document=ReturnDocument.AFTER
+                    )
+                    if taken:
+                        logger.info(f"Took over abandoned transcript processing claim {key[:12]}")
+                        return Claim(token, None)
+                    continue
+                await asyncio.sleep(self.poll_seconds)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.warning(f"Transcript dedupe unavailable, processing without it: {e}")
+            return Claim(None, None)
+
+    async def complete(self, key: str, token: Optional[str], result: Dict[str, Any]) -> None:
+        """
+        Store the result of a claimed run
+
+        Args:
+            key: Transcript hash
+            token: Token of the claim
+            result: Fields to store (company info and insights bundle)
+        """
+        if token is None:
+            return
+        try:
+            collection = await self._collection()
+            await collection.update_one(
+                {"_id": key, "token": token},
+                {"$set": {**result, "status": "done", "completed_at": datetime.now(timezone.utc)}}
+            )
+        except Exception as e:
+            logger.warning(f"Could not store transcript processing result {key[:12]}: {e}")
+
+    async def release(self, key: str, token: Optional[str]) -> None:
+        """Drop a claim whose run failed, so the next duplicate runs the work again"""
+        if token is None:
+            return
+        try:
+            collection = await self._collection()
+            await collection.delete_one({"_id": key, "token": token, "status": "running"})
+        except Exception as e:
+            logger.warning(f"Could not release transcript processing claim {key[:12]}: {e}")
+
+    async def add_completed_user(self, key: str, user_id: str) -> None:
+        """Record that a user's onboarding was completed from this transcript"""
+        try:
+            collection = await self._collection()
+            await collection.update_one({"_id": key}, {"$addToSet": {"completed_users": str(user_id)}})
+        except Exception as e:
+            logger.warning(f"Could not record completed user for transcript {key[:12]}: {e}")
+
+
+# Initialize the singleton store
+transcript_extractions = TranscriptExtractionStore(
+    "transcript_extractions",
+    ttl_seconds=settings.TRANSCRIPT_DEDUPE_TTL_SECONDS,
+    claim_seconds=settings.TRANSCRIPT_DEDUPE_CLAIM_SECONDS
+)
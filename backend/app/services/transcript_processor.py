@@ -3,20 +3,22 @@ Transcript processing service for extracting company information
 from Tavus conversation transcripts using LangChain and OpenAI GPT-4.1
 """
 from typing import Dict, Any, List, Optional, Tuple
+from collections import Counter
 from datetime import datetime, timezone
-import json
 import asyncio
-from enum import Enum
+import re
 import logging
 from pydantic import BaseModel, Field
 
 from app.db.client import get_async_mongodb_db
 from bson.objectid import ObjectId
 from app.core.config import settings
+from app.services.llm_cache import ainvoke_structured
+from app.services.matcher import normalize_text, similarity
+from app.services.prompt_payload import estimate_tokens
 
 # LangChain imports
 from langchain_openai import ChatOpenAI
-from pydantic import BaseModel, Field  # Use Pydantic directly
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -127,10 +129,120 @@ class CompanyInfo(BaseModel):
         description="A comprehensive paragraph summarizing key information about the company including industry, target audience, products or services, challenges, goals, and selling points"
     )
 
+# A new turn starts with "role: " at the beginning of a line (e.g. "user: ...", "replica: ...")
+_TURN_START = re.compile(r"^(?=[A-Za-z_][\w ]{0,30}:\s)", re.MULTILINE)
+
+# Sentences of chunk summaries this similar to an already kept sentence are dropped when merging
+_DUPLICATE_SENTENCE_SIMILARITY = 0.8
+
+
+def split_transcript_turns(conversation_text: str) -> List[str]:
+    """Split a transcript into speaker turns, keeping any text before the first turn"""
+    return [turn.strip() for turn in _TURN_START.split(conversation_text) if turn.strip()]
+
+
+def chunk_transcript(conversation_text: str, chunk_tokens: int) -> List[str]:
+    """
+    Split a transcript into chunks of whole turns of about chunk_tokens each
+    
+    Args:
+        conversation_text: Plain text of the conversation transcript
+        chunk_tokens: Target token size of a chunk (a single longer turn gets its own chunk)
+        
+    Returns:
+        List of chunk texts in conversation order
+    """
+    chunks: List[str] = []
+    current: List[str] = []
+    current_tokens = 0
+    for turn in split_transcript_turns(conversation_text):
+        tokens = estimate_tokens(turn)
+        if current and current_tokens + tokens > chunk_tokens:
+            chunks.append("\n".join(current))
+            current, current_tokens = [], 0
+        current.append(turn)
+        current_tokens += tokens
+    if current:
+        chunks.append("\n".join(current))
+    return chunks
+
+
+def merge_company_info(partials: List[CompanyInfo]) -> Tuple[str, str]:
+    """
+    Merge the company information extracted from transcript chunks, without another LLM call
+    
+    The company name is the one named by most chunks (the earliest on a tie); the details
+    are the chunk summaries in conversation order with near-duplicate sentences removed.
+    
+    Args:
+        partials: Information extracted from each chunk, in conversation order
+        
+    Returns:
+        Tuple of (company_name, company_details)
+    """
+    names = [partial.company_name.strip() for partial in partials if normalize_text(partial.company_name or "") not in ("", "unknown")]
+    votes = Counter(normalize_text(name) for name in names)
+    company_name = ""
+    if votes:
+        best = max(votes.values())
+        company_name = next(name for name in names if votes[normalize_text(name)] == best)
+    
+    sentences: List[str] = []
+    for partial in partials:
+        for sentence in re.split(r"(?<=[.!?])\s+", partial.company_details or ""):
+            sentence = sentence.strip()
+            if sentence and all(similarity(sentence, kept) < _DUPLICATE_SENTENCE_SIMILARITY for kept in sentences):
+                sentences.append(sentence)
+    return company_name, " ".join(sentences)
+
+
+async def extract_company_info_chunked(llm: ChatOpenAI, conversation_text: str) -> Tuple[str, str]:
+    """
+    Extract company information from a long transcript chunk by chunk
+    
+    Chunks are extracted concurrently (bounded by TRANSCRIPT_CHUNK_CONCURRENCY) and merged
+    with merge_company_info; chunks whose extraction fails are left out.
+    
+    Args:
+        llm: Chat model
+        conversation_text: Plain text of the conversation transcript
+        
+    Returns:
+        Tuple of (company_name, company_details)
+    """
+    chunks = chunk_transcript(conversation_text, settings.TRANSCRIPT_CHUNK_TOKENS)
+    semaphore = asyncio.Semaphore(settings.TRANSCRIPT_CHUNK_CONCURRENCY)
+    logger.info(f"Extracting company info from {len(chunks)} transcript chunks")
+    
+    async def extract_chunk(index: int, chunk: str) -> CompanyInfo:
+        prompt = f"""You are an expert business analyst. Below is part {index + 1} of {len(chunks)} of a conversation transcript between a user and an AI assistant.
+        Extract the company name if this part mentions it (otherwise leave it empty) and summarize the company information mentioned in this part only.
+        Focus on key business details like industry, target audience, products or services, challenges, goals, and selling points.
+        
+        Here is the transcript part:
+        
+        {chunk}
+        """
+        async with semaphore:
+            return await ainvoke_structured(llm, CompanyInfo, prompt, "company_info_chunk_extraction")
+    
+    results = await asyncio.gather(*(extract_chunk(i, chunk) for i, chunk in enumerate(chunks)), return_exceptions=True)
+    partials = []
+    for index, result in enumerate(results):
+        if isinstance(result, BaseException):
+            logger.warning(f"Company info extraction failed for transcript chunk {index + 1}/{len(chunks)}: {result}")
+        else:
+            partials.append(result)
+    if not partials:
+        raise RuntimeError("Company info extraction failed for every transcript chunk")
+    return merge_company_info(partials)
+
+
 async def extract_company_info_from_transcript(conversation_text: str) -> Tuple[str, str]:
     """
     Use LangChain with OpenAI to extract company name and generate detailed company information
-    from the conversation transcript.
+    from the conversation transcript. Transcripts above TRANSCRIPT_CHUNKING_THRESHOLD_TOKENS
+    are extracted in chunks (see extract_company_info_chunked).
     
     Args:
         conversation_text: Plain text of the conversation transcript
@@ -146,8 +258,9 @@ async def extract_company_info_from_transcript(conversation_text: str) -> Tuple[
             temperature=0.2,  # Lower temperature for more deterministic output
         )
         
-        # Set up the LLM with structured output
-        structured_llm = llm.with_structured_output(CompanyInfo)
+        # Long calls are split on turn boundaries and extracted concurrently
+        if estimate_tokens(conversation_text) > settings.TRANSCRIPT_CHUNKING_THRESHOLD_TOKENS:
+            return await extract_company_info_chunked(llm, conversation_text)
         
         # Create the prompt for the model - using only ASCII characters
         prompt = f"""You are an expert business analyst. Analyze this conversation transcript between a user and an AI assistant.
@@ -159,8 +272,8 @@ async def extract_company_info_from_transcript(conversation_text: str) -> Tuple[
         {conversation_text}
         """
         
-        # Call the LLM with the structured output schema
-        response = await structured_llm.ainvoke(prompt)
+        # Call the LLM with the structured output schema (served from the LLM cache when opted in)
+        response = await ainvoke_structured(llm, CompanyInfo, prompt, "company_info_extraction")
         
         # Extract just the company name and details
         company_name = response.company_name
@@ -0,0 +1,71 @@
+"""
+Standalone worker process for queued jobs
+
+Run with `python -m app.worker` (and CAMPAIGN_WORKER_MODE / TAVUS_INBOX_WORKER_MODE=external
+on the API processes) to scale campaign generation and callback processing separately from the API.
+"""
+import asyncio
+import logging
+import signal
+from typing import List
+
+from app.core.config import settings
+from app.services.job_queue import WorkerPool
+from app.services.campaign import campaign_jobs, campaign_service
+from app.api.tavus import tavus_inbox, run_tavus_callback_job
+from app.services.qloo import qloo_service
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+
+def build_worker_pools(inprocess_only: bool = False) -> List[WorkerPool]:
+    """
+    Build the worker pools draining the campaign job queue and the Tavus inbox
+
+    Args:
+        inprocess_only: Only build the pools configured to run inside the API process
+
+    Returns:
+        Worker pools with the job handlers registered
+    """
+    pools = []
+    if not inprocess_only or settings.CAMPAIGN_WORKER_MODE == "inprocess":
+        pools.append(WorkerPool(
+            campaign_jobs,
+            handlers={"process_campaign": campaign_service.run_campaign_job},
+            concurrency=settings.CAMPAIGN_WORKER_CONCURRENCY,
+            poll_interval=settings.CAMPAIGN_JOB_POLL_INTERVAL_SECONDS
+        ))
+    if not inprocess_only or settings.TAVUS_INBOX_WORKER_MODE == "inprocess":
+        pools.append(WorkerPool(
+            tavus_inbox,
+            handlers={"tavus_callback": run_tavus_callback_job},
+            concurrency=settings.TAVUS_INBOX_WORKER_CONCURRENCY,
+            poll_interval=settings.CAMPAIGN_JOB_POLL_INTERVAL_SECONDS
+        ))
+    return pools
+
+
+async def main() -> None:
+    """Run the worker pools until SIGINT or SIGTERM"""
+    await qloo_service.startup()
+    pools = build_worker_pools()
+    for pool in pools:
+        await pool.start()
+
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop.set)
+
+    try:
+        await stop.wait()
+    finally:
+        await asyncio.gather(*(pool.stop() for pool in pools))
+        await qloo_service.shutdown()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(main())
@@ -0,0 +1,36 @@
+import sys
+import os
+
+# Add the parent directory to the path so we can import modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.gazetteer import lookup, normalize_location
+
+
+def test_us_state_codes_are_expanded():
+    assert normalize_location("New York, NY") == "new york, new york"
+    assert normalize_location("Austin, TX, USA") == "austin, texas"
+    assert normalize_location("Fresno, CA, US") == "fresno, california"
+
+
+def test_country_codes_are_not_read_as_states():
+    assert normalize_location("Mumbai, IN") == "mumbai, india"
+    assert normalize_location("Toronto, CA") == "toronto, canada"
+    assert normalize_location("Berlin, DE") == "berlin, germany"
+
+
+def test_ambiguous_code_of_unknown_place_is_kept():
+    assert normalize_location("Pune, IN") == "pune, in"
+    assert normalize_location("Paris, TX") == "paris, texas"
+
+
+def test_single_part_and_country_alias():
+    assert normalize_location("IN") == "in"
+    assert normalize_location("London, UK") == "london, united kingdom"
+
+
+def test_lookup():
+    assert lookup("San Francisco, CA")["country_code"] == "USA"
+    assert lookup("Mumbai, IN")["label"] == "Mumbai, India"
+    assert lookup("nyc")["label"] == "New York, NY, United States"
+    assert lookup("Springfield, IL") is None
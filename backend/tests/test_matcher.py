@@ -0,0 +1,48 @@
+import sys
+import os
+
+# Add the parent directory to the path so we can import modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.matcher import extract_candidates, name_similarity, pick_confident_match, wants_several
+
+CANDIDATES = [
+    ("urn:tag:genre:place:restaurant:fast_food", "Fast Food"),
+    ("urn:tag:genre:place:restaurant:diner", "Diner"),
+    ("urn:tag:genre:place:bar", "Bar"),
+]
+
+
+def test_exact_name_is_matched():
+    match = pick_confident_match(CANDIDATES, ["fast foods"], threshold=0.92, margin=0.15)
+    assert match == "urn:tag:genre:place:restaurant:fast_food"
+
+
+def test_no_match_for_negated_word():
+    query = "Pick tags for an upscale Mediterranean restaurant, not fast food"
+    assert pick_confident_match(CANDIDATES, [query], threshold=0.92, margin=0.15) is None
+
+
+def test_shared_word_is_not_enough():
+    assert name_similarity("Mediterranean", "Mediterranean Restaurant") < 0.92
+    assert name_similarity("Cafes", "cafe") == 1.0
+
+
+def test_ambiguous_results_are_left_to_the_llm():
+    candidates = [("urn:tag:a", "Wine Bar"), ("urn:tag:b", "Wine Bars & Pubs")]
+    assert pick_confident_match(candidates, ["wine bar"], threshold=0.5, margin=0.5) is None
+
+
+def test_wants_several():
+    assert wants_several("Select all tags related to Mediterranean cuisine")
+    assert wants_several("Return the audience IDs for young parents")
+    assert not wants_several("Select the tag for Mediterranean cuisine")
+
+
+def test_extract_candidates():
+    data = {"success": True, "results": {"tags": [
+        {"id": "urn:tag:a", "name": "A"},
+        {"id": "urn:tag:a", "name": "A again"},
+        {"type": "urn:audience:life_stage"},
+    ]}}
+    assert extract_candidates(data) == [("urn:tag:a", "A"), ("urn:audience:life_stage", "life stage")]
@@ -0,0 +1,62 @@
+import sys
+import os
+from typing import Optional
+
+from pydantic import BaseModel
+
+# Add the parent directory to the path so we can import modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.insights_filter import narrow_entities
+
+
+class Params(BaseModel):
+    """Insights parameters read by narrow_entities (a subset of QlooParameterSet)"""
+    filter_type: str = "urn:entity:place"
+    take: Optional[int] = None
+    filter_popularity_min: Optional[float] = None
+    filter_popularity_max: Optional[float] = None
+    filter_location: Optional[str] = None
+    filter_location_lat: Optional[float] = None
+    filter_location_lng: Optional[float] = None
+    filter_location_radius: Optional[float] = None
+
+
+ENTITIES = [
+    {"name": "A", "popularity": 0.95, "location": {"lat": 40.7128, "lon": -74.0060}},
+    {"name": "B", "popularity": 0.80, "location": {"lat": 40.7306, "lon": -73.9352}},
+    {"name": "C", "popularity": 0.60, "location": {"lat": 42.3601, "lon": -71.0589}},
+]
+
+
+def _names(entities):
+    return [entity["name"] for entity in entities]
+
+
+def test_smaller_take_keeps_ranking():
+    assert _names(narrow_entities(ENTITIES, Params(), Params(take=2))) == ["A", "B"]
+
+
+def test_tighter_popularity_filters_locally():
+    result = narrow_entities(ENTITIES, Params(filter_popularity_min=0.5), Params(filter_popularity_min=0.7))
+    assert _names(result) == ["A", "B"]
+
+
+def test_looser_popularity_needs_the_api():
+    assert narrow_entities(ENTITIES, Params(filter_popularity_min=0.7), Params(filter_popularity_min=0.5)) is None
+
+
+def test_other_changes_need_the_api():
+    assert narrow_entities(ENTITIES, Params(), Params(filter_type="urn:entity:brand")) is None
+
+
+def test_radius_around_wkt_point():
+    base = Params(filter_location="POINT(-74.0060 40.7128)", filter_location_radius=500000)
+    target = base.model_copy(update={"filter_location_radius": 10000})
+    assert _names(narrow_entities(ENTITIES, base, target)) == ["A", "B"]
+
+
+def test_truncated_base_with_too_few_survivors_needs_the_api():
+    base = Params(take=3)
+    target = Params(take=3, filter_popularity_min=0.7)
+    assert narrow_entities(ENTITIES, base, target) is None
@@ -0,0 +1,67 @@
+import sys
+import os
+import json
+
+# Add the parent directory to the path so we can import modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.prompt_budget import allocate_budget, fit_qloo_data, fit_transcript, truncate_text
+from app.services.prompt_payload import estimate_tokens
+
+
+def _messages(count: int, words: int):
+    return [{"sender": "user" if i % 2 else "assistant", "text": f"turn{i} " + "word " * words} for i in range(count)]
+
+
+def test_allocation_gives_unused_share_to_others():
+    allocation = allocate_budget(1000, {"company_details": 50, "transcript": 5000, "qloo_data": 5000})
+    assert allocation["company_details"] == 50
+    assert allocation["transcript"] == allocation["qloo_data"] == 475
+
+
+def test_allocation_within_budget_is_exact():
+    demands = {"company_details": 10, "transcript": 20}
+    assert allocate_budget(1000, demands) == demands
+
+
+def test_truncate_text_fits_budget():
+    text = truncate_text("word " * 500, 50)
+    assert estimate_tokens(text) <= 50
+    assert text.endswith("...")
+
+
+def test_transcript_within_budget_is_kept():
+    text, decision = fit_transcript(_messages(3, 5), 1000)
+    assert decision["action"] == "kept"
+    assert text.count("turn") == 3
+
+
+def test_transcript_middle_is_elided():
+    text, decision = fit_transcript(_messages(30, 20), 300)
+    assert decision["action"] == "elided_middle"
+    assert estimate_tokens(text) <= 300
+    assert text.startswith("assistant: turn0 ")
+    assert text.rstrip().endswith("word")
+    assert f"[... {decision['omitted_messages']} messages omitted ...]" in text
+
+
+def test_marker_comes_first_when_only_the_last_turn_is_truncated():
+    messages = [{"sender": "user", "text": "word " * 400} for _ in range(3)]
+    text, decision = fit_transcript(messages, 100)
+    parts = text.split("\n\n")
+    assert parts[0] == "[... 2 messages omitted ...]"
+    assert parts[1].startswith("user: word") and parts[1].endswith("...")
+    assert decision["omitted_messages"] == 2
+    assert estimate_tokens(text) <= 100
+
+
+def test_qloo_data_counts_dropped_entities():
+    data = [
+        {"name": f"Brand {i}", "tags": [{"name": f"Tag {j}", "tag_id": f"urn:tag:{j}"} for j in range(50)]}
+        for i in range(20)
+    ]
+    text, decision = fit_qloo_data(data, 450)
+    assert estimate_tokens(text) <= 450
+    assert decision["entities"] == 20
+    assert decision["dropped_entities"] == 20 - len(json.loads(text))
+    assert decision["action"] == "dropped_items"
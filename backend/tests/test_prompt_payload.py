@@ -0,0 +1,64 @@
+import sys
+import os
+import json
+
+# Add the parent directory to the path so we can import modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.prompt_payload import compact_payload, compact_payload_with_stats, estimate_tokens
+
+
+def _entities(count: int, tags: int):
+    return [
+        {
+            "name": f"Brand {i}",
+            "popularity": 0.9,
+            "properties": {"short_description": "desc " * 30},
+            "tags": [{"name": f"Tag {j}", "tag_id": f"urn:tag:{j}"} for j in range(tags)],
+        }
+        for i in range(count)
+    ]
+
+
+def test_estimate_tokens():
+    assert estimate_tokens("") == 0
+    assert estimate_tokens("word") == 1
+    assert estimate_tokens("12") == 2
+
+
+def test_result_fits_budget_with_nested_lists():
+    text, dropped = compact_payload_with_stats(_entities(20, 50), "campaign_insights", 6000)
+    assert estimate_tokens(text) <= 6000
+    # Whole top-level entities are dropped, not the tags inside them
+    kept = json.loads(text)
+    assert len(kept) == 20 - dropped
+    assert [entity["name"] for entity in kept] == [f"Brand {i}" for i in range(len(kept))]
+
+
+def test_small_budget_keeps_the_top_result():
+    text, dropped = compact_payload_with_stats(_entities(20, 50), "campaign_insights", 450)
+    assert estimate_tokens(text) <= 450
+    assert dropped == 19
+    assert json.loads(text)[0]["name"] == "Brand 0"
+
+
+def test_oversized_single_result_is_cut():
+    text = compact_payload(_entities(1, 0), "campaign_insights", 20)
+    assert estimate_tokens(text) <= 20
+
+
+def test_search_response_trims_the_ranked_list():
+    response = {"success": True, "results": {"tags": [
+        {"id": f"urn:tag:{i}", "name": f"Tag {i}", "types": ["urn:entity:place"] * 3} for i in range(300)
+    ]}}
+    text, dropped = compact_payload_with_stats(response, "tag_selection", 500)
+    assert estimate_tokens(text) <= 500
+    tags = json.loads(text)["results"]["tags"]
+    assert len(tags) == 300 - dropped
+    assert all(len(tag["types"]) == 3 for tag in tags)
+
+
+def test_payload_within_budget_is_untouched():
+    text, dropped = compact_payload_with_stats(_entities(2, 2), "campaign_insights", 6000)
+    assert dropped == 0
+    assert len(json.loads(text)) == 2